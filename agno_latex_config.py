@@ -4,7 +4,11 @@ agno系统LaTeX工具配置文件
 定义正确的工具schema和参数，解决参数验证问题
 """
 
-from typing import Dict, Any, List
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Any, List, Callable, Optional
 
 # agno系统工具配置
 AGNO_TOOLS_CONFIG = {
@@ -59,12 +63,147 @@ AGNO_TOOLS_CONFIG = {
                 "required": ["topic", "content"]
             }
         },
+        {
+            "name": "create_and_compile_papers",
+            "description": "批量创建多篇LaTeX论文并并行编译，一次调用返回每篇论文的结果",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "papers": {
+                        "type": "array",
+                        "description": "论文列表，每项参数与create_and_compile_paper相同",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "topic": {
+                                    "type": "string",
+                                    "description": "论文主题或标题"
+                                },
+                                "content": {
+                                    "type": "string",
+                                    "description": "LaTeX内容"
+                                },
+                                "references": {
+                                    "type": "string",
+                                    "description": "BibTeX参考文献（可选）"
+                                },
+                                "author": {
+                                    "type": "string",
+                                    "description": "作者姓名（默认：AI Research Team）",
+                                    "default": "AI Research Team"
+                                },
+                                "project_name": {
+                                    "type": "string",
+                                    "description": "项目目录名称（可选，自动生成）"
+                                }
+                            },
+                            "required": ["topic", "content"]
+                        }
+                    },
+                    "timeout": {
+                        "type": "number",
+                        "description": "等待所有论文编译结束的超时秒数（默认：600）",
+                        "default": 600
+                    }
+                },
+                "required": ["papers"]
+            }
+        },
+        {
+            "name": "run_latex_async",
+            "description": "在后台运行LaTeX编译，立即返回任务ID（用get_latex_job查询进度）",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "project_dir": {
+                        "type": "string",
+                        "description": "LaTeX项目目录路径"
+                    },
+                    "main_tex_file": {
+                        "type": "string",
+                        "description": "主LaTeX文件名（默认：main.tex）",
+                        "default": "main.tex"
+                    }
+                },
+                "required": ["project_dir"]
+            }
+        },
+        {
+            "name": "create_and_compile_paper_async",
+            "description": "创建LaTeX论文并在后台编译，立即返回任务ID（用get_latex_job查询进度）",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "topic": {
+                        "type": "string",
+                        "description": "论文主题或标题"
+                    },
+                    "content": {
+                        "type": "string",
+                        "description": "LaTeX内容"
+                    },
+                    "references": {
+                        "type": "string",
+                        "description": "BibTeX参考文献（可选）"
+                    },
+                    "author": {
+                        "type": "string",
+                        "description": "作者姓名（默认：AI Research Team）",
+                        "default": "AI Research Team"
+                    },
+                    "project_name": {
+                        "type": "string",
+                        "description": "项目目录名称（可选，自动生成）"
+                    }
+                },
+                "required": ["topic", "content"]
+            }
+        },
+        {
+            "name": "get_latex_job",
+            "description": "查询后台编译任务的状态和进度事件（编译遍数、bibtex、警告数）",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "job_id": {
+                        "type": "string",
+                        "description": "任务ID"
+                    },
+                    "since": {
+                        "type": "integer",
+                        "description": "只返回该序号之后的事件（默认：0）",
+                        "default": 0
+                    }
+                },
+                "required": ["job_id"]
+            }
+        },
         {
             "name": "list_papers",
-            "description": "列出所有已生成的论文项目",
+            "description": "列出已生成的论文项目（分页，可按编译状态和关键词过滤）",
             "parameters": {
                 "type": "object",
-                "properties": {},
+                "properties": {
+                    "page": {
+                        "type": "integer",
+                        "description": "页码（从1开始，默认：1）",
+                        "default": 1
+                    },
+                    "page_size": {
+                        "type": "integer",
+                        "description": "每页数量（1-200，默认：20）",
+                        "default": 20
+                    },
+                    "status": {
+                        "type": "string",
+                        "description": "按编译状态过滤（可选）",
+                        "enum": ["success", "failed", "stale", "not_built"]
+                    },
+                    "query": {
+                        "type": "string",
+                        "description": "按项目名称、标题或作者模糊搜索（可选）"
+                    }
+                },
                 "required": []
             }
         },
@@ -85,30 +224,244 @@ AGNO_TOOLS_CONFIG = {
     ]
 }
 
-# 工具函数映射
-def get_tool_function(tool_name: str):
-    """根据工具名称获取对应的函数"""
+AGNO_TOOLS_MODULE_DIR = 'AgentScholar-UI/agent_scholar/tools/compose_tools'
+
+_JSON_TYPES = {
+    "string": (str,),
+    "integer": (int,),
+    "number": (int, float),
+    "boolean": (bool,),
+    "object": (dict,),
+    "array": (list, tuple),
+    "null": (type(None),),
+}
+
+
+class ToolValidationError(ValueError):
+    """工具参数不符合schema"""
+
+
+def _compile_checker(schema: Dict[str, Any], path: str) -> Callable[[Any], Any]:
+    """把单个属性的schema编译为检查函数（类型、枚举、数组元素、嵌套对象）"""
+    types = schema.get("type")
+    type_names = [types] if isinstance(types, str) else list(types or [])
+    py_types = tuple(t for name in type_names for t in _JSON_TYPES[name])
+    # bool是int的子类，只有声明了boolean才接受True/False
+    allow_bool = "boolean" in type_names
+    enum = frozenset(schema["enum"]) if "enum" in schema else None
+    item_checker = _compile_checker(schema["items"], f"{path}[]") if "items" in schema else None
+    object_validator = compile_validator(schema, path) if "properties" in schema else None
+
+    def check(value: Any) -> Any:
+        if py_types and (not isinstance(value, py_types) or (isinstance(value, bool) and not allow_bool)):
+            raise ToolValidationError(f"{path}: 期望类型 {'/'.join(type_names)}，实际为 {type(value).__name__}")
+        if enum is not None and value not in enum:
+            raise ToolValidationError(f"{path}: 取值必须是 {sorted(enum)} 之一")
+        if item_checker is not None and isinstance(value, (list, tuple)):
+            return [item_checker(item) for item in value]
+        if object_validator is not None and isinstance(value, dict):
+            return object_validator(value)
+        return value
+
+    return check
+
+
+def compile_validator(schema: Dict[str, Any], path: str = "") -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+    """把object类型的JSON schema预编译为校验函数
+
+    返回的函数检查必需参数、未知参数和各属性类型，并返回填充默认值后的参数字典。
+    """
+    properties = schema.get("properties", {})
+    required = frozenset(schema.get("required", []))
+    allowed = frozenset(properties)
+    allow_extra = schema.get("additionalProperties", False) is not False
+    defaults = {name: prop["default"] for name, prop in properties.items() if "default" in prop}
+    checkers = {name: _compile_checker(prop, f"{path}.{name}" if path else name)
+                for name, prop in properties.items()}
+
+    def validate(args: Dict[str, Any]) -> Dict[str, Any]:
+        missing = required - args.keys()
+        if missing:
+            raise ToolValidationError(f"{path or '参数'}: 缺少必需参数 {sorted(missing)}")
+        if not allow_extra:
+            unexpected = args.keys() - allowed
+            if unexpected:
+                raise ToolValidationError(f"{path or '参数'}: 未知参数 {sorted(unexpected)}")
+        validated = dict(defaults)
+        for name, value in args.items():
+            checker = checkers.get(name)
+            validated[name] = checker(value) if checker else value
+        return validated
+
+    return validate
+
+
+@dataclass
+class ToolStats:
+    """单个工具的调用统计"""
+    calls: int = 0
+    errors: int = 0
+    validation_errors: int = 0
+    total_time: float = 0.0
+    min_time: float = float("inf")
+    max_time: float = 0.0
+
+    def record(self, elapsed: float, failed: bool) -> None:
+        self.calls += 1
+        self.errors += failed
+        self.total_time += elapsed
+        self.min_time = min(self.min_time, elapsed)
+        self.max_time = max(self.max_time, elapsed)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "validation_errors": self.validation_errors,
+            "mean_ms": self.total_time / self.calls * 1000 if self.calls else 0.0,
+            "min_ms": self.min_time * 1000 if self.calls else 0.0,
+            "max_ms": self.max_time * 1000,
+        }
+
+
+def _load_agno_tools() -> Dict[str, Callable]:
+    """导入工具函数（注册表首次加载时调用；可选的agno_latex_tool导入失败时，请求其中的工具会再次调用）
+
+    list_papers / get_paper_info 由本地的paper_catalog索引提供，不再每次遍历result/目录；
+    create_and_compile_papers、*_async 和 get_latex_job 由latex_jobs的后台编译线程池提供。
+    """
+    import latex_jobs
+    import paper_catalog
+
+    tools: Dict[str, Callable] = {
+        "list_papers": paper_catalog.list_papers,
+        "get_paper_info": paper_catalog.get_paper_info,
+        "create_and_compile_papers": latex_jobs.create_and_compile_papers,
+        "run_latex_async": latex_jobs.run_latex_async,
+        "create_and_compile_paper_async": latex_jobs.create_and_compile_paper_async,
+        "get_latex_job": latex_jobs.get_latex_job
+    }
+
+    if AGNO_TOOLS_MODULE_DIR not in sys.path:
+        sys.path.append(AGNO_TOOLS_MODULE_DIR)
     try:
-        import sys
-        sys.path.append('AgentScholar-UI/agent_scholar/tools/compose_tools')
         from agno_latex_tool import (
             run_latex,
-            create_and_compile_paper,
-            list_papers,
-            get_paper_info
+            create_and_compile_paper
         )
-        
-        tool_map = {
-            "run_latex": run_latex,
-            "create_and_compile_paper": create_and_compile_paper,
-            "list_papers": list_papers,
-            "get_paper_info": get_paper_info
-        }
-        
-        return tool_map.get(tool_name)
     except ImportError:
+        print("⚠️ 无法导入工具模块: agno_latex_tool")
+        return tools
+
+    tools.update({
+        "run_latex": run_latex,
+        "create_and_compile_paper": create_and_compile_paper
+    })
+    return tools
+
+
+class ToolRegistry:
+    """工具注册表
+
+    工具函数解析成功后不再重复解析（导入失败的可选工具在下次请求时重试），每个工具的参数schema在加载时预编译为校验函数；
+    call() 负责校验、分发并记录调用次数和耗时。
+    """
+
+    def __init__(self, config: Dict[str, Any] = AGNO_TOOLS_CONFIG,
+                 loader: Callable[[], Dict[str, Callable]] = _load_agno_tools):
+        self._config = config
+        self._loader = loader
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._functions: Dict[str, Callable] = {}
+        self._validators: Dict[str, Callable[[Dict[str, Any]], Dict[str, Any]]] = {}
+        self._stats: Dict[str, ToolStats] = {}
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            for tool in self._config["tools"]:
+                self._validators[tool["name"]] = compile_validator(tool["parameters"])
+                self._stats.setdefault(tool["name"], ToolStats())
+            self._load_functions()
+            self._loaded = True
+
+    def _load_functions(self) -> None:
+        for name, func in self._loader().items():
+            self._functions.setdefault(name, func)
+
+    def _function(self, tool_name: str) -> Optional[Callable]:
+        self._ensure_loaded()
+        func = self._functions.get(tool_name)
+        if func is None and tool_name in self._validators:
+            # 可选工具模块导入失败时不缓存失败结果：请求缺失的工具时重新导入，路径修复后即可使用
+            with self._lock:
+                self._load_functions()
+                func = self._functions.get(tool_name)
+        return func
+
+    def register(self, name: str, func: Callable, parameters: Optional[Dict[str, Any]] = None) -> None:
+        """注册或替换工具函数；提供parameters时同时替换其schema"""
+        self._ensure_loaded()
+        with self._lock:
+            self._functions[name] = func
+            if parameters is not None:
+                self._validators[name] = compile_validator(parameters)
+            self._stats.setdefault(name, ToolStats())
+
+    def get(self, tool_name: str) -> Optional[Callable]:
+        return self._function(tool_name)
+
+    def validate(self, tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """校验参数并返回填充默认值后的参数字典"""
+        self._ensure_loaded()
+        validator = self._validators.get(tool_name)
+        if validator is None:
+            raise KeyError(f"未知工具: {tool_name}")
+        try:
+            return validator(arguments)
+        except ToolValidationError:
+            with self._lock:
+                self._stats[tool_name].validation_errors += 1
+            raise
+
+    def call(self, tool_name: str, **arguments: Any) -> Any:
+        """校验参数后调用工具函数"""
+        validated = self.validate(tool_name, arguments)
+        func = self._function(tool_name)
+        if func is None:
+            raise KeyError(f"工具未加载: {tool_name}")
+        stats = self._stats[tool_name]
+        start = time.perf_counter()
+        failed = True
+        try:
+            result = func(**validated)
+            failed = False
+            return result
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                stats.record(elapsed, failed)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """各工具的调用次数与耗时统计"""
+        self._ensure_loaded()
+        return {name: stats.to_dict() for name, stats in self._stats.items()}
+
+
+TOOL_REGISTRY = ToolRegistry()
+
+
+# 工具函数映射
+def get_tool_function(tool_name: str):
+    """根据工具名称获取对应的函数"""
+    func = TOOL_REGISTRY.get(tool_name)
+    if func is None:
         print(f"⚠️ 无法导入工具: {tool_name}")
-        return None
+    return func
 
 # 示例使用说明
 def print_usage_examples():
@@ -126,8 +479,13 @@ def print_usage_examples():
     print("       author='您的姓名'")
     print("   )")
     
+    print("\n   后台编译（不阻塞智能体）:")
+    print("   job = run_latex_async(project_dir='result/multiagent_project')")
+    print("   get_latex_job(job_id=job['job_id'])")
+
     print("\n3️⃣ 列出所有论文:")
     print("   list_papers()")
+    print("   list_papers(status='failed', query='强化学习', page=1, page_size=20)")
     
     print("\n4️⃣ 获取论文信息:")
     print("   get_paper_info(project_name='multiagent_project')")
@@ -141,6 +499,7 @@ def test_config():
     print("=" * 30)
     
     for tool in AGNO_TOOLS_CONFIG["tools"]:
+        compile_validator(tool["parameters"])
         print(f"✅ 工具: {tool['name']}")
         print(f"   描述: {tool['description']}")
         print(f"   必需参数: {tool['parameters'].get('required', [])}")
@@ -17,7 +17,7 @@ import baml_py
 from . import stream_types, types, type_builder
 from .parser import LlmResponseParser, LlmStreamParser
 from .runtime import DoNotUseDirectlyCallManager, BamlCallOptions
-from .globals import DO_NOT_USE_DIRECTLY_UNLESS_YOU_KNOW_WHAT_YOURE_DOING_RUNTIME as __runtime__
+from .globals import get_runtime
 
 
 class BamlAsyncClient:
@@ -79,7 +79,14 @@ class BamlAsyncClient:
         result = await self.__options.merge_options(baml_options).call_function_async(function_name="ExtractResume", args={
             "resume": resume,
         })
-        return typing.cast(types.Resume, result.cast_to(types, types, stream_types, False, __runtime__))
+        return typing.cast(types.Resume, result.cast_to(types, types, stream_types, False, get_runtime()))
+    async def TagPapers(self, papers: typing.List["types.PaperAbstract"],
+        baml_options: BamlCallOptions = {},
+    ) -> typing.List["types.PaperTags"]:
+        result = await self.__options.merge_options(baml_options).call_function_async(function_name="TagPapers", args={
+            "papers": papers,
+        })
+        return typing.cast(typing.List["types.PaperTags"], result.cast_to(types, types, stream_types, False, get_runtime()))
     
 
 
@@ -97,8 +104,20 @@ class BamlStreamClient:
         })
         return baml_py.BamlStream[stream_types.Resume, types.Resume](
           result,
-          lambda x: typing.cast(stream_types.Resume, x.cast_to(types, types, stream_types, True, __runtime__)),
-          lambda x: typing.cast(types.Resume, x.cast_to(types, types, stream_types, False, __runtime__)),
+          lambda x: typing.cast(stream_types.Resume, x.cast_to(types, types, stream_types, True, get_runtime())),
+          lambda x: typing.cast(types.Resume, x.cast_to(types, types, stream_types, False, get_runtime())),
+          ctx,
+        )
+    def TagPapers(self, papers: typing.List["types.PaperAbstract"],
+        baml_options: BamlCallOptions = {},
+    ) -> baml_py.BamlStream[typing.List["stream_types.PaperTags"], typing.List["types.PaperTags"]]:
+        ctx, result = self.__options.merge_options(baml_options).create_async_stream(function_name="TagPapers", args={
+            "papers": papers,
+        })
+        return baml_py.BamlStream[typing.List["stream_types.PaperTags"], typing.List["types.PaperTags"]](
+          result,
+          lambda x: typing.cast(typing.List["stream_types.PaperTags"], x.cast_to(types, types, stream_types, True, get_runtime())),
+          lambda x: typing.cast(typing.List["types.PaperTags"], x.cast_to(types, types, stream_types, False, get_runtime())),
           ctx,
         )
     
@@ -116,6 +135,13 @@ class BamlHttpRequestClient:
             "resume": resume,
         }, mode="request")
         return result
+    async def TagPapers(self, papers: typing.List["types.PaperAbstract"],
+        baml_options: BamlCallOptions = {},
+    ) -> baml_py.baml_py.HTTPRequest:
+        result = await self.__options.merge_options(baml_options).create_http_request_async(function_name="TagPapers", args={
+            "papers": papers,
+        }, mode="request")
+        return result
     
 
 class BamlHttpStreamRequestClient:
@@ -131,6 +157,13 @@ class BamlHttpStreamRequestClient:
             "resume": resume,
         }, mode="stream")
         return result
+    async def TagPapers(self, papers: typing.List["types.PaperAbstract"],
+        baml_options: BamlCallOptions = {},
+    ) -> baml_py.baml_py.HTTPRequest:
+        result = await self.__options.merge_options(baml_options).create_http_request_async(function_name="TagPapers", args={
+            "papers": papers,
+        }, mode="stream")
+        return result
     
 
 b = BamlAsyncClient(DoNotUseDirectlyCallManager({}))
\ No newline at end of file
@@ -12,18 +12,56 @@
 
 from __future__ import annotations
 import os
+import threading
 import warnings
 
 from baml_py import BamlCtxManager, BamlRuntime
 from .inlinedbaml import get_baml_files
-from typing import Dict
-
-DO_NOT_USE_DIRECTLY_UNLESS_YOU_KNOW_WHAT_YOURE_DOING_RUNTIME = BamlRuntime.from_files(
-  "baml_src",
-  get_baml_files(),
-  os.environ.copy()
-)
-DO_NOT_USE_DIRECTLY_UNLESS_YOU_KNOW_WHAT_YOURE_DOING_CTX = BamlCtxManager(DO_NOT_USE_DIRECTLY_UNLESS_YOU_KNOW_WHAT_YOURE_DOING_RUNTIME)
+from typing import Dict, Optional
+
+# The runtime parses every .baml file, so it is built on first use rather than at import time;
+# processes that import baml_client but never call a function don't pay for it.
+_runtime: Optional[BamlRuntime] = None
+_ctx_manager: Optional[BamlCtxManager] = None
+_init_lock = threading.Lock()
+
+
+def _initialize() -> None:
+  global _runtime, _ctx_manager
+  with _init_lock:
+    if _runtime is None:
+      runtime = BamlRuntime.from_files(
+        "baml_src",
+        get_baml_files(),
+        os.environ.copy()
+      )
+      _ctx_manager = BamlCtxManager(runtime)
+      _runtime = runtime
+
+
+def get_runtime() -> BamlRuntime:
+  runtime = _runtime
+  if runtime is None:
+    _initialize()
+    runtime = _runtime
+  return runtime  # type: ignore[return-value]
+
+
+def get_ctx_manager() -> BamlCtxManager:
+  ctx_manager = _ctx_manager
+  if ctx_manager is None:
+    _initialize()
+    ctx_manager = _ctx_manager
+  return ctx_manager  # type: ignore[return-value]
+
+
+def __getattr__(name: str):
+  # The old eager module attributes still resolve, initializing the runtime on access.
+  if name == "DO_NOT_USE_DIRECTLY_UNLESS_YOU_KNOW_WHAT_YOURE_DOING_RUNTIME":
+    return get_runtime()
+  if name == "DO_NOT_USE_DIRECTLY_UNLESS_YOU_KNOW_WHAT_YOURE_DOING_CTX":
+    return get_ctx_manager()
+  raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 def reset_baml_env_vars(env_vars: Dict[str, str]):
     warnings.warn(
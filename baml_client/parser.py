@@ -28,6 +28,12 @@ class LlmResponseParser:
         result = self.__options.merge_options(baml_options).parse_response(function_name="ExtractResume", llm_response=llm_response, mode="request")
         return typing.cast(types.Resume, result)
 
+    def TagPapers(
+        self, llm_response: str, baml_options: BamlCallOptions = {},
+    ) -> typing.List["types.PaperTags"]:
+        result = self.__options.merge_options(baml_options).parse_response(function_name="TagPapers", llm_response=llm_response, mode="request")
+        return typing.cast(typing.List["types.PaperTags"], result)
+
     
 
 class LlmStreamParser:
@@ -42,4 +48,10 @@ class LlmStreamParser:
         result = self.__options.merge_options(baml_options).parse_response(function_name="ExtractResume", llm_response=llm_response, mode="stream")
         return typing.cast(stream_types.Resume, result)
 
+    def TagPapers(
+        self, llm_response: str, baml_options: BamlCallOptions = {},
+    ) -> typing.List["stream_types.PaperTags"]:
+        result = self.__options.merge_options(baml_options).parse_response(function_name="TagPapers", llm_response=llm_response, mode="stream")
+        return typing.cast(typing.List["stream_types.PaperTags"], result)
+
     
\ No newline at end of file
@@ -17,7 +17,7 @@ import typing_extensions
 import baml_py
 
 from . import types, stream_types, type_builder
-from .globals import DO_NOT_USE_DIRECTLY_UNLESS_YOU_KNOW_WHAT_YOURE_DOING_RUNTIME as __runtime__, DO_NOT_USE_DIRECTLY_UNLESS_YOU_KNOW_WHAT_YOURE_DOING_CTX as __ctx__manager__
+from .globals import get_runtime, get_ctx_manager
 
 
 class BamlCallOptions(typing.TypedDict, total=False):
@@ -51,9 +51,22 @@ class _ResolvedBamlOptions:
 
 
 
+# Environment variables referenced from baml_src (env.*) plus the BAML_LOG* settings read by the
+# runtime. Resolved options are reused until one of these, the number of variables in os.environ,
+# or the manager's own overrides change.
+WATCHED_ENV_VARS: typing.Tuple[str, ...] = (
+    "OPENAI_API_KEY",
+    "ANTHROPIC_API_KEY",
+    "BAML_LOG",
+    "BAML_LOG_JSON_MODE",
+    "BAML_LOG_MAX_CHUNK_LENGTH",
+)
+
+
 class DoNotUseDirectlyCallManager:
     def __init__(self, baml_options: BamlCallOptions):
         self.__baml_options = baml_options
+        self.__resolved: typing.Optional[typing.Tuple[typing.Tuple[typing.Any, ...], _ResolvedBamlOptions]] = None
 
     def __getstate__(self):
         # Return state needed for pickling
@@ -62,8 +75,30 @@ class DoNotUseDirectlyCallManager:
     def __setstate__(self, state):
         # Restore state from pickling
         self.__baml_options = state["baml_options"]
+        self.__resolved = None
+
+    def __fingerprint(self) -> typing.Tuple[typing.Any, ...]:
+        options = self.__baml_options
+        environ = os.environ
+        return (
+            len(environ),
+            tuple(environ.get(k) for k in WATCHED_ENV_VARS),
+            id(options.get("tb")),
+            id(options.get("client_registry")),
+            id(options.get("collector")),
+            tuple(options.get("env", {}).items()),
+        )
 
     def __resolve(self) -> _ResolvedBamlOptions:
+        fingerprint = self.__fingerprint()
+        cached = self.__resolved
+        if cached is not None and cached[0] == fingerprint:
+            return cached[1]
+        resolved = self.__build_resolved()
+        self.__resolved = (fingerprint, resolved)
+        return resolved
+
+    def __build_resolved(self) -> _ResolvedBamlOptions:
         tb = self.__baml_options.get("tb")
         if tb is not None:
             baml_tb = tb._tb  # type: ignore (we know how to use this private attribute)
@@ -91,17 +126,20 @@ class DoNotUseDirectlyCallManager:
         )
 
     def merge_options(self, options: BamlCallOptions) -> "DoNotUseDirectlyCallManager":
+        if not options:
+            # Keep the resolved-options cache warm for calls without per-call overrides.
+            return self
         return DoNotUseDirectlyCallManager({**self.__baml_options, **options})
 
     async def call_function_async(
         self, *, function_name: str, args: typing.Dict[str, typing.Any]
     ) -> baml_py.baml_py.FunctionResult:
         resolved_options = self.__resolve()
-        return await __runtime__.call_function(
+        return await get_runtime().call_function(
             function_name,
             args,
             # ctx
-            __ctx__manager__.clone_context(),
+            get_ctx_manager().clone_context(),
             # tb
             resolved_options.tb,
             # cr
@@ -116,8 +154,8 @@ class DoNotUseDirectlyCallManager:
         self, *, function_name: str, args: typing.Dict[str, typing.Any]
     ) -> baml_py.baml_py.FunctionResult:
         resolved_options = self.__resolve()
-        ctx = __ctx__manager__.get()
-        return __runtime__.call_function_sync(
+        ctx = get_ctx_manager().get()
+        return get_runtime().call_function_sync(
             function_name,
             args,
             # ctx
@@ -139,8 +177,8 @@ class DoNotUseDirectlyCallManager:
         args: typing.Dict[str, typing.Any],
     ) -> typing.Tuple[baml_py.baml_py.RuntimeContextManager, baml_py.baml_py.FunctionResultStream]:
         resolved_options = self.__resolve()
-        ctx = __ctx__manager__.clone_context()
-        result = __runtime__.stream_function(
+        ctx = get_ctx_manager().clone_context()
+        result = get_runtime().stream_function(
             function_name,
             args,
             # this is always None, we set this later!
@@ -166,8 +204,8 @@ class DoNotUseDirectlyCallManager:
         args: typing.Dict[str, typing.Any],
     ) -> typing.Tuple[baml_py.baml_py.RuntimeContextManager, baml_py.baml_py.SyncFunctionResultStream]:
         resolved_options = self.__resolve()
-        ctx = __ctx__manager__.get()
-        result = __runtime__.stream_function_sync(
+        ctx = get_ctx_manager().get()
+        result = get_runtime().stream_function_sync(
             function_name,
             args,
             # this is always None, we set this later!
@@ -194,11 +232,11 @@ class DoNotUseDirectlyCallManager:
         mode: typing_extensions.Literal["stream", "request"],
     ) -> baml_py.baml_py.HTTPRequest:
         resolved_options = self.__resolve()
-        return await __runtime__.build_request(
+        return await get_runtime().build_request(
             function_name,
             args,
             # ctx
-            __ctx__manager__.clone_context(),
+            get_ctx_manager().clone_context(),
             # tb
             resolved_options.tb,
             # cr
@@ -217,11 +255,11 @@ class DoNotUseDirectlyCallManager:
         mode: typing_extensions.Literal["stream", "request"],
     ) -> baml_py.baml_py.HTTPRequest:
         resolved_options = self.__resolve()
-        return __runtime__.build_request_sync(
+        return get_runtime().build_request_sync(
             function_name,
             args,
             # ctx
-            __ctx__manager__.get(),
+            get_ctx_manager().get(),
             # tb
             resolved_options.tb,
             # cr
@@ -234,7 +272,7 @@ class DoNotUseDirectlyCallManager:
 
     def parse_response(self, *, function_name: str, llm_response: str, mode: typing_extensions.Literal["stream", "request"]) -> typing.Any:
         resolved_options = self.__resolve()
-        return __runtime__.parse_llm_response(
+        return get_runtime().parse_llm_response(
             function_name,
             llm_response,
             # enum_module
@@ -246,7 +284,7 @@ class DoNotUseDirectlyCallManager:
             # allow_partials
             mode == "stream",
             # ctx
-            __ctx__manager__.get(),
+            get_ctx_manager().get(),
             # tb
             resolved_options.tb,
             # cr
@@ -276,4 +314,4 @@ def disassemble(function: typing.Callable) -> None:
         return
 
     print(f"----- function {function.__name__} -----")
-    __runtime__.disassemble(function.__name__)
\ No newline at end of file
+    get_runtime().disassemble(function.__name__)
\ No newline at end of file
@@ -23,9 +23,18 @@ class StreamState(BaseModel, typing.Generic[StreamStateValueT]):
     value: StreamStateValueT
     state: typing_extensions.Literal["Pending", "Incomplete", "Complete"]
 # #########################################################################
-# Generated classes (1)
+# Generated classes (3)
 # #########################################################################
 
+class PaperAbstract(BaseModel):
+    arxiv_id: typing.Optional[str] = None
+    title: typing.Optional[str] = None
+    abstract: typing.Optional[str] = None
+
+class PaperTags(BaseModel):
+    arxiv_id: typing.Optional[str] = None
+    tags: typing.List[str]
+
 class Resume(BaseModel):
     name: typing.Optional[str] = None
     email: typing.Optional[str] = None
@@ -10,13 +10,25 @@
 # BAML files and re-generate this code using: baml-cli generate
 # baml-cli is available with the baml package.
 
-from .globals import DO_NOT_USE_DIRECTLY_UNLESS_YOU_KNOW_WHAT_YOURE_DOING_CTX
+import typing
+
+from .globals import get_ctx_manager
+
+
+def trace(func: typing.Callable) -> typing.Callable:
+  return get_ctx_manager().trace_fn(func)
+
+
+def set_tags(**tags: str) -> None:
+  get_ctx_manager().upsert_tags(**tags)
+
 
-trace = DO_NOT_USE_DIRECTLY_UNLESS_YOU_KNOW_WHAT_YOURE_DOING_CTX.trace_fn
-set_tags = DO_NOT_USE_DIRECTLY_UNLESS_YOU_KNOW_WHAT_YOURE_DOING_CTX.upsert_tags
 def flush():
-  DO_NOT_USE_DIRECTLY_UNLESS_YOU_KNOW_WHAT_YOURE_DOING_CTX.flush()
-on_log_event = DO_NOT_USE_DIRECTLY_UNLESS_YOU_KNOW_WHAT_YOURE_DOING_CTX.on_log_event
+  get_ctx_manager().flush()
+
+
+def on_log_event(handler: typing.Callable) -> None:
+  get_ctx_manager().on_log_event(handler)
 
 
 __all__ = ['trace', 'set_tags', "flush", "on_log_event"]
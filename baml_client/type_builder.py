@@ -15,15 +15,17 @@ from baml_py import type_builder
 from baml_py import baml_py
 # These are exports, not used here, hence the linter is disabled
 from baml_py.baml_py import FieldType, EnumValueBuilder, EnumBuilder, ClassBuilder # noqa: F401 # pylint: disable=unused-import
-from .globals import DO_NOT_USE_DIRECTLY_UNLESS_YOU_KNOW_WHAT_YOURE_DOING_RUNTIME
+from .globals import get_runtime
 
 class TypeBuilder(type_builder.TypeBuilder):
     def __init__(self):
         super().__init__(classes=set(
-          ["Resume",]
+          ["PaperAbstract","PaperTags","Resume",]
         ), enums=set(
           []
-        ), runtime=DO_NOT_USE_DIRECTLY_UNLESS_YOU_KNOW_WHAT_YOURE_DOING_RUNTIME)
+        ), runtime=get_runtime())
+        # Viewers are cached so repeated tb.<Class> access reuses one builder handle.
+        self.__viewers: typing.Dict[str, typing.Any] = {}
 
     # #########################################################################
     # Generated enums 0
@@ -31,12 +33,29 @@ class TypeBuilder(type_builder.TypeBuilder):
 
 
     # #########################################################################
-    # Generated classes 1
+    # Generated classes 3
     # #########################################################################
 
+    @property
+    def PaperAbstract(self) -> "PaperAbstractViewer":
+        viewer = self.__viewers.get("PaperAbstract")
+        if viewer is None:
+            viewer = self.__viewers["PaperAbstract"] = PaperAbstractViewer(self)
+        return viewer
+
+    @property
+    def PaperTags(self) -> "PaperTagsViewer":
+        viewer = self.__viewers.get("PaperTags")
+        if viewer is None:
+            viewer = self.__viewers["PaperTags"] = PaperTagsViewer(self)
+        return viewer
+
     @property
     def Resume(self) -> "ResumeViewer":
-        return ResumeViewer(self)
+        viewer = self.__viewers.get("Resume")
+        if viewer is None:
+            viewer = self.__viewers["Resume"] = ResumeViewer(self)
+        return viewer
 
 
 
@@ -46,9 +65,113 @@ class TypeBuilder(type_builder.TypeBuilder):
 
 
 # #########################################################################
-# Generated classes 1
+# Generated classes 3
 # #########################################################################
 
+class PaperAbstractAst:
+    def __init__(self, tb: type_builder.TypeBuilder):
+        _tb = tb._tb # type: ignore (we know how to use this private attribute)
+        self._bldr = _tb.class_("PaperAbstract")
+        self._properties: typing.Set[str] = set([  "arxiv_id",  "title",  "abstract",  ])
+        self._props = PaperAbstractProperties(self._bldr, self._properties)
+
+    def type(self) -> baml_py.FieldType:
+        return self._bldr.field()
+
+    @property
+    def props(self) -> "PaperAbstractProperties":
+        return self._props
+
+
+class PaperAbstractViewer(PaperAbstractAst):
+    def __init__(self, tb: type_builder.TypeBuilder):
+        super().__init__(tb)
+
+    
+    def list_properties(self) -> typing.List[typing.Tuple[str, type_builder.ClassPropertyViewer]]:
+        return [(name, type_builder.ClassPropertyViewer(self._bldr.property(name))) for name in self._properties]
+    
+
+
+class PaperAbstractProperties:
+    def __init__(self, bldr: baml_py.ClassBuilder, properties: typing.Set[str]):
+        self.__bldr = bldr
+        self.__properties = properties # type: ignore (we know how to use this private attribute) # noqa: F821
+        self.__viewers: typing.Dict[str, type_builder.ClassPropertyViewer] = {}
+
+    def __viewer(self, name: str) -> type_builder.ClassPropertyViewer:
+        viewer = self.__viewers.get(name)
+        if viewer is None:
+            viewer = self.__viewers[name] = type_builder.ClassPropertyViewer(self.__bldr.property(name))
+        return viewer
+
+    
+    
+    @property
+    def arxiv_id(self) -> type_builder.ClassPropertyViewer:
+        return self.__viewer("arxiv_id")
+    
+    @property
+    def title(self) -> type_builder.ClassPropertyViewer:
+        return self.__viewer("title")
+    
+    @property
+    def abstract(self) -> type_builder.ClassPropertyViewer:
+        return self.__viewer("abstract")
+    
+    
+
+
+class PaperTagsAst:
+    def __init__(self, tb: type_builder.TypeBuilder):
+        _tb = tb._tb # type: ignore (we know how to use this private attribute)
+        self._bldr = _tb.class_("PaperTags")
+        self._properties: typing.Set[str] = set([  "arxiv_id",  "tags",  ])
+        self._props = PaperTagsProperties(self._bldr, self._properties)
+
+    def type(self) -> baml_py.FieldType:
+        return self._bldr.field()
+
+    @property
+    def props(self) -> "PaperTagsProperties":
+        return self._props
+
+
+class PaperTagsViewer(PaperTagsAst):
+    def __init__(self, tb: type_builder.TypeBuilder):
+        super().__init__(tb)
+
+    
+    def list_properties(self) -> typing.List[typing.Tuple[str, type_builder.ClassPropertyViewer]]:
+        return [(name, type_builder.ClassPropertyViewer(self._bldr.property(name))) for name in self._properties]
+    
+
+
+class PaperTagsProperties:
+    def __init__(self, bldr: baml_py.ClassBuilder, properties: typing.Set[str]):
+        self.__bldr = bldr
+        self.__properties = properties # type: ignore (we know how to use this private attribute) # noqa: F821
+        self.__viewers: typing.Dict[str, type_builder.ClassPropertyViewer] = {}
+
+    def __viewer(self, name: str) -> type_builder.ClassPropertyViewer:
+        viewer = self.__viewers.get(name)
+        if viewer is None:
+            viewer = self.__viewers[name] = type_builder.ClassPropertyViewer(self.__bldr.property(name))
+        return viewer
+
+    
+    
+    @property
+    def arxiv_id(self) -> type_builder.ClassPropertyViewer:
+        return self.__viewer("arxiv_id")
+    
+    @property
+    def tags(self) -> type_builder.ClassPropertyViewer:
+        return self.__viewer("tags")
+    
+    
+
+
 class ResumeAst:
     def __init__(self, tb: type_builder.TypeBuilder):
         _tb = tb._tb # type: ignore (we know how to use this private attribute)
@@ -78,24 +201,31 @@ class ResumeProperties:
     def __init__(self, bldr: baml_py.ClassBuilder, properties: typing.Set[str]):
         self.__bldr = bldr
         self.__properties = properties # type: ignore (we know how to use this private attribute) # noqa: F821
+        self.__viewers: typing.Dict[str, type_builder.ClassPropertyViewer] = {}
+
+    def __viewer(self, name: str) -> type_builder.ClassPropertyViewer:
+        viewer = self.__viewers.get(name)
+        if viewer is None:
+            viewer = self.__viewers[name] = type_builder.ClassPropertyViewer(self.__bldr.property(name))
+        return viewer
 
     
     
     @property
     def name(self) -> type_builder.ClassPropertyViewer:
-        return type_builder.ClassPropertyViewer(self.__bldr.property("name"))
+        return self.__viewer("name")
     
     @property
     def email(self) -> type_builder.ClassPropertyViewer:
-        return type_builder.ClassPropertyViewer(self.__bldr.property("email"))
+        return self.__viewer("email")
     
     @property
     def experience(self) -> type_builder.ClassPropertyViewer:
-        return type_builder.ClassPropertyViewer(self.__bldr.property("experience"))
+        return self.__viewer("experience")
     
     @property
     def skills(self) -> type_builder.ClassPropertyViewer:
-        return type_builder.ClassPropertyViewer(self.__bldr.property("skills"))
+        return self.__viewer("skills")
     
     
 
@@ -16,6 +16,12 @@ from . import stream_types
 
 type_map = {
 
+    "types.PaperAbstract": types.PaperAbstract,
+    "stream_types.PaperAbstract": stream_types.PaperAbstract,
+
+    "types.PaperTags": types.PaperTags,
+    "stream_types.PaperTags": stream_types.PaperTags,
+
     "types.Resume": types.Resume,
     "stream_types.Resume": stream_types.Resume,
 
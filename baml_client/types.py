@@ -41,9 +41,18 @@ def all_succeeded(checks: typing.Dict[CheckName, Check]) -> bool:
 # #########################################################################
 
 # #########################################################################
-# Generated classes (1)
+# Generated classes (3)
 # #########################################################################
 
+class PaperAbstract(BaseModel):
+    arxiv_id: str
+    title: str
+    abstract: str
+
+class PaperTags(BaseModel):
+    arxiv_id: str
+    tags: typing.List[str]
+
 class Resume(BaseModel):
     name: str
     email: str
@@ -0,0 +1,7 @@
+"""
+Hand-written extensions around the generated baml_client.
+
+baml_client/ is regenerated by `baml-cli generate`; code that wraps or
+drives it lives here so it survives regeneration. Modules import
+baml_client lazily, so importing baml_ext does not start the BAML runtime.
+"""
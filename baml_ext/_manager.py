@@ -0,0 +1,85 @@
+"""
+Base class for wrappers around baml_client's DoNotUseDirectlyCallManager.
+
+The generated clients take their call manager in the constructor and call
+merge_options(...) on it for every call, so a wrapper with the same
+interface can intercept calls without touching generated code:
+
+    client = wrap_client(b, lambda manager: MyWrapper(manager))
+
+merge_options returns a wrapper of the same type around the merged inner
+manager. It also remembers the collectors passed in, so a wrapper can add
+its own Collector to a call without dropping the caller's.
+"""
+
+import copy
+from typing import Any, Callable, List, Optional, TypeVar
+
+W = TypeVar("W", bound="CallManagerWrapper")
+
+
+class CallManagerWrapper:
+    def __init__(self, inner: Any, collectors: Optional[List[Any]] = None):
+        self._inner = inner
+        self._collectors: List[Any] = list(collectors or [])
+
+    def __getattr__(self, name: str) -> Any:
+        # Anything not intercepted goes straight to the wrapped manager. Private names are
+        # excluded so copy/pickle probing a half-built instance can't recurse into _inner.
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self._inner, name)
+
+    def _clone(self: W, inner: Any, collectors: List[Any]) -> W:
+        clone = copy.copy(self)
+        clone._inner = inner
+        clone._collectors = collectors
+        return clone
+
+    def merge_options(self: W, options: Any) -> W:
+        if not options:
+            return self
+        collectors = self._collectors
+        if "collector" in options:
+            collector = options["collector"]
+            collectors = list(collector) if isinstance(collector, list) else [collector]
+        return self._clone(self._inner.merge_options(options), collectors)
+
+    def _with_collector(self, collector: Any) -> Any:
+        """The inner manager with `collector` appended to the caller's collectors."""
+        return self._inner.merge_options({"collector": self._collectors + [collector]})
+
+    def call_function_sync(self, *, function_name: str, args: Any) -> Any:
+        return self._inner.call_function_sync(function_name=function_name, args=args)
+
+    async def call_function_async(self, *, function_name: str, args: Any) -> Any:
+        return await self._inner.call_function_async(function_name=function_name, args=args)
+
+    def create_sync_stream(self, *, function_name: str, args: Any) -> Any:
+        return self._inner.create_sync_stream(function_name=function_name, args=args)
+
+    def create_async_stream(self, *, function_name: str, args: Any) -> Any:
+        return self._inner.create_async_stream(function_name=function_name, args=args)
+
+    def create_http_request_sync(self, *, function_name: str, args: Any, mode: str) -> Any:
+        return self._inner.create_http_request_sync(function_name=function_name, args=args, mode=mode)
+
+    async def create_http_request_async(self, *, function_name: str, args: Any, mode: str) -> Any:
+        return await self._inner.create_http_request_async(function_name=function_name, args=args, mode=mode)
+
+    def parse_response(self, *, function_name: str, llm_response: str, mode: str) -> Any:
+        return self._inner.parse_response(function_name=function_name, llm_response=llm_response, mode=mode)
+
+
+def client_manager(client: Any) -> Any:
+    """The call manager inside a generated BamlSyncClient / BamlAsyncClient."""
+    for attr in ("_BamlSyncClient__options", "_BamlAsyncClient__options"):
+        manager = getattr(client, attr, None)
+        if manager is not None:
+            return manager
+    raise TypeError(f"{type(client).__name__} is not a generated BAML client")
+
+
+def wrap_client(client: Any, factory: Callable[[Any], Any]) -> Any:
+    """A new client of the same type whose call manager is factory(current manager)."""
+    return type(client)(factory(client_manager(client)))
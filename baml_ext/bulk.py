@@ -0,0 +1,231 @@
+"""
+Bounded-concurrency bulk calls for BAML functions.
+
+The generated clients only expose one call per document. These helpers run
+a BAML function (or any callable) over an iterable of inputs with at most
+`concurrency` calls in flight, and yield one BulkItem per input, either in
+input order or as the calls complete. A failing item records its exception
+and does not abort the batch. An optional progress callback receives
+aggregate counts and throughput after every completed item.
+
+Each input is passed positionally, or as keyword arguments if it is a dict:
+
+    from baml_ext.bulk import extract_resumes
+
+    for item in extract_resumes(texts, concurrency=16):
+        print(item.index, item.result if item.ok else item.error)
+
+    async for item in bulk_call_async(b.ExtractResume, texts, ordered=False):
+        ...
+"""
+
+import asyncio
+import contextvars
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, Iterator, Optional, Set
+
+DEFAULT_CONCURRENCY = 8
+# Completed-but-unyielded results kept in ordered mode, as a multiple of concurrency.
+ORDERED_WINDOW_FACTOR = 4
+
+
+@dataclass
+class BulkItem:
+    index: int
+    input: Any
+    result: Any = None
+    error: Optional[BaseException] = None
+    elapsed: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class BulkProgress:
+    completed: int
+    failed: int
+    total: Optional[int]
+    elapsed: float
+
+    @property
+    def throughput(self) -> float:
+        """Completed items per second since the batch started."""
+        return self.completed / self.elapsed if self.elapsed > 0 else 0.0
+
+
+ProgressCallback = Callable[[BulkProgress], None]
+
+
+def _invoke(fn: Callable[..., Any], value: Any) -> Any:
+    return fn(**value) if isinstance(value, dict) else fn(value)
+
+
+class _Tracker:
+    def __init__(self, inputs: Iterable[Any], on_progress: Optional[ProgressCallback]):
+        self.total = len(inputs) if hasattr(inputs, "__len__") else None  # type: ignore[arg-type]
+        self.on_progress = on_progress
+        self.started = time.perf_counter()
+        self.completed = 0
+        self.failed = 0
+
+    def record(self, item: BulkItem) -> None:
+        self.completed += 1
+        if not item.ok:
+            self.failed += 1
+        if self.on_progress is not None:
+            self.on_progress(BulkProgress(self.completed, self.failed, self.total,
+                                          time.perf_counter() - self.started))
+
+
+class _Reorder:
+    """Releases completed items in input order (ordered mode) or immediately."""
+
+    def __init__(self, ordered: bool):
+        self.ordered = ordered
+        self.next_index = 0
+        self.buffer: Dict[int, BulkItem] = {}
+
+    def push(self, item: BulkItem) -> Iterator[BulkItem]:
+        if not self.ordered:
+            yield item
+            return
+        self.buffer[item.index] = item
+        while self.next_index in self.buffer:
+            yield self.buffer.pop(self.next_index)
+            self.next_index += 1
+
+
+def _run_sync_item(fn: Callable[..., Any], index: int, value: Any) -> BulkItem:
+    start = time.perf_counter()
+    try:
+        return BulkItem(index, value, _invoke(fn, value), elapsed=time.perf_counter() - start)
+    except Exception as e:
+        return BulkItem(index, value, error=e, elapsed=time.perf_counter() - start)
+
+
+def bulk_call_sync(
+    fn: Callable[..., Any],
+    inputs: Iterable[Any],
+    *,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    ordered: bool = True,
+    on_progress: Optional[ProgressCallback] = None,
+) -> Iterator[BulkItem]:
+    """Call fn for every input on a thread pool with at most `concurrency` calls in flight."""
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    tracker = _Tracker(inputs, on_progress)
+    reorder = _Reorder(ordered)
+    window = concurrency * ORDERED_WINDOW_FACTOR if ordered else concurrency
+    source = enumerate(inputs)
+    exhausted = False
+    pending: Set[Future] = set()
+
+    pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="baml-bulk")
+    try:
+        while True:
+            # Refill up to the concurrency limit; in ordered mode also stop when too many
+            # finished items are waiting behind a slow head-of-line call.
+            while not exhausted and len(pending) < concurrency and len(pending) + len(reorder.buffer) < window:
+                try:
+                    index, value = next(source)
+                except StopIteration:
+                    exhausted = True
+                    break
+                # Run in a copy of the caller's context so contextvars (e.g. the current
+                # pipeline_trace span) reach the worker thread.
+                pending.add(pool.submit(contextvars.copy_context().run, _run_sync_item, fn, index, value))
+            if not pending:
+                return
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                item = future.result()
+                tracker.record(item)
+                yield from reorder.push(item)
+    finally:
+        # The consumer stopped early (break/close/exception): drop queued calls and return
+        # without waiting for the ones already running.
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+async def _run_async_item(fn: Callable[..., Awaitable[Any]], index: int, value: Any) -> BulkItem:
+    start = time.perf_counter()
+    try:
+        return BulkItem(index, value, await _invoke(fn, value), elapsed=time.perf_counter() - start)
+    except Exception as e:
+        return BulkItem(index, value, error=e, elapsed=time.perf_counter() - start)
+
+
+async def bulk_call_async(
+    fn: Callable[..., Awaitable[Any]],
+    inputs: Iterable[Any],
+    *,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    ordered: bool = True,
+    on_progress: Optional[ProgressCallback] = None,
+) -> AsyncIterator[BulkItem]:
+    """Await fn for every input with at most `concurrency` coroutines in flight."""
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    tracker = _Tracker(inputs, on_progress)
+    reorder = _Reorder(ordered)
+    window = concurrency * ORDERED_WINDOW_FACTOR if ordered else concurrency
+    source = enumerate(inputs)
+    exhausted = False
+    pending: Set[asyncio.Task] = set()
+
+    try:
+        while True:
+            while not exhausted and len(pending) < concurrency and len(pending) + len(reorder.buffer) < window:
+                try:
+                    index, value = next(source)
+                except StopIteration:
+                    exhausted = True
+                    break
+                pending.add(asyncio.ensure_future(_run_async_item(fn, index, value)))
+            if not pending:
+                return
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                item = task.result()
+                tracker.record(item)
+                for ready in reorder.push(item):
+                    yield ready
+    finally:
+        # The consumer stopped early (break/aclose/cancel): don't leave calls running.
+        for task in pending:
+            task.cancel()
+
+
+def extract_resumes(
+    resumes: Iterable[str],
+    *,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    ordered: bool = True,
+    on_progress: Optional[ProgressCallback] = None,
+    client: Any = None,
+) -> Iterator[BulkItem]:
+    """Bulk ExtractResume on the sync client (or a client from b.with_options(...))."""
+    if client is None:
+        from baml_client.sync_client import b as client
+    return bulk_call_sync(client.ExtractResume, resumes, concurrency=concurrency,
+                          ordered=ordered, on_progress=on_progress)
+
+
+def extract_resumes_async(
+    resumes: Iterable[str],
+    *,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    ordered: bool = True,
+    on_progress: Optional[ProgressCallback] = None,
+    client: Any = None,
+) -> AsyncIterator[BulkItem]:
+    """Bulk ExtractResume on the async client (or a client from b.with_options(...))."""
+    if client is None:
+        from baml_client.async_client import b as client
+    return bulk_call_async(client.ExtractResume, resumes, concurrency=concurrency,
+                           ordered=ordered, on_progress=on_progress)
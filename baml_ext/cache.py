@@ -0,0 +1,222 @@
+"""
+Disk-backed response cache and replay mode for BAML function calls.
+
+Wraps a client's call manager so call_function_sync / call_function_async
+first look up the raw LLM response in a SQLite cache. The key combines the
+function name, the arguments, and a hash of the rendered HTTP request
+(URL and body, which carry the client, model and prompt; headers are left
+out so API keys never reach the key). On a hit the stored response is parsed
+again with parse_response, so the current output types and TypeBuilder
+apply. Nothing is sent to the model.
+
+Entries are evicted least-recently-used once the cache grows past
+`max_bytes`. Modes:
+
+  read_write  serve hits, call and store on a miss (default)
+  replay      serve hits, raise CacheMissError on a miss (offline CI)
+  record      always call and overwrite the stored response
+
+The mode defaults to $BAML_CACHE_MODE and the location to $BAML_CACHE_DIR
+(~/.cache/research-assistant/baml otherwise). Streams are not cached.
+
+    from baml_client.sync_client import b
+    from baml_ext.cache import cached_client
+
+    b = cached_client(b)                   # or cached_client(b, mode="replay")
+    resume = b.ExtractResume(text)
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from baml_ext._manager import CallManagerWrapper, wrap_client
+
+CACHE_MODES = ("read_write", "replay", "record")
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "research-assistant", "baml")
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    function_name TEXT NOT NULL,
+    response TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_responses_last_used ON responses(last_used);
+"""
+
+
+class CacheMissError(LookupError):
+    """Raised in replay mode when a call has no cached response."""
+
+
+def cache_dir() -> str:
+    return os.environ.get("BAML_CACHE_DIR") or DEFAULT_CACHE_DIR
+
+
+def _jsonable(value: Any) -> Any:
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json")
+    return repr(value)
+
+
+def request_fingerprint(request: Any) -> str:
+    """sha256 of the rendered request's URL and body."""
+    body = getattr(request, "body", None)
+    text = body.text() if body is not None and hasattr(body, "text") else str(body)
+    digest = hashlib.sha256()
+    digest.update(str(getattr(request, "url", "")).encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(text.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def cache_key(function_name: str, args: Dict[str, Any], prompt_hash: str) -> str:
+    payload = json.dumps({"function": function_name, "args": args, "prompt": prompt_hash},
+                         sort_keys=True, ensure_ascii=False, default=_jsonable)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """SQLite store of raw LLM responses with LRU eviction under a size cap."""
+
+    def __init__(self, path: Optional[str] = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = path or os.path.join(cache_dir(), "responses.sqlite")
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            with self._conn:
+                self._conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (time.time(), key))
+        return row[0]
+
+    def put(self, key: str, function_name: str, response: str) -> None:
+        size = len(response.encode("utf-8"))
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                               (key, function_name, response, size, now, now))
+            self._evict()
+
+    def _evict(self) -> None:
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        freed = 0
+        victims = []
+        for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY last_used"):
+            if total - freed <= self.max_bytes:
+                break
+            victims.append((key,))
+            freed += size
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", victims)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        return {"entries": entries, "bytes": size, "hits": self.hits, "misses": self.misses}
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses")
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+class _CachedResult:
+    """Stands in for FunctionResult on a cache hit; the client only calls cast_to."""
+
+    def __init__(self, manager: Any, function_name: str, response: str):
+        self._manager = manager
+        self._function_name = function_name
+        self._response = response
+
+    def cast_to(self, *args: Any) -> Any:
+        return self._manager.parse_response(function_name=self._function_name,
+                                            llm_response=self._response, mode="request")
+
+
+def _raw_response(collector: Any) -> Optional[str]:
+    last = getattr(collector, "last", None)
+    return getattr(last, "raw_llm_response", None) if last is not None else None
+
+
+class CachingCallManager(CallManagerWrapper):
+    def __init__(self, inner: Any, cache: ResponseCache, mode: Optional[str] = None, collectors=None):
+        super().__init__(inner, collectors)
+        mode = mode or os.environ.get("BAML_CACHE_MODE") or "read_write"
+        if mode not in CACHE_MODES:
+            raise ValueError(f"unknown cache mode {mode!r}, expected one of {CACHE_MODES}")
+        self._cache = cache
+        self._mode = mode
+
+    def _lookup(self, function_name: str, key: str) -> Optional[_CachedResult]:
+        if self._mode == "record":
+            return None
+        response = self._cache.get(key)
+        if response is not None:
+            return _CachedResult(self._inner, function_name, response)
+        if self._mode == "replay":
+            raise CacheMissError(f"no cached response for {function_name} (key {key[:12]})")
+        return None
+
+    def _store(self, function_name: str, key: str, collector: Any) -> None:
+        response = _raw_response(collector)
+        if response is None:
+            return
+        try:
+            # Only keep responses that parse; a bad completion should be retried, not replayed.
+            self._inner.parse_response(function_name=function_name, llm_response=response, mode="request")
+        except Exception:
+            return
+        self._cache.put(key, function_name, response)
+
+    def call_function_sync(self, *, function_name: str, args: Any) -> Any:
+        request = self._inner.create_http_request_sync(function_name=function_name, args=args, mode="request")
+        key = cache_key(function_name, args, request_fingerprint(request))
+        hit = self._lookup(function_name, key)
+        if hit is not None:
+            return hit
+        from baml_py import Collector
+        collector = Collector(name="baml_ext.cache")
+        result = self._with_collector(collector).call_function_sync(function_name=function_name, args=args)
+        self._store(function_name, key, collector)
+        return result
+
+    async def call_function_async(self, *, function_name: str, args: Any) -> Any:
+        request = await self._inner.create_http_request_async(function_name=function_name, args=args, mode="request")
+        key = cache_key(function_name, args, request_fingerprint(request))
+        hit = self._lookup(function_name, key)
+        if hit is not None:
+            return hit
+        from baml_py import Collector
+        collector = Collector(name="baml_ext.cache")
+        result = await self._with_collector(collector).call_function_async(function_name=function_name, args=args)
+        self._store(function_name, key, collector)
+        return result
+
+
+def cached_client(client: Any, cache: Optional[ResponseCache] = None, mode: Optional[str] = None) -> Any:
+    """A copy of a generated sync or async client whose function calls go through the cache."""
+    cache = cache or ResponseCache()
+    return wrap_client(client, lambda manager: CachingCallManager(manager, cache, mode))
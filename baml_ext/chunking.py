@@ -0,0 +1,202 @@
+"""
+Chunked map-reduce extraction for inputs longer than one prompt should be.
+
+ExtractResume (and any extraction function written in the same style)
+sends the whole input as one prompt. A full PDF can go past the model's
+context window, and even when it fits, one long call is much slower than
+several short ones in parallel. This module:
+
+  split_text        splits on structural boundaries: headings and section
+                    labels, then blank lines, lines and sentences, and only
+                    cuts mid-sentence when a single sentence is too long.
+                    Adjacent pieces are packed into chunks of at most
+                    `max_tokens` (estimated).
+  chunked_call_*    runs the extraction over the chunks with bounded
+                    concurrency (baml_ext.bulk) and merges the typed results
+  merge_models      merges partial pydantic results of one type: list fields
+                    are a union in first-seen order, deduplicated after
+                    whitespace/case normalization; other fields keep the
+                    first non-empty value
+
+Inputs that fit in one chunk are passed through as a single call. If any
+chunk fails, the call raises that chunk's exception rather than returning a
+result with a hole in it.
+
+    from baml_ext.chunking import extract_resume_chunked
+
+    resume = extract_resume_chunked(pdf_text, max_tokens=3000, concurrency=8)
+"""
+
+import json
+import re
+from typing import Any, Awaitable, Callable, List, Sequence, TypeVar
+
+from baml_ext.bulk import DEFAULT_CONCURRENCY, bulk_call_async, bulk_call_sync
+
+T = TypeVar("T")
+
+DEFAULT_CHUNK_TOKENS = 4000
+
+# Zero-width split points, coarsest first. Each split keeps every character,
+# so joining the pieces of a level gives back its input.
+_BOUNDARIES = [
+    # Markdown headings, LaTeX sections and "Experience:"-style labels on their own line.
+    re.compile(r"(?m)^(?=#{1,6}\s|\\(?:sub)*section\*?\{|[A-Z][^\n:]{0,40}:[ \t]*$)"),
+    re.compile(r"(?<=\n\n)"),
+    re.compile(r"(?<=\n)"),
+    re.compile(r"(?<=[.!?;。！？；])(?=\s)"),
+]
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count: ~4 ASCII characters per token, one token per other character (CJK)."""
+    ascii_chars = len(text.encode("ascii", "ignore"))
+    return (ascii_chars + 3) // 4 + (len(text) - ascii_chars)
+
+
+def _hard_cut(text: str, max_tokens: int) -> List[str]:
+    pieces = []
+    while text:
+        size = max(1, int(len(text) * max_tokens / max(1, estimate_tokens(text))))
+        while size > 1 and estimate_tokens(text[:size]) > max_tokens:
+            size = size * 9 // 10
+        pieces.append(text[:size])
+        text = text[size:]
+    return pieces
+
+
+def _pieces(text: str, max_tokens: int, level: int) -> List[str]:
+    """Pieces of at most max_tokens each, split at the coarsest boundary that makes them fit."""
+    if estimate_tokens(text) <= max_tokens:
+        return [text]
+    if level == len(_BOUNDARIES):
+        return _hard_cut(text, max_tokens)
+    pieces = []
+    for part in _BOUNDARIES[level].split(text):
+        if part:
+            pieces.extend(_pieces(part, max_tokens, level + 1))
+    return pieces
+
+
+def split_text(text: str, max_tokens: int = DEFAULT_CHUNK_TOKENS) -> List[str]:
+    """Split text into chunks of at most max_tokens estimated tokens on structural boundaries."""
+    if max_tokens < 1:
+        raise ValueError("max_tokens must be at least 1")
+    chunks: List[str] = []
+    current, current_tokens = "", 0
+    for piece in _pieces(text, max_tokens, 0):
+        tokens = estimate_tokens(piece)
+        if current and current_tokens + tokens > max_tokens:
+            chunks.append(current)
+            current, current_tokens = "", 0
+        current += piece
+        current_tokens += tokens
+    chunks.append(current)
+    return [chunk for chunk in chunks if chunk.strip()] or [text]
+
+
+def _dedupe_key(value: Any) -> Any:
+    if isinstance(value, str):
+        return " ".join(value.split()).casefold()
+    if hasattr(value, "model_dump"):
+        return json.dumps(value.model_dump(mode="json"), sort_keys=True)
+    return value
+
+
+def _empty(value: Any) -> bool:
+    return value is None or (isinstance(value, str) and not value.strip())
+
+
+def merge_models(results: Sequence[T]) -> T:
+    """Merge partial results of one pydantic type (see module docstring)."""
+    if not results:
+        raise ValueError("nothing to merge")
+    first = results[0]
+    merged = {}
+    for name in type(first).model_fields:
+        values = [getattr(result, name) for result in results]
+        if isinstance(values[0], list):
+            seen, union = set(), []
+            for value in values:
+                for entry in value or []:
+                    key = _dedupe_key(entry)
+                    if key not in seen:
+                        seen.add(key)
+                        union.append(entry)
+            merged[name] = union
+        else:
+            merged[name] = next((value for value in values if not _empty(value)), values[0])
+    return type(first).model_validate(merged)
+
+
+def merge_resumes(resumes: Sequence[Any]) -> Any:
+    """One types.Resume from the per-chunk resumes: skills and experience are unioned."""
+    return merge_models(resumes)
+
+
+def chunked_call_sync(
+    fn: Callable[[str], T],
+    text: str,
+    merge: Callable[[List[T]], T] = merge_models,
+    *,
+    max_tokens: int = DEFAULT_CHUNK_TOKENS,
+    concurrency: int = DEFAULT_CONCURRENCY,
+) -> T:
+    """fn over the chunks of text on a thread pool, merged with `merge`."""
+    chunks = split_text(text, max_tokens)
+    if len(chunks) == 1:
+        return fn(chunks[0])
+    results = []
+    items = bulk_call_sync(fn, chunks, concurrency=concurrency)
+    try:
+        for item in items:
+            if not item.ok:
+                raise item.error
+            results.append(item.result)
+    finally:
+        # Drops the other chunks' queued calls and returns without waiting for running ones.
+        items.close()
+    return merge(results)
+
+
+async def chunked_call_async(
+    fn: Callable[[str], Awaitable[T]],
+    text: str,
+    merge: Callable[[List[T]], T] = merge_models,
+    *,
+    max_tokens: int = DEFAULT_CHUNK_TOKENS,
+    concurrency: int = DEFAULT_CONCURRENCY,
+) -> T:
+    """Await fn over the chunks of text concurrently, merged with `merge`."""
+    chunks = split_text(text, max_tokens)
+    if len(chunks) == 1:
+        return await fn(chunks[0])
+    results = []
+    items = bulk_call_async(fn, chunks, concurrency=concurrency)
+    try:
+        async for item in items:
+            if not item.ok:
+                raise item.error
+            results.append(item.result)
+    finally:
+        # Cancels the other chunks' calls when one has failed.
+        await items.aclose()
+    return merge(results)
+
+
+def extract_resume_chunked(text: str, *, max_tokens: int = DEFAULT_CHUNK_TOKENS,
+                           concurrency: int = DEFAULT_CONCURRENCY, client: Any = None) -> Any:
+    """ExtractResume on the sync client for text of any length."""
+    if client is None:
+        from baml_client.sync_client import b as client
+    return chunked_call_sync(client.ExtractResume, text, merge_resumes,
+                             max_tokens=max_tokens, concurrency=concurrency)
+
+
+async def extract_resume_chunked_async(text: str, *, max_tokens: int = DEFAULT_CHUNK_TOKENS,
+                                       concurrency: int = DEFAULT_CONCURRENCY, client: Any = None) -> Any:
+    """ExtractResume on the async client for text of any length."""
+    if client is None:
+        from baml_client.async_client import b as client
+    return await chunked_call_async(client.ExtractResume, text, merge_resumes,
+                                    max_tokens=max_tokens, concurrency=concurrency)
@@ -0,0 +1,225 @@
+"""
+Hedged BAML calls for tail-latency reduction.
+
+`OpenaiFallback` only moves to the next client after a failure, so a slow
+call that eventually succeeds blocks for its full duration. A hedged call
+starts on the primary client. If it has not returned within the given
+percentile of recent primary latencies, a duplicate goes to the hedge
+client and the first successful response wins. If one attempt fails, the
+other is still awaited. The call only fails if both attempts fail.
+
+Extra traffic is capped by a token budget. Every call earns `budget_ratio`
+tokens (up to `budget_burst`), and every hedge spends one. With the default
+0.1, hedges add at most about 10% more requests.
+
+The async path cancels the losing task. The sync path runs attempts on a
+shared thread pool. A losing thread cannot be interrupted, so it is
+abandoned and its result discarded.
+
+Only primary attempts are sampled, including ones that lost to a hedge:
+a primary that finishes late still records its latency, and a cancelled
+one records its elapsed time as a lower bound. Sampling only winners would
+drop exactly the slow primaries and let the trigger drift down.
+
+    from baml_client.async_client import b
+    from baml_ext.hedging import HedgePolicy, hedged_client
+
+    policy = HedgePolicy(primary="CustomGPT4oMini", hedge="CustomHaiku", percentile=90)
+    fast = hedged_client(b, policy)
+    resume = await fast.ExtractResume(text)
+    print(policy.snapshot())
+"""
+
+import asyncio
+import collections
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from baml_ext._manager import CallManagerWrapper, wrap_client
+from baml_ext.routing import primary_registry
+
+SYNC_HEDGE_WORKERS = 32
+
+
+class HedgePolicy:
+    def __init__(
+        self,
+        primary: str = "CustomGPT4oMini",
+        hedge: str = "CustomHaiku",
+        percentile: float = 95.0,
+        window: int = 200,
+        min_samples: int = 20,
+        initial_delay_ms: float = 1000.0,
+        budget_ratio: float = 0.1,
+        budget_burst: float = 10.0,
+    ):
+        self.primary = primary
+        self.hedge = hedge
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.initial_delay_ms = initial_delay_ms
+        self.budget_ratio = budget_ratio
+        self.budget_burst = budget_burst
+        self._latencies: collections.deque = collections.deque(maxlen=window)
+        self._tokens = budget_burst
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.budget_denied = 0
+
+    def hedge_delay(self) -> float:
+        """Seconds to wait for the primary before hedging."""
+        with self._lock:
+            if len(self._latencies) < self.min_samples:
+                return self.initial_delay_ms / 1000.0
+            ordered = sorted(self._latencies)
+        rank = min(len(ordered) - 1, int(self.percentile / 100.0 * (len(ordered) - 1) + 0.5))
+        return ordered[rank]
+
+    def start_call(self) -> None:
+        with self._lock:
+            self.calls += 1
+            self._tokens = min(self.budget_burst, self._tokens + self.budget_ratio)
+
+    def try_hedge(self) -> bool:
+        with self._lock:
+            if self._tokens < 1.0:
+                self.budget_denied += 1
+                return False
+            self._tokens -= 1.0
+            self.hedges += 1
+            return True
+
+    def record(self, latency: float) -> None:
+        """A primary attempt's latency in seconds."""
+        with self._lock:
+            self._latencies.append(latency)
+
+    def record_hedge_win(self) -> None:
+        with self._lock:
+            self.hedge_wins += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            samples = len(self._latencies)
+            stats = {"calls": self.calls, "hedges": self.hedges, "hedge_wins": self.hedge_wins,
+                     "budget_denied": self.budget_denied, "tokens": self._tokens, "samples": samples}
+        stats["hedge_delay_ms"] = self.hedge_delay() * 1000.0
+        return stats
+
+
+_sync_pool: Optional[ThreadPoolExecutor] = None
+_sync_pool_lock = threading.Lock()
+
+
+def _executor() -> ThreadPoolExecutor:
+    global _sync_pool
+    with _sync_pool_lock:
+        if _sync_pool is None:
+            _sync_pool = ThreadPoolExecutor(max_workers=SYNC_HEDGE_WORKERS, thread_name_prefix="baml-hedge")
+        return _sync_pool
+
+
+def _timed(fn: Callable[[], Any]) -> Tuple[Any, float]:
+    start = time.perf_counter()
+    return fn(), time.perf_counter() - start
+
+
+async def _timed_async(coro) -> Tuple[Any, float]:
+    start = time.perf_counter()
+    return await coro, time.perf_counter() - start
+
+
+def _sample_primary(policy: HedgePolicy, started: float) -> Callable[[Any], None]:
+    """Done callback for the primary attempt, whether it won, lost or was cancelled."""
+    def on_done(future: Any) -> None:
+        if future.cancelled():
+            policy.record(time.perf_counter() - started)
+        elif future.exception() is None:
+            policy.record(future.result()[1])
+    return on_done
+
+
+class HedgingCallManager(CallManagerWrapper):
+    def __init__(self, inner: Any, policy: HedgePolicy,
+                 registry_factory: Callable[[str], Any] = primary_registry, collectors=None):
+        super().__init__(inner, collectors)
+        self._policy = policy
+        self._registry_factory = registry_factory
+        self._registries: Dict[str, Any] = {}
+
+    def _on(self, name: str) -> Any:
+        registry = self._registries.get(name)
+        if registry is None:
+            registry = self._registries[name] = self._registry_factory(name)
+        return self._inner.merge_options({"client_registry": registry})
+
+    def call_function_sync(self, *, function_name: str, args: Any) -> Any:
+        policy = self._policy
+        policy.start_call()
+        pool = _executor()
+        primary = pool.submit(_timed, lambda: self._on(policy.primary).call_function_sync(
+            function_name=function_name, args=args))
+        primary.add_done_callback(_sample_primary(policy, time.perf_counter()))
+        done, _ = wait([primary], timeout=policy.hedge_delay())
+        if done or not policy.try_hedge():
+            return primary.result()[0]
+
+        hedge = pool.submit(_timed, lambda: self._on(policy.hedge).call_function_sync(
+            function_name=function_name, args=args))
+        pending = {primary, hedge}
+        errors: Dict[Future, BaseException] = {}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is not None:
+                    errors[future] = future.exception()
+                    continue
+                # The other attempt keeps running in its thread; its result is dropped.
+                if future is hedge:
+                    policy.record_hedge_win()
+                return future.result()[0]
+        raise errors.get(primary) or errors[hedge]
+
+    async def call_function_async(self, *, function_name: str, args: Any) -> Any:
+        policy = self._policy
+        policy.start_call()
+        primary = asyncio.ensure_future(_timed_async(self._on(policy.primary).call_function_async(
+            function_name=function_name, args=args)))
+        primary.add_done_callback(_sample_primary(policy, time.perf_counter()))
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=policy.hedge_delay())
+        except asyncio.CancelledError:
+            primary.cancel()
+            raise
+        if done or not policy.try_hedge():
+            return (await primary)[0]
+
+        hedge = asyncio.ensure_future(_timed_async(self._on(policy.hedge).call_function_async(
+            function_name=function_name, args=args)))
+        pending = {primary, hedge}
+        errors: Dict[asyncio.Future, BaseException] = {}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        errors[task] = task.exception()
+                        continue
+                    if task is hedge:
+                        policy.record_hedge_win()
+                    return task.result()[0]
+        finally:
+            for task in pending:
+                task.cancel()
+        raise errors.get(primary) or errors[hedge]
+
+
+def hedged_client(client: Any, policy: Optional[HedgePolicy] = None,
+                  registry_factory: Callable[[str], Any] = primary_registry) -> Any:
+    """A copy of a generated client whose function calls are hedged according to `policy`."""
+    policy = policy or HedgePolicy()
+    return wrap_client(client, lambda manager: HedgingCallManager(manager, policy, registry_factory))
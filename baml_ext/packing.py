@@ -0,0 +1,181 @@
+"""
+Prompt packing for per-paper labeling: many abstracts per TagPapers call.
+
+Tagging one abstract per call spends most of each request on fixed
+overhead (instructions, output format, network round trip) and burns one
+unit of rate limit per paper. TagPapers (baml_src/papers.baml) takes a list
+of papers and returns one PaperTags per paper. This driver:
+
+  load_papers   reads paper_entries.json files (the Notion-style entries the
+                search agents write) into PaperAbstracts keyed by arXiv id
+  pack_papers   greedily packs papers, in order, into groups that fit a
+                prompt token budget and a per-call paper cap
+  tag_papers    runs TagPapers over the packs with bounded concurrency and
+                maps the results back by arxiv_id; papers the model skipped
+                or mislabeled are packed again once, in smaller groups
+  apply_tags    writes the tags into each entry's "Tags" multi_select
+
+With the defaults, 100 abstracts take about 5 calls instead of 100.
+
+Usage:
+  python -m baml_ext.packing multiagent_papers/*/paper_entries.json
+  python -m baml_ext.packing path/to/paper_entries.json --write --max_papers 30
+"""
+
+import argparse
+import json
+import os
+import re
+from typing import Any, Dict, Iterable, List, Optional
+
+from baml_ext.bulk import DEFAULT_CONCURRENCY, bulk_call_sync
+from baml_ext.chunking import estimate_tokens
+
+DEFAULT_PACK_TOKENS = 6000
+DEFAULT_MAX_PAPERS = 20
+# Id line, separators and this paper's share of the JSON answer.
+PER_PAPER_OVERHEAD_TOKENS = 40
+
+_ARXIV_ID = re.compile(r"\d{4}\.\d{4,5}(?:v\d+)?")
+
+
+def _rich_text(prop: Dict[str, Any], kind: str) -> str:
+    return "".join(part.get("text", {}).get("content", "") for part in prop.get(kind) or [])
+
+
+def entry_arxiv_id(item: Dict[str, Any]) -> Optional[str]:
+    """The arXiv id of a paper_entries.json item, from "arxiv_id" or else its pdf_path."""
+    if item.get("arxiv_id"):
+        return item["arxiv_id"]
+    match = _ARXIV_ID.search(os.path.basename((item.get("pdf_path") or "").replace("\\", "/")))
+    return match.group(0) if match else None
+
+
+def read_entries(path: str) -> Optional[List[Dict[str, Any]]]:
+    """The items of a paper_entries.json file, or None if it is empty or not valid JSON."""
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    if not text.strip():
+        return None
+    try:
+        return json.loads(text)
+    except ValueError as e:
+        print(f"skipping {path}: {e}")
+        return None
+
+
+def load_papers(paths: Iterable[str]) -> Dict[str, Dict[str, str]]:
+    """{arxiv_id: {"arxiv_id", "title", "abstract"}} for every entry with an id and an abstract."""
+    papers: Dict[str, Dict[str, str]] = {}
+    for path in paths:
+        for item in read_entries(path) or []:
+            arxiv_id = entry_arxiv_id(item)
+            entry = item.get("entry", {})
+            abstract = _rich_text(entry.get("Abstract", {}), "rich_text").strip()
+            if arxiv_id and abstract:
+                papers[arxiv_id] = {"arxiv_id": arxiv_id,
+                                    "title": _rich_text(entry.get("Name", {}), "title").strip(),
+                                    "abstract": abstract}
+    return papers
+
+
+def paper_tokens(paper: Dict[str, str]) -> int:
+    return estimate_tokens(paper["title"]) + estimate_tokens(paper["abstract"]) + PER_PAPER_OVERHEAD_TOKENS
+
+
+def pack_papers(papers: List[Dict[str, str]], max_tokens: int = DEFAULT_PACK_TOKENS,
+                max_papers: int = DEFAULT_MAX_PAPERS) -> List[List[Dict[str, str]]]:
+    """Consecutive groups of papers, each within max_tokens and max_papers (an oversized paper goes alone)."""
+    packs: List[List[Dict[str, str]]] = []
+    current: List[Dict[str, str]] = []
+    used = 0
+    for paper in papers:
+        tokens = paper_tokens(paper)
+        if current and (used + tokens > max_tokens or len(current) >= max_papers):
+            packs.append(current)
+            current, used = [], 0
+        current.append(paper)
+        used += tokens
+    if current:
+        packs.append(current)
+    return packs
+
+
+def _normalize_id(value: str) -> str:
+    return value.strip().strip("[]").strip()
+
+
+def _tag_round(client: Any, packs: List[List[Dict[str, str]]], concurrency: int,
+               results: Dict[str, List[str]]) -> None:
+    from baml_client import types
+
+    inputs = [{"papers": [types.PaperAbstract(**paper) for paper in pack]} for pack in packs]
+    for item in bulk_call_sync(client.TagPapers, inputs, concurrency=concurrency):
+        if not item.ok:
+            print(f"TagPapers failed for {len(packs[item.index])} papers: {item.error}")
+            continue
+        wanted = {paper["arxiv_id"] for paper in packs[item.index]}
+        for tags in item.result:
+            arxiv_id = _normalize_id(tags.arxiv_id)
+            # Ids the model invented or copied from another pack are ignored.
+            if arxiv_id in wanted:
+                results[arxiv_id] = [tag.strip() for tag in tags.tags if tag.strip()]
+
+
+def tag_papers(papers: Dict[str, Dict[str, str]], *, client: Any = None,
+               max_tokens: int = DEFAULT_PACK_TOKENS, max_papers: int = DEFAULT_MAX_PAPERS,
+               concurrency: int = DEFAULT_CONCURRENCY) -> Dict[str, List[str]]:
+    """{arxiv_id: tags} for the given papers, using as few TagPapers calls as the budget allows."""
+    if client is None:
+        from baml_client.sync_client import b as client
+    results: Dict[str, List[str]] = {}
+    _tag_round(client, pack_papers(list(papers.values()), max_tokens, max_papers), concurrency, results)
+    missing = [paper for arxiv_id, paper in papers.items() if arxiv_id not in results]
+    if missing:
+        # One retry in smaller packs; long lists are where models drop entries.
+        retry_packs = pack_papers(missing, max_tokens, max(1, max_papers // 4))
+        _tag_round(client, retry_packs, concurrency, results)
+    return results
+
+
+def apply_tags(path: str, tags: Dict[str, List[str]]) -> int:
+    """Write tags into the "Tags" property of each entry in path; returns the number of entries updated."""
+    items = read_entries(path)
+    if items is None:
+        return 0
+    updated = 0
+    for item in items:
+        arxiv_id = entry_arxiv_id(item)
+        if arxiv_id in tags:
+            item.setdefault("entry", {})["Tags"] = {"multi_select": [{"name": tag} for tag in tags[arxiv_id]]}
+            updated += 1
+    if updated:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(items, f, indent=4)
+    return updated
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Tag papers from paper_entries.json with packed TagPapers calls")
+    p.add_argument("paths", nargs="+", help="paper_entries.json files")
+    p.add_argument("--max_tokens", type=int, default=DEFAULT_PACK_TOKENS, help="Prompt token budget per call")
+    p.add_argument("--max_papers", type=int, default=DEFAULT_MAX_PAPERS, help="Papers per call")
+    p.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Calls in flight")
+    p.add_argument("--write", action="store_true", help="Write the tags back into the files")
+    args = p.parse_args()
+
+    papers = load_papers(args.paths)
+    packs = pack_papers(list(papers.values()), args.max_tokens, args.max_papers)
+    print(f"{len(papers)} papers in {len(packs)} calls")
+    tags = tag_papers(papers, max_tokens=args.max_tokens, max_papers=args.max_papers,
+                      concurrency=args.concurrency)
+    print(f"tagged {len(tags)}/{len(papers)} papers")
+    if args.write:
+        for path in args.paths:
+            print(f"{path}: {apply_tags(path, tags)} entries updated")
+    else:
+        print(json.dumps(tags, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
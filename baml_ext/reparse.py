@@ -0,0 +1,228 @@
+"""
+Bulk re-parsing of archived raw LLM responses on a process pool.
+
+After a schema change, stored completions can be parsed again with
+b.parse.<Function>(response) instead of calling the model again. Parsing
+is CPU-bound, so this module spreads it over worker processes. The client
+is pickled into each worker once (BamlSyncClient defines __getstate__ /
+__setstate__), so a client from b.with_options(tb=...) parses with its
+TypeBuilder. Records go out in batches, with a bounded number of batches in
+flight, so a 100k-line archive is streamed rather than loaded.
+
+Archives:
+  *.jsonl    one JSON object per line: {"id": ..., "function": ..., "response": ...}
+             (field names are configurable; the id defaults to the line number
+             and the function to --function)
+  *.sqlite   a baml_ext.cache database; every stored response is re-parsed
+
+Output is JSON Lines, appended and flushed batch by batch:
+
+  {"id": ..., "function": ..., "ok": true, "result": {...}}
+  {"id": ..., "function": ..., "ok": false, "error": "..."}
+
+With --resume, a line cut off by an interruption is truncated away and ids
+already in the output file are skipped, so an interrupted run continues
+where it stopped.
+
+Usage:
+  python -m baml_ext.reparse archive.jsonl parsed.jsonl --workers 8
+  python -m baml_ext.reparse ~/.cache/research-assistant/baml/responses.sqlite parsed.jsonl --resume
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sqlite3
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+DEFAULT_BATCH_SIZE = 256
+# Batches submitted but not yet written, per worker.
+BATCHES_IN_FLIGHT_PER_WORKER = 2
+
+Record = Tuple[Any, str, str]  # (id, function name, raw response)
+
+_worker_client: Any = None
+
+
+def read_jsonl_archive(path: str, function: Optional[str] = None, id_field: str = "id",
+                       function_field: str = "function", response_field: str = "response") -> Iterator[Record]:
+    with open(path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            name = entry.get(function_field) or function
+            if not name:
+                raise ValueError(f"{path}:{line_no}: no {function_field!r} field and no default function")
+            yield entry.get(id_field, line_no), name, entry[response_field]
+
+
+def read_cache_archive(path: str, function: Optional[str] = None) -> Iterator[Record]:
+    conn = sqlite3.connect(path)
+    try:
+        query = "SELECT key, function_name, response FROM responses"
+        rows = conn.execute(query + " WHERE function_name = ?", (function,)) if function else conn.execute(query)
+        yield from rows
+    finally:
+        conn.close()
+
+
+def read_archive(path: str, function: Optional[str] = None, **fields: str) -> Iterator[Record]:
+    if path.endswith((".sqlite", ".db")):
+        return read_cache_archive(path, function)
+    return read_jsonl_archive(path, function, **fields)
+
+
+def done_ids(output_path: str) -> Set[Any]:
+    """Ids already written to `output_path` by an earlier run."""
+    ids: Set[Any] = set()
+    if not os.path.exists(output_path):
+        return ids
+    with open(output_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                ids.add(json.loads(line)["id"])
+            except (ValueError, KeyError):
+                # A line cut off by an interrupted run; that record is parsed again.
+                continue
+    return ids
+
+
+def truncate_partial_line(output_path: str, chunk_size: int = 65536) -> int:
+    """Cut `output_path` back to its last newline; returns the number of bytes removed."""
+    if not os.path.exists(output_path):
+        return 0
+    with open(output_path, "r+b") as f:
+        size = f.seek(0, os.SEEK_END)
+        end = size
+        while end > 0:
+            start = max(0, end - chunk_size)
+            f.seek(start)
+            newline = f.read(end - start).rfind(b"\n")
+            if newline != -1:
+                keep = start + newline + 1
+                break
+            end = start
+        else:
+            keep = 0
+        f.truncate(keep)
+    return size - keep
+
+
+def _init_worker(client: Any) -> None:
+    global _worker_client
+    _worker_client = client
+
+
+def _jsonable(value: Any) -> Any:
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json")
+    return value
+
+
+def _parse_batch(batch: List[Record]) -> List[Dict[str, Any]]:
+    out = []
+    for record_id, function, response in batch:
+        row: Dict[str, Any] = {"id": record_id, "function": function}
+        try:
+            row.update(ok=True, result=_jsonable(getattr(_worker_client.parse, function)(response)))
+        except Exception as e:
+            row.update(ok=False, error=f"{type(e).__name__}: {e}")
+        out.append(row)
+    return out
+
+
+def _batches(records: Iterable[Record], size: int) -> Iterator[List[Record]]:
+    batch: List[Record] = []
+    for record in records:
+        batch.append(record)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def reparse(
+    records: Iterable[Record],
+    output_path: str,
+    *,
+    client: Any = None,
+    workers: Optional[int] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    resume: bool = False,
+    on_progress: Optional[Callable[[int, float], None]] = None,
+) -> Dict[str, Any]:
+    """Parse every record on a process pool and append the results to output_path."""
+    if client is None:
+        from baml_client.sync_client import b as client
+    workers = workers or os.cpu_count() or 1
+    if resume:
+        # Appending after a partial last line would glue the next row onto it.
+        truncate_partial_line(output_path)
+    skip = done_ids(output_path) if resume else set()
+    if skip:
+        records = (record for record in records if record[0] not in skip)
+
+    stats = {"parsed": 0, "failed": 0, "skipped": len(skip)}
+    start = time.perf_counter()
+    source = _batches(records, batch_size)
+    pending: Set[Future] = set()
+    # spawn, not fork: the parent may already hold the BAML runtime's native threads.
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker,
+                             initargs=(client,)) as pool, \
+            open(output_path, "a" if resume else "w", encoding="utf-8") as out:
+        exhausted = False
+        while True:
+            while not exhausted and len(pending) < workers * BATCHES_IN_FLIGHT_PER_WORKER:
+                batch = next(source, None)
+                if batch is None:
+                    exhausted = True
+                    break
+                pending.add(pool.submit(_parse_batch, batch))
+            if not pending:
+                break
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                for row in future.result():
+                    out.write(json.dumps(row, ensure_ascii=False) + "\n")
+                    stats["parsed" if row["ok"] else "failed"] += 1
+            out.flush()
+            if on_progress is not None:
+                on_progress(stats["parsed"] + stats["failed"], time.perf_counter() - start)
+    stats["elapsed"] = time.perf_counter() - start
+    return stats
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Re-parse archived raw LLM responses on a process pool")
+    p.add_argument("archive", help="JSONL archive or baml_ext.cache SQLite database")
+    p.add_argument("output", help="JSONL file for the parsed results")
+    p.add_argument("--function", default=None, help="BAML function for records without one (e.g. ExtractResume)")
+    p.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    p.add_argument("--batch_size", type=int, default=DEFAULT_BATCH_SIZE, help="Records per task")
+    p.add_argument("--resume", action="store_true", help="Skip ids already present in the output")
+    p.add_argument("--id_field", default="id")
+    p.add_argument("--function_field", default="function")
+    p.add_argument("--response_field", default="response")
+    args = p.parse_args()
+
+    def progress(count: int, elapsed: float) -> None:
+        print(f"\r{count} parsed, {count / elapsed if elapsed > 0 else 0.0:.0f}/s", end="", file=sys.stderr)
+
+    records = read_archive(args.archive, args.function, id_field=args.id_field,
+                           function_field=args.function_field, response_field=args.response_field)
+    stats = reparse(records, args.output, workers=args.workers, batch_size=args.batch_size,
+                    resume=args.resume, on_progress=progress)
+    print(file=sys.stderr)
+    print(f"{stats['parsed']} parsed, {stats['failed']} failed, {stats['skipped']} skipped "
+          f"in {stats['elapsed']:.1f}s -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""
+Latency-aware adaptive routing between BAML clients.
+
+A drop-in alternative to the static `CustomFast` round-robin. The router
+keeps an exponentially weighted moving average of latency and error rate
+for each candidate client, fed from a per-call Collector. Most calls go to
+the client with the best score (latency inflated by its error rate) among
+the healthy ones. A small probe share goes to the others so a recovered
+provider is noticed. Clients with fewer than `min_samples` observations are
+tried first.
+
+Each call is pinned to the chosen client with a ClientRegistry whose
+primary is that client. Streams are routed too but do not update the
+statistics.
+
+    from baml_client.sync_client import b
+    from baml_ext.routing import AdaptiveRouter, routed_client
+
+    router = AdaptiveRouter(["CustomGPT4oMini", "CustomHaiku"])
+    fast = routed_client(b, router)
+    resume = fast.ExtractResume(text)
+    print(router.snapshot())
+"""
+
+import random
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, Optional, Sequence
+
+from baml_ext._manager import CallManagerWrapper, wrap_client
+
+DEFAULT_CANDIDATES = ("CustomGPT4oMini", "CustomHaiku")
+
+
+@dataclass
+class ClientStats:
+    latency_ms: float = 0.0
+    error_rate: float = 0.0
+    samples: int = 0
+    chosen: int = 0
+
+
+class AdaptiveRouter:
+    def __init__(
+        self,
+        candidates: Sequence[str] = DEFAULT_CANDIDATES,
+        alpha: float = 0.2,
+        probe_share: float = 0.05,
+        min_samples: int = 3,
+        unhealthy_error_rate: float = 0.5,
+        error_penalty: float = 4.0,
+        seed: Optional[int] = None,
+    ):
+        if not candidates:
+            raise ValueError("AdaptiveRouter needs at least one candidate client")
+        self.candidates = list(candidates)
+        self.alpha = alpha
+        self.probe_share = probe_share
+        self.min_samples = min_samples
+        self.unhealthy_error_rate = unhealthy_error_rate
+        self.error_penalty = error_penalty
+        self._stats: Dict[str, ClientStats] = {name: ClientStats() for name in self.candidates}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _score(self, stats: ClientStats) -> float:
+        return stats.latency_ms * (1.0 + self.error_penalty * stats.error_rate)
+
+    def best(self) -> str:
+        with self._lock:
+            return self._best_locked()
+
+    def _best_locked(self) -> str:
+        healthy = [n for n in self.candidates if self._stats[n].error_rate < self.unhealthy_error_rate]
+        return min(healthy or self.candidates, key=lambda n: self._score(self._stats[n]))
+
+    def choose(self) -> str:
+        with self._lock:
+            cold = [n for n in self.candidates if self._stats[n].samples < self.min_samples]
+            if cold:
+                name = min(cold, key=lambda n: self._stats[n].chosen)
+            else:
+                name = self._best_locked()
+                others = [n for n in self.candidates if n != name]
+                if others and self._rng.random() < self.probe_share:
+                    name = self._rng.choice(others)
+            self._stats[name].chosen += 1
+            return name
+
+    def record(self, name: str, latency_ms: float, ok: bool) -> None:
+        with self._lock:
+            stats = self._stats[name]
+            error = 0.0 if ok else 1.0
+            if stats.samples == 0:
+                stats.latency_ms, stats.error_rate = latency_ms, error
+            else:
+                stats.error_rate += self.alpha * (error - stats.error_rate)
+                # A failed call's latency says little about the next success; keep the estimate.
+                if ok:
+                    stats.latency_ms += self.alpha * (latency_ms - stats.latency_ms)
+            stats.samples += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {name: dict(asdict(stats), score=self._score(stats)) for name, stats in self._stats.items()}
+
+
+def primary_registry(client_name: str) -> Any:
+    """A ClientRegistry that only switches the primary to a client defined in baml_src."""
+    from baml_py import ClientRegistry
+
+    registry = ClientRegistry()
+    registry.set_primary(client_name)
+    return registry
+
+
+def _duration_ms(collector: Any) -> Optional[float]:
+    timing = getattr(getattr(collector, "last", None), "timing", None)
+    return getattr(timing, "duration_ms", None)
+
+
+class RoutingCallManager(CallManagerWrapper):
+    def __init__(self, inner: Any, router: AdaptiveRouter,
+                 registry_factory: Callable[[str], Any] = primary_registry, collectors=None):
+        super().__init__(inner, collectors)
+        self._router = router
+        self._registry_factory = registry_factory
+        self._registries: Dict[str, Any] = {}
+
+    def _registry(self, name: str) -> Any:
+        registry = self._registries.get(name)
+        if registry is None:
+            registry = self._registries[name] = self._registry_factory(name)
+        return registry
+
+    def _routed(self, name: str, collector: Any = None) -> Any:
+        options: Dict[str, Any] = {"client_registry": self._registry(name)}
+        if collector is not None:
+            options["collector"] = self._collectors + [collector]
+        return self._inner.merge_options(options)
+
+    def _record(self, name: str, collector: Any, start: float, ok: bool) -> None:
+        duration = _duration_ms(collector)
+        self._router.record(name, duration if duration is not None else (time.perf_counter() - start) * 1000, ok)
+
+    def call_function_sync(self, *, function_name: str, args: Any) -> Any:
+        from baml_py import Collector
+
+        name = self._router.choose()
+        collector = Collector(name="baml_ext.routing")
+        start = time.perf_counter()
+        try:
+            result = self._routed(name, collector).call_function_sync(function_name=function_name, args=args)
+        except Exception:
+            self._record(name, collector, start, False)
+            raise
+        self._record(name, collector, start, True)
+        return result
+
+    async def call_function_async(self, *, function_name: str, args: Any) -> Any:
+        from baml_py import Collector
+
+        name = self._router.choose()
+        collector = Collector(name="baml_ext.routing")
+        start = time.perf_counter()
+        try:
+            result = await self._routed(name, collector).call_function_async(function_name=function_name, args=args)
+        except Exception:
+            self._record(name, collector, start, False)
+            raise
+        self._record(name, collector, start, True)
+        return result
+
+    def create_sync_stream(self, *, function_name: str, args: Any) -> Any:
+        return self._routed(self._router.choose()).create_sync_stream(function_name=function_name, args=args)
+
+    def create_async_stream(self, *, function_name: str, args: Any) -> Any:
+        return self._routed(self._router.choose()).create_async_stream(function_name=function_name, args=args)
+
+
+def routed_client(client: Any, router: Optional[AdaptiveRouter] = None,
+                  registry_factory: Callable[[str], Any] = primary_registry) -> Any:
+    """A copy of a generated client whose calls are routed by `router`."""
+    router = router or AdaptiveRouter()
+    return wrap_client(client, lambda manager: RoutingCallManager(manager, router, registry_factory))
+
@@ -0,0 +1,113 @@
+"""
+Cached dynamic schemas: one TypeBuilder per schema definition.
+
+Building a TypeBuilder for every request re-registers the same classes and
+enums on the hot path. It also defeats the resolved-options cache in
+baml_client.runtime, which is keyed by the identity of `tb`. The registry
+builds each schema variant once, keyed by its definition, and hands back
+the same TypeBuilder every time after that:
+
+  get_baml(source)    the definition is BAML source, applied with
+                      TypeBuilder.add_baml (e.g. extra @@dynamic properties)
+  get(key, build)     the definition is any hashable/JSON-able key plus a
+                      function that builds it on a fresh TypeBuilder
+
+Builds are serialized per key, so concurrent first requests for one schema
+build it once. The least recently used variants are dropped past
+`max_entries`. Cached builders are shared: treat them as frozen and never
+add to them after they are returned.
+
+    from baml_client.sync_client import b
+    from baml_ext.schema_registry import SCHEMAS
+
+    topic_schema = '''
+    dynamic class Resume {
+      research_topics string[]
+    }
+    '''
+    resume = b.ExtractResume(text, baml_options={"tb": SCHEMAS.get_baml(topic_schema)})
+    # or: client = SCHEMAS.with_schema(b, topic_schema)
+"""
+
+import collections
+import hashlib
+import json
+import threading
+from typing import Any, Callable, Dict, Optional
+
+DEFAULT_MAX_ENTRIES = 128
+
+
+def definition_key(definition: Any) -> str:
+    """sha256 of a schema definition (BAML source text or a JSON-able description)."""
+    if not isinstance(definition, str):
+        definition = json.dumps(definition, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(definition.encode("utf-8")).hexdigest()
+
+
+def _new_type_builder() -> Any:
+    from baml_client.type_builder import TypeBuilder
+
+    return TypeBuilder()
+
+
+class SchemaRegistry:
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 type_builder_factory: Callable[[], Any] = _new_type_builder):
+        self.max_entries = max_entries
+        self._factory = type_builder_factory
+        self._entries: "collections.OrderedDict[str, Any]" = collections.OrderedDict()
+        self._building: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.builds = 0
+
+    def _cached(self, key: str) -> Optional[Any]:
+        with self._lock:
+            tb = self._entries.get(key)
+            if tb is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            return tb
+
+    def get(self, definition: Any, build: Callable[[Any], None]) -> Any:
+        """The TypeBuilder for `definition`, calling build(tb) on a fresh one the first time."""
+        key = definition_key(definition)
+        tb = self._cached(key)
+        if tb is not None:
+            return tb
+        with self._lock:
+            build_lock = self._building.setdefault(key, threading.Lock())
+        with build_lock:
+            # Another thread may have built it while this one waited.
+            tb = self._cached(key)
+            if tb is not None:
+                return tb
+            tb = self._factory()
+            build(tb)
+            with self._lock:
+                self.builds += 1
+                self._entries[key] = tb
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                self._building.pop(key, None)
+        return tb
+
+    def get_baml(self, source: str) -> Any:
+        """The TypeBuilder with `source` (BAML class/enum definitions) added."""
+        return self.get(source, lambda tb: tb.add_baml(source))
+
+    def with_schema(self, client: Any, source: str) -> Any:
+        """client.with_options(tb=...) for the cached schema `source`."""
+        return client.with_options(tb=self.get_baml(source))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "builds": self.builds}
+
+
+SCHEMAS = SchemaRegistry()
@@ -0,0 +1,192 @@
+"""
+Coalescing of identical in-flight async BAML calls ("singleflight").
+
+When several agents ask for the same extraction at the same moment, each
+one would send its own LLM request. singleflight_client(b) wraps an async
+client so concurrent calls with the same function, the same canonical
+arguments and the same call options share one in-flight call:
+
+  call_function_async  the first caller starts the call; later identical
+                       callers await the same task and get the same result
+                       or exception
+  create_async_stream  later identical callers subscribe to the leader's
+                       stream, get the latest partial replayed, and then
+                       receive every further partial and the final response
+
+Only calls that are running at the same time are coalesced. Once a call
+finishes its key is released, so the next call goes to the model again
+(combine with baml_ext.cache for reuse across time). A call is only
+cancelled once every caller waiting on it has been cancelled. Calls that
+pass their own baml_options (a collector, a client registry, ...) get their
+own manager and are only coalesced with callers that use the same one.
+The sync paths are passed through unchanged.
+
+    from baml_client.async_client import b
+    from baml_ext.singleflight import SingleFlight, singleflight_client
+
+    group = SingleFlight()
+    b = singleflight_client(b, group)
+    resumes = await asyncio.gather(*(b.ExtractResume(text) for _ in range(8)))  # one LLM call
+    print(group.snapshot())
+"""
+
+import asyncio
+import hashlib
+import json
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from baml_ext._manager import CallManagerWrapper, wrap_client
+
+
+def _jsonable(value: Any) -> Any:
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json")
+    return repr(value)
+
+
+def call_key(function_name: str, args: Dict[str, Any]) -> str:
+    """sha256 of the function name and the arguments, independent of dict order."""
+    payload = json.dumps({"function": function_name, "args": args},
+                         sort_keys=True, ensure_ascii=False, default=_jsonable)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _loop_id() -> Optional[int]:
+    try:
+        return id(asyncio.get_running_loop())
+    except RuntimeError:
+        return None
+
+
+class _Flight:
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class _SharedStream:
+    """Fans the events of one runtime stream out to every subscriber."""
+
+    def __init__(self, ffi_stream: Any, ctx: Any, on_finish: Callable[[], None]):
+        self._ctx = ctx
+        self._on_finish = on_finish
+        self._callbacks: List[Callable[[Any], None]] = []
+        self._latest: Any = None
+        self._task: Optional[asyncio.Task] = None
+        self._ffi_stream = ffi_stream.on_event(self._broadcast)
+
+    def _broadcast(self, event: Any) -> None:
+        self._latest = event
+        for callback in list(self._callbacks):
+            callback(event)
+
+    def subscribe(self, callback: Callable[[Any], None]) -> None:
+        self._callbacks.append(callback)
+        if self._latest is not None:
+            # Partials are cumulative, so the latest one brings a late subscriber up to date.
+            callback(self._latest)
+
+    def drive(self) -> asyncio.Task:
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._ffi_stream.done(self._ctx))
+            self._task.add_done_callback(lambda _: self._on_finish())
+        return self._task
+
+
+class _StreamSubscriber:
+    """What BamlStream sees in place of the runtime stream: on_event() and done()."""
+
+    def __init__(self, shared: _SharedStream):
+        self._shared = shared
+
+    def on_event(self, callback: Callable[[Any], None]) -> "_StreamSubscriber":
+        self._shared.subscribe(callback)
+        return self
+
+    async def done(self, ctx: Any = None) -> Any:
+        # Shielded: one consumer abandoning the stream must not cut it off for the others.
+        return await asyncio.shield(self._shared.drive())
+
+
+class SingleFlight:
+    """In-flight calls and streams by key, with counters for how often callers shared one."""
+
+    def __init__(self):
+        self._calls: Dict[Tuple[Optional[int], Any], _Flight] = {}
+        self._streams: Dict[Tuple[Optional[int], Any], Tuple[Any, _SharedStream]] = {}
+        self.calls = 0
+        self.coalesced = 0
+        self.streams = 0
+        self.stream_subscribers = 0
+
+    async def do(self, key: Any, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Await fn(), or the call already running under `key` on this event loop."""
+        # Tasks belong to one event loop, so the loop is part of the key.
+        slot = (_loop_id(), key)
+        flight = self._calls.get(slot)
+        if flight is None:
+            self.calls += 1
+            flight = self._calls[slot] = _Flight(asyncio.ensure_future(fn()))
+            flight.task.add_done_callback(lambda _: self._release(self._calls, slot, flight))
+        else:
+            self.coalesced += 1
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if flight.waiters == 1 and not flight.task.done():
+                flight.task.cancel()
+            raise
+        finally:
+            flight.waiters -= 1
+
+    def stream(self, key: Any, create: Callable[[], Tuple[Any, Any]]) -> Tuple[Any, _StreamSubscriber]:
+        """(ctx, stream) for a new subscriber to the stream under `key`, creating it if needed."""
+        slot = (_loop_id(), key)
+        entry = self._streams.get(slot)
+        if entry is None:
+            self.streams += 1
+            ctx, ffi_stream = create()
+            entry = (ctx, _SharedStream(ffi_stream, ctx, lambda: self._release(self._streams, slot, entry)))
+            self._streams[slot] = entry
+        else:
+            self.stream_subscribers += 1
+        return entry[0], _StreamSubscriber(entry[1])
+
+    @staticmethod
+    def _release(table: Dict[Tuple[Optional[int], Any], Any], slot: Tuple[Optional[int], Any], value: Any) -> None:
+        if table.get(slot) is value:
+            del table[slot]
+
+    def in_flight(self) -> int:
+        return len(self._calls) + len(self._streams)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"calls": self.calls, "coalesced": self.coalesced, "streams": self.streams,
+                "stream_subscribers": self.stream_subscribers, "in_flight": self.in_flight()}
+
+
+class SingleFlightCallManager(CallManagerWrapper):
+    def __init__(self, inner: Any, group: SingleFlight, collectors=None):
+        super().__init__(inner, collectors)
+        self._group = group
+
+    def _key(self, function_name: str, args: Any) -> Tuple[int, str]:
+        # Per-call options produce a different inner manager, so they never share a flight.
+        return id(self._inner), call_key(function_name, args)
+
+    async def call_function_async(self, *, function_name: str, args: Any) -> Any:
+        return await self._group.do(
+            self._key(function_name, args),
+            lambda: self._inner.call_function_async(function_name=function_name, args=args))
+
+    def create_async_stream(self, *, function_name: str, args: Any) -> Any:
+        return self._group.stream(
+            self._key(function_name, args),
+            lambda: self._inner.create_async_stream(function_name=function_name, args=args))
+
+
+def singleflight_client(client: Any, group: Optional[SingleFlight] = None) -> Any:
+    """A copy of a generated async client whose identical concurrent calls are coalesced."""
+    group = group or SingleFlight()
+    return wrap_client(client, lambda manager: SingleFlightCallManager(manager, group))
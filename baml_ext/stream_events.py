@@ -0,0 +1,150 @@
+"""
+Field-level completion events from BAML stream partials.
+
+b.stream.ExtractResume(...) yields stream_types.Resume partials in which
+every field may still be growing. Waiting for get_final_response() means
+nothing downstream starts until the last token. field_events(stream) turns
+the partials into events for values that can no longer change:
+
+  FieldEvent("item", "skills", "Rust", index=0)   a list item is finished
+  FieldEvent("field", "name", "Jane Doe")         a whole field is finished
+  FieldEvent("final", None, <types.Resume>)       the parsed final response
+
+The model writes fields in declaration order, so a field that has a value
+is finished once a later field has one too, and a list item is finished
+once the next item has started. Fields with @stream.with_state are finished
+as soon as their state is "Complete". Whatever is still open when the
+stream ends is finished from the final response, which is always the last
+event. If the model wrote fields out of order and a field finished early
+kept growing, the final response emits that field again with its final
+value.
+
+    from baml_client.sync_client import b
+    from baml_ext.stream_events import field_events
+
+    for event in field_events(b.stream.ExtractResume(text)):
+        if event.kind == "item" and event.field == "skills":
+            index_skill(event.value)          # starts while the model is still writing
+        elif event.kind == "final":
+            resume = event.value
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+ITEM = "item"
+FIELD = "field"
+FINAL = "final"
+
+
+@dataclass
+class FieldEvent:
+    kind: str
+    field: Optional[str]
+    value: Any
+    index: Optional[int] = None
+    # Seconds since the tracker saw its first partial.
+    elapsed: float = 0.0
+
+
+def _unwrap(value: Any) -> Tuple[Any, bool]:
+    """(value, complete) for a plain value or a StreamState."""
+    if hasattr(value, "state") and hasattr(value, "value"):
+        return value.value, value.state == "Complete"
+    return value, False
+
+
+def _present(value: Any) -> bool:
+    return value is not None and not (isinstance(value, (str, list)) and not value)
+
+
+def _plain(value: Any) -> Any:
+    """Comparable form of a partial or final value (stream_types and types models differ in class)."""
+    value = _unwrap(value)[0]
+    if isinstance(value, list):
+        return [_plain(item) for item in value]
+    if hasattr(value, "model_dump"):
+        return value.model_dump()
+    return value
+
+
+class FieldTracker:
+    """Feeds partials in, returns the FieldEvents each one makes final."""
+
+    def __init__(self):
+        self._fields: Optional[List[str]] = None
+        # Finished field -> the value its FIELD event carried.
+        self._done: Dict[str, Any] = {}
+        self._items_done: Dict[str, int] = {}
+        self._started: Optional[float] = None
+
+    def _event(self, kind: str, field: Optional[str], value: Any, index: Optional[int] = None) -> FieldEvent:
+        return FieldEvent(kind, field, value, index, time.perf_counter() - self._started)
+
+    def _finish_items(self, field: str, items: List[Any], upto: int) -> List[FieldEvent]:
+        events = []
+        for index in range(self._items_done.get(field, 0), upto):
+            events.append(self._event(ITEM, field, _unwrap(items[index])[0], index))
+        self._items_done[field] = max(self._items_done.get(field, 0), upto)
+        return events
+
+    def _finish_field(self, field: str, value: Any) -> List[FieldEvent]:
+        events = []
+        if isinstance(value, list):
+            events += self._finish_items(field, value, len(value))
+        self._done[field] = _plain(value)
+        events.append(self._event(FIELD, field, value))
+        return events
+
+    def feed(self, partial: Any) -> List[FieldEvent]:
+        if self._started is None:
+            self._started = time.perf_counter()
+        if self._fields is None:
+            self._fields = list(type(partial).model_fields)
+        values = [_unwrap(getattr(partial, name, None)) for name in self._fields]
+        # Index of the last field that has started; every started field before it is finished.
+        last_started = max((i for i, (value, _) in enumerate(values) if _present(value)), default=-1)
+        events: List[FieldEvent] = []
+        for i, name in enumerate(self._fields):
+            if name in self._done:
+                continue
+            value, complete = values[i]
+            if complete or (i < last_started and _present(value)):
+                events += self._finish_field(name, value)
+            elif isinstance(value, list) and len(value) > 1:
+                # Only the last item can still be growing.
+                events += self._finish_items(name, value, len(value) - 1)
+        return events
+
+    def finish(self, final: Any) -> List[FieldEvent]:
+        """Events for everything still open, taken from the final response, then the final event."""
+        if self._started is None:
+            self._started = time.perf_counter()
+        if self._fields is None:
+            self._fields = list(type(final).model_fields)
+        events: List[FieldEvent] = []
+        for name in self._fields:
+            value = _unwrap(getattr(final, name, None))[0]
+            if name not in self._done or self._done[name] != _plain(value):
+                events += self._finish_field(name, value)
+        events.append(self._event(FINAL, None, final))
+        return events
+
+
+def field_events(stream: Any) -> Iterator[FieldEvent]:
+    """FieldEvents from a sync BamlSyncStream (b.stream.<Function>(...))."""
+    tracker = FieldTracker()
+    for partial in stream:
+        yield from tracker.feed(partial)
+    yield from tracker.finish(stream.get_final_response())
+
+
+async def field_events_async(stream: Any) -> AsyncIterator[FieldEvent]:
+    """FieldEvents from an async BamlStream (b.stream.<Function>(...) on the async client)."""
+    tracker = FieldTracker()
+    async for partial in stream:
+        for event in tracker.feed(partial):
+            yield event
+    for event in tracker.finish(await stream.get_final_response()):
+        yield event
@@ -0,0 +1,325 @@
+"""
+Per-function, per-client telemetry aggregated from BAML collectors.
+
+instrumented_client(b) attaches a fresh Collector to every call and folds
+the finished FunctionLog into histograms keyed by (function, client):
+
+  latency_seconds  end-to-end duration, including retries
+  input_tokens     prompt tokens reported by the provider
+  output_tokens    completion tokens reported by the provider
+  calls, failures, retries (LLM attempts beyond the first)
+
+Stream calls are recorded when the stream finishes or fails. A stream the
+consumer abandons is recorded as a failure once it is garbage collected.
+Nothing is kept per stream after that, so abandoned streams do not pile up.
+Exports are Prometheus text exposition (prometheus_text(), or
+serve_prometheus() for a /metrics endpoint) and a JSON snapshot written
+periodically by JsonSnapshotWriter.
+
+    from baml_client.sync_client import b
+    from baml_ext.telemetry import TELEMETRY, JsonSnapshotWriter, instrumented_client
+
+    b = instrumented_client(b)
+    JsonSnapshotWriter(TELEMETRY, "baml_telemetry.json", interval=60).start()
+"""
+
+import bisect
+import json
+import os
+import threading
+import time
+import weakref
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from baml_ext._manager import CallManagerWrapper, wrap_client
+
+# Seconds, the Prometheus base unit for durations.
+LATENCY_BUCKETS_SECONDS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+TOKEN_BUCKETS = (16, 64, 256, 1024, 2048, 4096, 8192, 16384, 32768, 131072)
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus sense."""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        total, rows = 0, []
+        for bound, n in zip(list(self.buckets) + ["+Inf"], self.counts):
+            total += n
+            rows.append((bound if isinstance(bound, str) else f"{bound:g}", total))
+        return rows
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"count": self.count, "sum": self.sum, "buckets": dict(self.cumulative())}
+
+
+class _Series:
+    def __init__(self):
+        self.latency_seconds = Histogram(LATENCY_BUCKETS_SECONDS)
+        self.input_tokens = Histogram(TOKEN_BUCKETS)
+        self.output_tokens = Histogram(TOKEN_BUCKETS)
+        self.calls = 0
+        self.failures = 0
+        self.retries = 0
+
+
+def log_fields(log: Any) -> Tuple[str, str, Optional[float], Optional[int], Optional[int], int]:
+    """(function, client, duration_ms, input_tokens, output_tokens, attempts) from a FunctionLog."""
+    calls = list(getattr(log, "calls", None) or [])
+    selected = next((c for c in calls if getattr(c, "selected", False)), calls[-1] if calls else None)
+    usage = getattr(log, "usage", None)
+    timing = getattr(log, "timing", None)
+    return (
+        getattr(log, "function_name", None) or "unknown",
+        getattr(selected, "client_name", None) or "unknown",
+        getattr(timing, "duration_ms", None),
+        getattr(usage, "input_tokens", None),
+        getattr(usage, "output_tokens", None),
+        len(calls),
+    )
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+class Telemetry:
+    def __init__(self):
+        self._series: Dict[Tuple[str, str], _Series] = {}
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+
+    def record(self, function: str, client: str, duration_ms: Optional[float], input_tokens: Optional[int],
+               output_tokens: Optional[int], attempts: int, ok: bool) -> None:
+        with self._lock:
+            series = self._series.get((function, client))
+            if series is None:
+                series = self._series[(function, client)] = _Series()
+            series.calls += 1
+            series.retries += max(0, attempts - 1)
+            if not ok:
+                series.failures += 1
+            if duration_ms is not None:
+                series.latency_seconds.observe(duration_ms / 1000.0)
+            if input_tokens is not None:
+                series.input_tokens.observe(input_tokens)
+            if output_tokens is not None:
+                series.output_tokens.observe(output_tokens)
+
+    def record_collector(self, collector: Any, function_name: str, ok: bool, fallback_ms: Optional[float] = None) -> None:
+        log = getattr(collector, "last", None)
+        if log is None:
+            self.record(function_name, "unknown", fallback_ms, None, None, 0, ok)
+            return
+        function, client, duration_ms, input_tokens, output_tokens, attempts = log_fields(log)
+        self.record(function if function != "unknown" else function_name, client,
+                    duration_ms if duration_ms is not None else fallback_ms,
+                    input_tokens, output_tokens, attempts, ok)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            series = [
+                {
+                    "function": function,
+                    "client": client,
+                    "calls": s.calls,
+                    "failures": s.failures,
+                    "retries": s.retries,
+                    "latency_seconds": s.latency_seconds.to_dict(),
+                    "input_tokens": s.input_tokens.to_dict(),
+                    "output_tokens": s.output_tokens.to_dict(),
+                }
+                for (function, client), s in sorted(self._series.items())
+            ]
+        return {"timestamp": time.time(), "started_at": self.started_at, "series": series}
+
+    def prometheus_text(self) -> str:
+        lines: List[str] = []
+        with self._lock:
+            items = sorted(self._series.items())
+            for name, kind, help_text, attr in (
+                ("baml_calls_total", "counter", "BAML function calls", "calls"),
+                ("baml_call_failures_total", "counter", "BAML function calls that raised", "failures"),
+                ("baml_call_retries_total", "counter", "LLM attempts beyond the first", "retries"),
+            ):
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+                for (function, client), s in items:
+                    lines.append(f'{name}{{function="{_escape(function)}",client="{_escape(client)}"}} '
+                                 f"{getattr(s, attr)}")
+            for name, help_text, attr in (
+                ("baml_call_latency_seconds", "End-to-end BAML call latency in seconds", "latency_seconds"),
+                ("baml_call_input_tokens", "Input tokens per BAML call", "input_tokens"),
+                ("baml_call_output_tokens", "Output tokens per BAML call", "output_tokens"),
+            ):
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+                for (function, client), s in items:
+                    hist: Histogram = getattr(s, attr)
+                    labels = f'function="{_escape(function)}",client="{_escape(client)}"'
+                    for bound, count in hist.cumulative():
+                        lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {count}')
+                    lines.append(f"{name}_sum{{{labels}}} {hist.sum:g}")
+                    lines.append(f"{name}_count{{{labels}}} {hist.count}")
+        return "\n".join(lines) + "\n"
+
+
+TELEMETRY = Telemetry()
+
+
+class _TelemetryStream:
+    """What BamlSyncStream/BamlStream see in place of the runtime stream; done() records the call.
+
+    If the stream is dropped before done() completes, the finalizer records it as a failure.
+    """
+
+    def __init__(self, ffi_stream: Any, telemetry: Telemetry, collector: Any, function_name: str):
+        self._ffi_stream = ffi_stream
+        self._telemetry = telemetry
+        self._collector = collector
+        self._function_name = function_name
+        self._abandoned = weakref.finalize(self, telemetry.record_collector, collector, function_name, False)
+
+    def on_event(self, callback: Any) -> "_TelemetryStream":
+        self._ffi_stream = self._ffi_stream.on_event(callback)
+        return self
+
+    def _record(self, ok: bool) -> None:
+        if self._abandoned.detach() is not None:
+            self._telemetry.record_collector(self._collector, self._function_name, ok)
+
+    def done(self, ctx: Any) -> Any:
+        try:
+            result = self._ffi_stream.done(ctx)
+        except BaseException:
+            self._record(False)
+            raise
+        self._record(True)
+        return result
+
+
+class _TelemetryAsyncStream(_TelemetryStream):
+    async def done(self, ctx: Any) -> Any:
+        try:
+            result = await self._ffi_stream.done(ctx)
+        except BaseException:
+            self._record(False)
+            raise
+        self._record(True)
+        return result
+
+
+class TelemetryCallManager(CallManagerWrapper):
+    def __init__(self, inner: Any, telemetry: Telemetry, collectors=None):
+        super().__init__(inner, collectors)
+        self._telemetry = telemetry
+
+    def call_function_sync(self, *, function_name: str, args: Any) -> Any:
+        from baml_py import Collector
+
+        collector = Collector(name="baml_ext.telemetry")
+        start = time.perf_counter()
+        try:
+            result = self._with_collector(collector).call_function_sync(function_name=function_name, args=args)
+        except Exception:
+            self._telemetry.record_collector(collector, function_name, False, (time.perf_counter() - start) * 1000)
+            raise
+        self._telemetry.record_collector(collector, function_name, True, (time.perf_counter() - start) * 1000)
+        return result
+
+    async def call_function_async(self, *, function_name: str, args: Any) -> Any:
+        from baml_py import Collector
+
+        collector = Collector(name="baml_ext.telemetry")
+        start = time.perf_counter()
+        try:
+            result = await self._with_collector(collector).call_function_async(function_name=function_name, args=args)
+        except Exception:
+            self._telemetry.record_collector(collector, function_name, False, (time.perf_counter() - start) * 1000)
+            raise
+        self._telemetry.record_collector(collector, function_name, True, (time.perf_counter() - start) * 1000)
+        return result
+
+    def create_sync_stream(self, *, function_name: str, args: Any) -> Any:
+        from baml_py import Collector
+
+        collector = Collector(name="baml_ext.telemetry")
+        ctx, stream = self._with_collector(collector).create_sync_stream(function_name=function_name, args=args)
+        return ctx, _TelemetryStream(stream, self._telemetry, collector, function_name)
+
+    def create_async_stream(self, *, function_name: str, args: Any) -> Any:
+        from baml_py import Collector
+
+        collector = Collector(name="baml_ext.telemetry")
+        ctx, stream = self._with_collector(collector).create_async_stream(function_name=function_name, args=args)
+        return ctx, _TelemetryAsyncStream(stream, self._telemetry, collector, function_name)
+
+
+def instrumented_client(client: Any, telemetry: Telemetry = TELEMETRY) -> Any:
+    """A copy of a generated client that reports every call to `telemetry`."""
+    return wrap_client(client, lambda manager: TelemetryCallManager(manager, telemetry))
+
+
+class JsonSnapshotWriter:
+    """Writes telemetry.snapshot() to `path` every `interval` seconds (atomically)."""
+
+    def __init__(self, telemetry: Telemetry, path: str, interval: float = 60.0):
+        self.telemetry = telemetry
+        self.path = path
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def write(self) -> None:
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.telemetry.snapshot(), f, indent=2)
+        os.replace(tmp, self.path)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.write()
+
+    def start(self) -> "JsonSnapshotWriter":
+        self._thread = threading.Thread(target=self._run, name="baml-telemetry-json", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.write()
+
+
+def serve_prometheus(telemetry: Telemetry = TELEMETRY, port: int = 9464, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Serve GET /metrics on a background thread; returns the server (call shutdown() to stop)."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):  # noqa: A002 - BaseHTTPRequestHandler signature
+            pass
+
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            data = telemetry.prometheus_text().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="baml-telemetry-http", daemon=True).start()
+    return server
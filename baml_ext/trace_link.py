@@ -0,0 +1,185 @@
+"""
+Link BAML function calls to the pipeline trace that triggered them.
+
+pipeline_trace keeps the current paper-generation stage in a contextvar.
+traced_client(b) wraps a generated client so every BAML call made inside a
+pipeline span:
+
+  - opens a child span (category "llm") named after the BAML function,
+    covering the call or, for streams, creation through the final response
+  - tags the BAML function log with pipeline_trace_id, pipeline_span_id and
+    pipeline_stage (baml_client.tracing.set_tags), so the log can be found
+    from the trace and the trace from the log
+  - copies baml_log_id, client, token usage and attempt count from a
+    Collector into the span
+
+Once the call finishes, or a stream has been created (its BAML context is
+captured then), the pipeline tags that were set before it are put back
+(empty strings if there were none), so a later BAML call made outside the
+span is not tagged with a span that has already ended.
+
+Outside any pipeline trace the wrapper calls straight through, with no
+collector and no tags.
+
+    import pipeline_trace
+    from baml_client.sync_client import b
+    from baml_ext.trace_link import traced_client
+
+    b = traced_client(b)
+    with pipeline_trace.start_trace("generate_paper"):
+        with pipeline_trace.span("research"):
+            b.ExtractResume(text)
+"""
+
+import contextvars
+from typing import Any, Dict, Optional
+
+import pipeline_trace
+from baml_ext._manager import CallManagerWrapper, wrap_client
+from baml_ext.telemetry import log_fields
+
+
+Tags = Dict[str, str]
+
+_NO_TAGS: Tags = {"pipeline_trace_id": "", "pipeline_span_id": "", "pipeline_stage": ""}
+# baml_py cannot read tags back, so the ones set here are tracked alongside.
+_current_tags: contextvars.ContextVar[Tags] = contextvars.ContextVar("trace_link_tags", default=_NO_TAGS)
+
+
+def _set_tags(tags: Tags) -> None:
+    from baml_client.tracing import set_tags
+
+    set_tags(**tags)
+    _current_tags.set(tags)
+
+
+def _link(span: pipeline_trace.Span, stage: Optional[pipeline_trace.Span]) -> Tags:
+    """Tag BAML logs with `span`; returns the tags to restore when it ends."""
+    previous = _current_tags.get()
+    _set_tags({"pipeline_trace_id": span.trace.trace_id, "pipeline_span_id": span.span_id,
+               "pipeline_stage": stage.name if stage else ""})
+    return previous
+
+
+def _record(span: pipeline_trace.Span, collector: Any) -> None:
+    log = getattr(collector, "last", None)
+    if log is None:
+        return
+    _, client, duration_ms, input_tokens, output_tokens, attempts = log_fields(log)
+    span.attrs.update(baml_log_id=getattr(log, "id", None), client=client, baml_duration_ms=duration_ms,
+                      input_tokens=input_tokens, output_tokens=output_tokens, attempts=attempts)
+
+
+def _end(span: pipeline_trace.Span, collector: Any, previous: Tags, error: Optional[BaseException] = None) -> None:
+    _record(span, collector)
+    _set_tags(previous)
+    pipeline_trace.finish(span, error)
+
+
+class _TracedStream:
+    """What BamlSyncStream/BamlStream see in place of the runtime stream; done() ends the span."""
+
+    def __init__(self, ffi_stream: Any, span: pipeline_trace.Span, collector: Any):
+        self._ffi_stream = ffi_stream
+        self._span = span
+        self._collector = collector
+
+    def on_event(self, callback: Any) -> "_TracedStream":
+        self._ffi_stream = self._ffi_stream.on_event(callback)
+        return self
+
+    def _finish(self, error: Optional[BaseException] = None) -> None:
+        _record(self._span, self._collector)
+        pipeline_trace.finish(self._span, error)
+
+    def done(self, ctx: Any) -> Any:
+        try:
+            result = self._ffi_stream.done(ctx)
+        except Exception as e:
+            self._finish(e)
+            raise
+        self._finish()
+        return result
+
+
+class _TracedAsyncStream(_TracedStream):
+    async def done(self, ctx: Any) -> Any:
+        try:
+            result = await self._ffi_stream.done(ctx)
+        except BaseException as e:
+            self._finish(e)
+            raise
+        self._finish()
+        return result
+
+
+class TraceLinkCallManager(CallManagerWrapper):
+    def _begin(self, function_name: str, **attrs: Any) -> Any:
+        stage = pipeline_trace.current_span()
+        span = pipeline_trace.begin(function_name, pipeline_trace.LLM, **attrs)
+        if span is None:
+            return None, self._inner, None, None
+        from baml_py import Collector
+
+        collector = Collector(name="baml_ext.trace_link")
+        previous = _link(span, stage)
+        return span, self._with_collector(collector), collector, previous
+
+    def call_function_sync(self, *, function_name: str, args: Any) -> Any:
+        span, inner, collector, previous = self._begin(function_name)
+        if span is None:
+            return inner.call_function_sync(function_name=function_name, args=args)
+        try:
+            result = inner.call_function_sync(function_name=function_name, args=args)
+        except Exception as e:
+            _end(span, collector, previous, e)
+            raise
+        _end(span, collector, previous)
+        return result
+
+    async def call_function_async(self, *, function_name: str, args: Any) -> Any:
+        span, inner, collector, previous = self._begin(function_name)
+        if span is None:
+            return await inner.call_function_async(function_name=function_name, args=args)
+        try:
+            result = await inner.call_function_async(function_name=function_name, args=args)
+        except BaseException as e:
+            _end(span, collector, previous, e)
+            raise
+        _end(span, collector, previous)
+        return result
+
+    def create_sync_stream(self, *, function_name: str, args: Any) -> Any:
+        span, inner, collector, previous = self._begin(function_name, stream=True)
+        if span is None:
+            return inner.create_sync_stream(function_name=function_name, args=args)
+        try:
+            ctx, stream = inner.create_sync_stream(function_name=function_name, args=args)
+        except Exception as e:
+            _record(span, collector)
+            pipeline_trace.finish(span, e)
+            raise
+        finally:
+            # The stream captured its BAML context (and tags) on creation.
+            _set_tags(previous)
+        return ctx, _TracedStream(stream, span, collector)
+
+    def create_async_stream(self, *, function_name: str, args: Any) -> Any:
+        span, inner, collector, previous = self._begin(function_name, stream=True)
+        if span is None:
+            return inner.create_async_stream(function_name=function_name, args=args)
+        try:
+            ctx, stream = inner.create_async_stream(function_name=function_name, args=args)
+        except Exception as e:
+            _record(span, collector)
+            pipeline_trace.finish(span, e)
+            raise
+        finally:
+            # The stream captured its BAML context (and tags) on creation.
+            _set_tags(previous)
+        return ctx, _TracedAsyncStream(stream, span, collector)
+
+
+def traced_client(client: Any) -> Any:
+    """A copy of a generated client whose calls are linked to the current pipeline span."""
+    return wrap_client(client, TraceLinkCallManager)
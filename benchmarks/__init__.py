@@ -0,0 +1,5 @@
+"""
+Offline benchmarks and load harnesses.
+
+Run from the repository root, e.g. `python -m benchmarks.mcp_compile_load`.
+"""
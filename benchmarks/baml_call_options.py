@@ -0,0 +1,124 @@
+"""
+Micro-benchmark for per-call option resolution in baml_client.
+
+The BAML runtime is replaced by a stub that returns immediately, so the
+numbers are the Python-side overhead of DoNotUseDirectlyCallManager:
+merge_options plus option resolution on the sync, async and stream paths.
+
+Scenarios:
+  warm        no per-call options; the resolved options are reused
+  overrides   a per-call env override; a new manager is resolved every call
+  env_change  a watched environment variable changes before every call
+
+Usage:
+  python -m benchmarks.baml_call_options
+  python -m benchmarks.baml_call_options --iterations 200000
+"""
+
+import argparse
+import asyncio
+import os
+import time
+from typing import Any, Callable, Dict, List
+
+from baml_client import globals as baml_globals
+from baml_client.runtime import DoNotUseDirectlyCallManager
+
+ARGS = {"resume": "Jane Doe\nSoftware Engineer"}
+
+
+class _StubRuntime:
+    """Accepts the same arguments as BamlRuntime and does no work."""
+
+    def call_function_sync(self, *args: Any) -> None:
+        return None
+
+    async def call_function(self, *args: Any) -> None:
+        return None
+
+    def stream_function_sync(self, *args: Any) -> None:
+        return None
+
+    def stream_function(self, *args: Any) -> None:
+        return None
+
+
+class _StubCtxManager:
+    def get(self) -> None:
+        return None
+
+    def clone_context(self) -> None:
+        return None
+
+
+def _install_stubs() -> None:
+    # Filling the lazy slots means get_runtime() never builds the real runtime.
+    baml_globals._runtime = _StubRuntime()
+    baml_globals._ctx_manager = _StubCtxManager()
+
+
+def _scenarios() -> Dict[str, Callable[[], Dict[str, Any]]]:
+    counter = iter(range(1 << 62))
+
+    def env_change() -> Dict[str, Any]:
+        os.environ["BAML_LOG"] = "info" if next(counter) % 2 else "warn"
+        return {}
+
+    return {
+        "warm": lambda: {},
+        "overrides": lambda: {"env": {"BAML_LOG": "warn"}},
+        "env_change": env_change,
+    }
+
+
+def _time_sync(manager: DoNotUseDirectlyCallManager, options: Callable[[], Dict[str, Any]],
+               call: str, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        getattr(manager.merge_options(options()), call)(function_name="ExtractResume", args=ARGS)
+    return time.perf_counter() - start
+
+
+async def _time_async(manager: DoNotUseDirectlyCallManager, options: Callable[[], Dict[str, Any]],
+                      iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await manager.merge_options(options()).call_function_async(function_name="ExtractResume", args=ARGS)
+    return time.perf_counter() - start
+
+
+def run(iterations: int) -> List[Dict[str, Any]]:
+    _install_stubs()
+    saved_log = os.environ.get("BAML_LOG")
+    rows = []
+    try:
+        for scenario, options in _scenarios().items():
+            manager = DoNotUseDirectlyCallManager({})
+            timings = {
+                "sync": _time_sync(manager, options, "call_function_sync", iterations),
+                "async": asyncio.run(_time_async(manager, options, iterations)),
+                "stream": _time_sync(manager, options, "create_sync_stream", iterations),
+                "async_stream": _time_sync(manager, options, "create_async_stream", iterations),
+            }
+            for path, elapsed in timings.items():
+                rows.append({"scenario": scenario, "path": path, "us_per_call": elapsed / iterations * 1e6})
+    finally:
+        if saved_log is None:
+            os.environ.pop("BAML_LOG", None)
+        else:
+            os.environ["BAML_LOG"] = saved_log
+    return rows
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Benchmark baml_client call option resolution")
+    p.add_argument("--iterations", type=int, default=50000, help="Calls per scenario and path")
+    args = p.parse_args()
+
+    print(f"{'scenario':<12} {'path':<14} {'us/call':>9}")
+    for row in run(args.iterations):
+        print(f"{row['scenario']:<12} {row['path']:<14} {row['us_per_call']:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
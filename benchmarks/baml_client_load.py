@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Load test for the baml_src client strategies against a local mock LLM.
+
+Every client from baml_src/clients.baml is re-registered in a ClientRegistry
+with the same provider, retry policy and strategy, but with base_url
+pointing at benchmarks.mock_llm_server. Each client is made primary in turn
+and driven with concurrent ExtractResume calls through the async client.
+
+"Adaptive" runs baml_ext.routing's AdaptiveRouter over the CustomFast
+candidates (CustomGPT4oMini, CustomHaiku) for comparison with round-robin,
+and "Hedged" runs baml_ext.hedging with CustomGPT4oMini as primary and
+CustomHaiku as hedge, for comparison with OpenaiFallback.
+
+Reported per client:
+  throughput     successful calls per second
+  p50/p95/p99    end-to-end call latency, including BAML retries and fallbacks
+  ok             share of calls that returned a parsed Resume
+  amplification  HTTP requests seen by the mock server per logical call
+
+Usage:
+  python -m benchmarks.baml_client_load --calls 200 --concurrency 16
+  python -m benchmarks.baml_client_load --error_rate 0.1 --rate_limit_rate 0.05
+  python -m benchmarks.baml_client_load --clients CustomFast Adaptive \\
+      --model_overrides '{"gpt-4o-mini": {"latency_ms": 800}}'
+
+Requires baml-py. No API keys or network access are needed.
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from benchmarks.mock_llm_server import MockLLMServer, add_config_arguments, config_from_args, start_mock_llm
+
+# Mirrors baml_src/clients.baml: (name, provider, options, retry_policy)
+CLIENT_SPECS: List[Tuple[str, str, Dict[str, Any], Optional[str]]] = [
+    ("CustomGPT4o", "openai", {"model": "gpt-4o"}, None),
+    ("CustomGPT4oMini", "openai", {"model": "gpt-4o-mini"}, "Exponential"),
+    ("CustomSonnet", "anthropic", {"model": "claude-3-5-sonnet-20241022"}, None),
+    ("CustomHaiku", "anthropic", {"model": "claude-3-haiku-20240307"}, "Constant"),
+    ("CustomFast", "round-robin", {"strategy": ["CustomGPT4oMini", "CustomHaiku"]}, None),
+    ("OpenaiFallback", "fallback", {"strategy": ["CustomGPT4oMini", "CustomGPT4oMini"]}, None),
+]
+
+ADAPTIVE = "Adaptive"
+HEDGED = "Hedged"
+
+SAMPLE_RESUME = """Vaibhav Gupta
+vbv@boundaryml.com
+
+Experience:
+- Founder at BoundaryML
+- CV Engineer at Google
+- CV Engineer at Microsoft
+
+Skills:
+- Rust
+- C++
+"""
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = min(len(ordered) - 1, max(0, int(round(pct / 100 * (len(ordered) - 1)))))
+    return ordered[rank]
+
+
+def mock_client_registry(base_url: str):
+    """A ClientRegistry with every baml_src client pointed at the mock server."""
+    from baml_py import ClientRegistry
+
+    registry = ClientRegistry()
+    for name, provider, options, retry_policy in CLIENT_SPECS:
+        options = dict(options)
+        if provider == "openai":
+            options.update(base_url=f"{base_url}/v1", api_key="mock")
+        elif provider == "anthropic":
+            options.update(base_url=base_url, api_key="mock")
+        registry.add_llm_client(name, provider, options, retry_policy)
+    return registry
+
+
+async def run_client(client_name: str, server: MockLLMServer, calls: int, concurrency: int) -> Dict[str, Any]:
+    from baml_client.async_client import b
+
+    def registry_factory(name: str):
+        registry = mock_client_registry(server.base_url)
+        registry.set_primary(name)
+        return registry
+
+    if client_name == ADAPTIVE:
+        from baml_ext.routing import AdaptiveRouter, routed_client
+
+        client = routed_client(b, AdaptiveRouter(), registry_factory)
+    elif client_name == HEDGED:
+        from baml_ext.hedging import HedgePolicy, hedged_client
+
+        client = hedged_client(b, HedgePolicy(), registry_factory)
+    else:
+        client = b.with_options(client_registry=registry_factory(client_name))
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    failures = 0
+
+    async def one() -> None:
+        nonlocal failures
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await client.ExtractResume(SAMPLE_RESUME)
+            except Exception:
+                failures += 1
+                return
+            latencies.append(time.perf_counter() - start)
+
+    server.stats.reset()
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(calls)))
+    elapsed = time.perf_counter() - start
+    stats = server.stats.snapshot()
+    return {
+        "client": client_name,
+        "throughput": len(latencies) / elapsed if elapsed > 0 else 0.0,
+        "p50": _percentile(latencies, 50),
+        "p95": _percentile(latencies, 95),
+        "p99": _percentile(latencies, 99),
+        "ok": len(latencies) / calls if calls else 0.0,
+        "amplification": stats["requests"] / calls if calls else 0.0,
+        "server": stats,
+        "failures": failures,
+    }
+
+
+def print_report(rows: List[Dict[str, Any]]) -> None:
+    print(f"{'client':<16} {'calls/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'ok':>6} {'ampl':>6}  statuses")
+    for row in rows:
+        statuses = " ".join(f"{code}:{n}" for code, n in sorted(row["server"]["by_status"].items()))
+        print(f"{row['client']:<16} {row['throughput']:>8.1f} {row['p50'] * 1000:>8.1f} {row['p95'] * 1000:>8.1f} "
+              f"{row['p99'] * 1000:>8.1f} {row['ok']:>6.1%} {row['amplification']:>6.2f}  {statuses}")
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Load test baml_src clients against a mock LLM server")
+    names = [spec[0] for spec in CLIENT_SPECS] + [ADAPTIVE, HEDGED]
+    p.add_argument("--clients", nargs="+", default=names, choices=names, help="Clients to test (default: all)")
+    p.add_argument("--calls", type=int, default=200, help="ExtractResume calls per client")
+    p.add_argument("--concurrency", type=int, default=16, help="Calls in flight")
+    p.add_argument("--seed", type=int, default=None, help="Seed for latency and error injection")
+    add_config_arguments(p)
+    args = p.parse_args()
+
+    server = start_mock_llm(config_from_args(args), seed=args.seed)
+    try:
+        rows = [asyncio.run(run_client(name, server, args.calls, args.concurrency)) for name in args.clients]
+    finally:
+        server.close()
+    print_report(rows)
+
+
+if __name__ == "__main__":
+    main()
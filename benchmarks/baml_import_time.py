@@ -0,0 +1,64 @@
+"""
+Import-time measurement for baml_client.
+
+Each sample runs in a fresh interpreter and reports three timings:
+  baml_py          importing the native extension alone (paid either way)
+  baml_client      importing the generated client, which no longer builds the runtime
+  first_runtime    the first get_runtime() call, which parses baml_src
+
+Before lazy initialization, first_runtime was part of the baml_client
+import, so every process that imported it paid for it. Worker processes
+that never call an LLM now skip that cost.
+
+Usage:
+  python -m benchmarks.baml_import_time
+  python -m benchmarks.baml_import_time --samples 20
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List
+
+_PROBE = r"""
+import json, time
+t0 = time.perf_counter()
+import baml_py
+t1 = time.perf_counter()
+import baml_client
+t2 = time.perf_counter()
+from baml_client.globals import get_runtime
+get_runtime()
+t3 = time.perf_counter()
+print(json.dumps({"baml_py": t1 - t0, "baml_client": t2 - t1, "first_runtime": t3 - t2}))
+"""
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def sample() -> Dict[str, float]:
+    out = subprocess.run([sys.executable, "-c", _PROBE], cwd=REPO_ROOT, check=True,
+                         capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Measure baml_client import time")
+    p.add_argument("--samples", type=int, default=10, help="Fresh interpreters to start")
+    args = p.parse_args()
+
+    runs: List[Dict[str, float]] = [sample() for _ in range(args.samples)]
+    print(f"{'phase':<14} {'median ms':>10} {'min ms':>8} {'max ms':>8}")
+    for phase in ("baml_py", "baml_client", "first_runtime"):
+        values = [run[phase] * 1000 for run in runs]
+        print(f"{phase:<14} {statistics.median(values):>10.1f} {min(values):>8.1f} {max(values):>8.1f}")
+    saved = statistics.median(run["first_runtime"] for run in runs) * 1000
+    print(f"\nImporting baml_client no longer pays ~{saved:.1f} ms of runtime construction; "
+          f"it is deferred to the first BAML call.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+Offline load test for mcp_compile.run_mcp_compile.
+
+Three local stand-ins replace the external pieces:
+  - a fake OpenAI-compatible chat server that replays the build steps from
+    the agent instructions as scripted tool calls
+  - an in-process MCP server exposing a `run_command` shell tool
+  - fake pdflatex/xelatex/bibtex executables on PATH
+
+The harness runs N compile agents concurrently and reports MCP connect time,
+model and tool-call round trips, and end-to-end latency.
+
+Usage:
+  python -m benchmarks.mcp_compile_load --compiles 16 --concurrency 8
+  python -m benchmarks.mcp_compile_load --model_latency_ms 300 --tex_delay_ms 200
+
+Requires agno and mcp (pip install agno mcp); POSIX only (the fake TeX
+binaries are shell-executable Python scripts).
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import shutil
+import stat
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+import latex_build
+import mcp_compile
+
+FAKE_TEX_SCRIPT = '''#!{python}
+import os, sys, time
+time.sleep(float(os.environ.get("FAKE_TEX_DELAY", "0")))
+out = "."
+for arg in sys.argv[1:]:
+    if arg.startswith("-output-directory="):
+        out = arg.split("=", 1)[1]
+job = os.path.splitext(os.path.basename(sys.argv[-1]))[0]
+with open(os.path.join(out, job + ".aux"), "w") as f:
+    f.write("\\\\citation{{x}}\\n\\\\bibdata{{references}}\\n")
+with open(os.path.join(out, job + ".log"), "w") as f:
+    f.write("This is a fake TeX run\\nOutput written on " + job + ".pdf\\n")
+with open(os.path.join(out, job + ".pdf"), "wb") as f:
+    f.write(b"%PDF-1.5\\n%%EOF\\n")
+'''
+
+FAKE_BIBTEX_SCRIPT = '''#!{python}
+import os, sys, time
+time.sleep(float(os.environ.get("FAKE_TEX_DELAY", "0")) / 4)
+open(sys.argv[-1] + ".bbl", "w").close()
+'''
+
+_STEP_RE = re.compile(r"^\s*-\s*(?:Run|If \.aux exists):\s*(.+?)\s*$", re.MULTILINE)
+_CD_RE = re.compile(r'cd\s+"([^"]+)"')
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * (len(ordered) - 1)))))
+    return ordered[k]
+
+
+class Metrics:
+    """Thread-safe sample store shared by the stand-ins."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples: Dict[str, List[float]] = {}
+
+    def add(self, name: str, value: float) -> None:
+        with self._lock:
+            self.samples.setdefault(name, []).append(value)
+
+    def summary(self, name: str) -> str:
+        values = self.samples.get(name, [])
+        if not values:
+            return f"{name:<18} n=0"
+        return (f"{name:<18} n={len(values):<5} mean={statistics.mean(values) * 1000:8.1f}ms "
+                f"p50={_percentile(values, 50) * 1000:8.1f}ms p95={_percentile(values, 95) * 1000:8.1f}ms "
+                f"max={max(values) * 1000:8.1f}ms")
+
+
+# ---------------------------------------------------------------------------
+# Fake OpenAI-compatible model
+# ---------------------------------------------------------------------------
+
+def _script_from_messages(messages: List[Dict[str, Any]]) -> Tuple[Optional[str], List[str]]:
+    system = "\n".join(
+        m.get("content") or "" for m in messages
+        if m.get("role") in ("system", "developer") and isinstance(m.get("content"), str)
+    )
+    cd = _CD_RE.search(system)
+    return (cd.group(1) if cd else None), _STEP_RE.findall(system)
+
+
+def _pick_tool(tools: List[Dict[str, Any]]) -> str:
+    names = [t.get("function", {}).get("name", "") for t in tools or []]
+    for name in names:
+        if "command" in name or "shell" in name:
+            return name
+    return names[0] if names else "run_command"
+
+
+class FakeChatHandler(BaseHTTPRequestHandler):
+    """Answers /chat/completions by walking the build steps one tool call at a time."""
+
+    server_version = "FakeOpenAI/1.0"
+
+    def log_message(self, format, *args):  # noqa: A002 - BaseHTTPRequestHandler signature
+        pass
+
+    def do_POST(self):
+        start = time.perf_counter()
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        time.sleep(self.server.model_latency)
+
+        messages = body.get("messages", [])
+        project_dir, steps = _script_from_messages(messages)
+        done = sum(1 for m in messages if m.get("role") == "tool")
+        if project_dir and done < len(steps):
+            arguments = json.dumps({"command": f'cd "{project_dir}" && {steps[done]}'})
+            message = {
+                "role": "assistant",
+                "content": None,
+                "tool_calls": [{
+                    "id": f"call_{uuid.uuid4().hex[:12]}",
+                    "type": "function",
+                    "function": {"name": _pick_tool(body.get("tools")), "arguments": arguments},
+                }],
+            }
+            finish = "tool_calls"
+        else:
+            message = {"role": "assistant", "content": f"Build finished after {done} shell commands."}
+            finish = "stop"
+
+        if body.get("stream"):
+            self._send_stream(body.get("model", "fake"), message, finish)
+        else:
+            self._send_json({
+                "id": f"chatcmpl-{uuid.uuid4().hex}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": body.get("model", "fake"),
+                "choices": [{"index": 0, "message": message, "finish_reason": finish}],
+                "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+            })
+        self.server.metrics.add("model_round_trip", time.perf_counter() - start)
+
+    def _send_json(self, payload: Dict[str, Any]) -> None:
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_stream(self, model: str, message: Dict[str, Any], finish: str) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        delta: Dict[str, Any] = {"role": "assistant"}
+        if message.get("tool_calls"):
+            delta["tool_calls"] = [dict(call, index=i) for i, call in enumerate(message["tool_calls"])]
+        else:
+            delta["content"] = message["content"]
+        chunk_id = f"chatcmpl-{uuid.uuid4().hex}"
+        for choice in ({"index": 0, "delta": delta, "finish_reason": None},
+                       {"index": 0, "delta": {}, "finish_reason": finish}):
+            chunk = {"id": chunk_id, "object": "chat.completion.chunk", "created": int(time.time()),
+                     "model": model, "choices": [choice]}
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+
+def start_fake_model(metrics: Metrics, model_latency: float) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeChatHandler)
+    server.daemon_threads = True
+    server.metrics = metrics
+    server.model_latency = model_latency
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# ---------------------------------------------------------------------------
+# In-process MCP shell server and fake TeX binaries
+# ---------------------------------------------------------------------------
+
+def install_fake_tex(bin_dir: str) -> None:
+    scripts = {"pdflatex": FAKE_TEX_SCRIPT, "xelatex": FAKE_TEX_SCRIPT, "bibtex": FAKE_BIBTEX_SCRIPT}
+    for name, template in scripts.items():
+        path = os.path.join(bin_dir, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(template.format(python=sys.executable))
+        os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+
+
+def build_shell_server(metrics: Metrics, env: Dict[str, str]):
+    from mcp.server.fastmcp import FastMCP
+
+    server = FastMCP("fake-shell")
+
+    @server.tool()
+    async def run_command(command: str) -> str:
+        """Run a shell command and return its combined output."""
+        start = time.perf_counter()
+        proc = await asyncio.create_subprocess_shell(
+            command, env=env, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT
+        )
+        out, _ = await proc.communicate()
+        metrics.add("tool_round_trip", time.perf_counter() - start)
+        return f"exit code {proc.returncode}\n{out.decode('utf-8', 'replace')[-2000:]}"
+
+    return server
+
+
+async def _one_compile(project_dir: str, server, model_factory, metrics: Metrics) -> bool:
+    from agno.tools.mcp import MCPTools
+    from mcp.shared.memory import create_connected_server_and_client_session
+
+    start = time.perf_counter()
+    async with create_connected_server_and_client_session(server._mcp_server) as session:
+        mcp_tools = MCPTools(session=session)
+        await mcp_tools.connect()
+        metrics.add("connect", time.perf_counter() - start)
+
+        # Off the loop, as in mcp_compile.run_mcp_compile, so the measured loop is not blocked on disk reads.
+        engine = await asyncio.to_thread(latex_build.detect_engine, project_dir, "main.tex")
+        agent = mcp_compile.build_compile_agent(project_dir, "main.tex", mcp_tools, model_factory(), engine=engine)
+        await agent.arun("Compile the LaTeX project now.")
+    metrics.add("total", time.perf_counter() - start)
+    return os.path.exists(os.path.join(project_dir, "main.pdf"))
+
+
+async def run_load(compiles: int, concurrency: int, model_latency: float, tex_delay: float) -> Metrics:
+    from agno.models.openai import OpenAIChat
+
+    metrics = Metrics()
+    work_dir = tempfile.mkdtemp(prefix="mcp_compile_load_")
+    bin_dir = os.path.join(work_dir, "bin")
+    os.makedirs(bin_dir)
+    install_fake_tex(bin_dir)
+
+    env = os.environ.copy()
+    env["PATH"] = bin_dir + os.pathsep + env.get("PATH", "")
+    env["FAKE_TEX_DELAY"] = str(tex_delay)
+
+    fake_model = start_fake_model(metrics, model_latency)
+    base_url = f"http://127.0.0.1:{fake_model.server_address[1]}/v1"
+    shell_server = build_shell_server(metrics, env)
+
+    def model_factory():
+        return OpenAIChat(id="fake-gpt-4o", base_url=base_url, api_key="offline")
+
+    projects = []
+    for i in range(compiles):
+        project_dir = os.path.join(work_dir, f"paper_{i:04d}")
+        os.makedirs(project_dir)
+        with open(os.path.join(project_dir, "main.tex"), "w", encoding="utf-8") as f:
+            f.write("\\documentclass{article}\\begin{document}Hi\\end{document}\n")
+        projects.append(project_dir)
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded(project_dir: str) -> bool:
+        async with semaphore:
+            return await _one_compile(project_dir, shell_server, model_factory, metrics)
+
+    wall_start = time.perf_counter()
+    try:
+        results = await asyncio.gather(*(bounded(d) for d in projects), return_exceptions=True)
+    finally:
+        fake_model.shutdown()
+        shutil.rmtree(work_dir, ignore_errors=True)
+    wall = time.perf_counter() - wall_start
+
+    failures = [r for r in results if r is not True]
+    print(f"compiles={compiles} concurrency={concurrency} wall={wall:.2f}s "
+          f"throughput={compiles / wall:.2f}/s failures={len(failures)}")
+    for failure in failures[:3]:
+        print(f"  failure: {failure!r}")
+    return metrics
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Offline load test for mcp_compile")
+    p.add_argument("--compiles", type=int, default=8, help="Number of compiles to run (default: 8)")
+    p.add_argument("--concurrency", type=int, default=4, help="Concurrent agent sessions (default: 4)")
+    p.add_argument("--model_latency_ms", type=float, default=0.0, help="Injected latency per model call")
+    p.add_argument("--tex_delay_ms", type=float, default=50.0, help="Simulated duration of one TeX pass")
+    args = p.parse_args()
+
+    metrics = asyncio.run(run_load(args.compiles, args.concurrency,
+                                   args.model_latency_ms / 1000.0, args.tex_delay_ms / 1000.0))
+    for name in ("connect", "model_round_trip", "tool_round_trip", "total"):
+        print(metrics.summary(name))
+
+
+if __name__ == "__main__":
+    main()
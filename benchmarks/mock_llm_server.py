@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Local OpenAI- and Anthropic-compatible stand-in for load testing the
+baml_src clients.
+
+Serves POST /v1/chat/completions (OpenAI) and POST /v1/messages
+(Anthropic), streaming or not. Every response is delayed by a draw from a
+latency distribution, and a configurable share of requests fail with 500 or
+429 (with Retry-After). An optional requests-per-second limit returns 429
+once its token bucket is empty. The completion text is a fixed Resume JSON
+document by default, so ExtractResume parses it.
+
+Settings can be overridden per model name, e.g. a slow or flaky gpt-4o-mini
+next to a healthy claude-3-haiku, to exercise fallback and routing.
+
+Usage:
+  python -m benchmarks.mock_llm_server --port 8765 --latency_ms 300 --error_rate 0.05
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field, fields, replace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "lognormal")
+
+DEFAULT_RESPONSE = json.dumps({
+    "name": "Vaibhav Gupta",
+    "email": "vbv@boundaryml.com",
+    "experience": ["Founder at BoundaryML", "CV Engineer at Google", "CV Engineer at Microsoft"],
+    "skills": ["Rust", "C++"],
+}, indent=2)
+
+
+@dataclass
+class MockLLMConfig:
+    latency_ms: float = 200.0
+    latency_dist: str = "lognormal"
+    # Shape of the lognormal distribution (latency_ms is its median) or half-width of the
+    # uniform one as a fraction of latency_ms.
+    latency_sigma: float = 0.5
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    rps_limit: float = 0.0
+    retry_after: float = 1.0
+    response_text: str = DEFAULT_RESPONSE
+    stream_chunks: int = 8
+    model_overrides: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+    def for_model(self, model: str) -> "MockLLMConfig":
+        overrides = self.model_overrides.get(model)
+        return replace(self, **overrides) if overrides else self
+
+    def sample_latency(self, rng: random.Random) -> float:
+        base = self.latency_ms / 1000.0
+        if self.latency_dist == "fixed" or base <= 0:
+            return max(base, 0.0)
+        if self.latency_dist == "uniform":
+            return max(0.0, rng.uniform(base * (1 - self.latency_sigma), base * (1 + self.latency_sigma)))
+        return rng.lognormvariate(0.0, self.latency_sigma) * base
+
+
+class MockStats:
+    """Thread-safe counters of what the server has answered."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.by_status: Dict[int, int] = {}
+        self.by_model: Dict[str, int] = {}
+
+    def record(self, model: str, status: int) -> None:
+        with self._lock:
+            self.requests += 1
+            self.by_status[status] = self.by_status.get(status, 0) + 1
+            self.by_model[model] = self.by_model.get(model, 0) + 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"requests": self.requests, "by_status": dict(self.by_status), "by_model": dict(self.by_model)}
+
+    def reset(self) -> None:
+        with self._lock:
+            self.requests = 0
+            self.by_status.clear()
+            self.by_model.clear()
+
+
+class _TokenBucket:
+    def __init__(self, rate: float):
+        self.rate = rate
+        # At least one whole token, or a fractional rate could never admit a request.
+        self.capacity = max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1.0:
+                self.tokens -= 1.0
+                return True
+            return False
+
+
+def _chunks(text: str, count: int):
+    size = max(1, -(-len(text) // max(count, 1)))
+    return [text[i:i + size] for i in range(0, len(text), size)] or [""]
+
+
+class MockLLMHandler(BaseHTTPRequestHandler):
+    server_version = "MockLLM/1.0"
+
+    def log_message(self, format, *args):  # noqa: A002 - BaseHTTPRequestHandler signature
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        model = body.get("model", "unknown")
+        api = "anthropic" if self.path.rstrip("/").endswith("/messages") else "openai"
+        server: MockLLMServer = self.server  # type: ignore[assignment]
+        config = server.config.for_model(model)
+
+        with server.rng_lock:
+            latency = config.sample_latency(server.rng)
+            roll = server.rng.random()
+
+        if server.bucket is not None and not server.bucket.take():
+            return self._fail(model, 429, api, config)
+        if roll < config.rate_limit_rate:
+            time.sleep(latency * 0.1)
+            return self._fail(model, 429, api, config)
+        if roll < config.rate_limit_rate + config.error_rate:
+            time.sleep(latency)
+            return self._fail(model, 500, api, config)
+
+        if body.get("stream"):
+            self._stream(model, api, config, latency)
+        else:
+            time.sleep(latency)
+            self._send_json(200, self._completion(model, api, config.response_text))
+        server.stats.record(model, 200)
+
+    def _fail(self, model: str, status: int, api: str, config: MockLLMConfig) -> None:
+        message = "Rate limit exceeded" if status == 429 else "Injected server error"
+        if api == "anthropic":
+            payload = {"type": "error", "error": {"type": "rate_limit_error" if status == 429 else "api_error",
+                                                  "message": message}}
+        else:
+            payload = {"error": {"message": message, "type": "rate_limit_exceeded" if status == 429 else "server_error"}}
+        headers = {"Retry-After": f"{config.retry_after:g}"} if status == 429 else {}
+        self._send_json(status, payload, headers)
+        self.server.stats.record(model, status)  # type: ignore[attr-defined]
+
+    @staticmethod
+    def _completion(model: str, api: str, text: str) -> Dict[str, Any]:
+        if api == "anthropic":
+            return {
+                "id": f"msg_{uuid.uuid4().hex[:24]}",
+                "type": "message",
+                "role": "assistant",
+                "model": model,
+                "content": [{"type": "text", "text": text}],
+                "stop_reason": "end_turn",
+                "stop_sequence": None,
+                "usage": {"input_tokens": 0, "output_tokens": 0},
+            }
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        }
+
+    def _send_json(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _sse(self, payload: Dict[str, Any], event: Optional[str] = None) -> None:
+        prefix = f"event: {event}\n" if event else ""
+        self.wfile.write(f"{prefix}data: {json.dumps(payload)}\n\n".encode("utf-8"))
+        self.wfile.flush()
+
+    def _stream(self, model: str, api: str, config: MockLLMConfig, latency: float) -> None:
+        # Half the latency before the first token, the rest spread over the chunks.
+        pieces = _chunks(config.response_text, config.stream_chunks)
+        gap = latency / 2 / len(pieces)
+        time.sleep(latency / 2)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        if api == "anthropic":
+            message = self._completion(model, api, "")
+            self._sse({"type": "message_start", "message": dict(message, content=[])}, "message_start")
+            self._sse({"type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""}},
+                      "content_block_start")
+            for piece in pieces:
+                time.sleep(gap)
+                self._sse({"type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": piece}},
+                          "content_block_delta")
+            self._sse({"type": "content_block_stop", "index": 0}, "content_block_stop")
+            self._sse({"type": "message_delta", "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+                       "usage": {"output_tokens": 0}}, "message_delta")
+            self._sse({"type": "message_stop"}, "message_stop")
+            return
+        chunk_id = f"chatcmpl-{uuid.uuid4().hex}"
+        for i, piece in enumerate(pieces):
+            time.sleep(gap)
+            delta = {"role": "assistant", "content": piece} if i == 0 else {"content": piece}
+            self._sse({"id": chunk_id, "object": "chat.completion.chunk", "created": int(time.time()),
+                       "model": model, "choices": [{"index": 0, "delta": delta, "finish_reason": None}]})
+        self._sse({"id": chunk_id, "object": "chat.completion.chunk", "created": int(time.time()),
+                   "model": model, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]})
+        self.wfile.write(b"data: [DONE]\n\n")
+
+
+class MockLLMServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, config: MockLLMConfig, host: str = "127.0.0.1", port: int = 0, seed: Optional[int] = None):
+        super().__init__((host, port), MockLLMHandler)
+        self.config = config
+        self.stats = MockStats()
+        self.rng = random.Random(seed)
+        self.rng_lock = threading.Lock()
+        self.bucket = _TokenBucket(config.rps_limit) if config.rps_limit > 0 else None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "MockLLMServer":
+        self._thread = threading.Thread(target=self.serve_forever, name="mock-llm", daemon=True)
+        self._thread.start()
+        return self
+
+    def close(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+def start_mock_llm(config: Optional[MockLLMConfig] = None, port: int = 0, seed: Optional[int] = None) -> MockLLMServer:
+    """Start the server on a background thread and return it (base_url, stats, close())."""
+    return MockLLMServer(config or MockLLMConfig(), port=port, seed=seed).start()
+
+
+def add_config_arguments(p: argparse.ArgumentParser) -> None:
+    p.add_argument("--latency_ms", type=float, default=200.0, help="Median response latency")
+    p.add_argument("--latency_dist", choices=LATENCY_DISTRIBUTIONS, default="lognormal")
+    p.add_argument("--latency_sigma", type=float, default=0.5, help="Lognormal sigma / uniform half-width fraction")
+    p.add_argument("--error_rate", type=float, default=0.0, help="Share of requests answered with 500")
+    p.add_argument("--rate_limit_rate", type=float, default=0.0, help="Share of requests answered with 429")
+    p.add_argument("--rps_limit", type=float, default=0.0, help="Token-bucket request limit (0 = unlimited)")
+    p.add_argument("--model_overrides", type=json.loads, default={},
+                   help='Per-model settings as JSON, e.g. \'{"gpt-4o-mini": {"error_rate": 0.3}}\'')
+
+
+def config_from_args(args: argparse.Namespace) -> MockLLMConfig:
+    names = {f.name for f in fields(MockLLMConfig)}
+    return MockLLMConfig(**{k: v for k, v in vars(args).items() if k in names})
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Mock OpenAI/Anthropic server")
+    p.add_argument("--port", type=int, default=8765)
+    add_config_arguments(p)
+    args = p.parse_args()
+
+    server = MockLLMServer(config_from_args(args), port=args.port)
+    print(f"Mock LLM listening on {server.base_url} (OpenAI: {server.base_url}/v1, Anthropic: {server.base_url})",
+          flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(json.dumps(server.stats.snapshot(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
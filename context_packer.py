@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+文献上下文打包器
+研究阶段把候选摘要写进 literature_summary 时，提示词预算是固定的。
+以前只能截断或者超长，现在改为：
+  1. 候选项：每篇论文的摘要；过长的摘要按句子切成若干片段
+  2. 相关性：对主题做BM25打分（英文按词，中文按二元组），标题词加权
+  3. token数：本地估算，不调用分词器
+  4. 选择：0/1背包动态规划，在预算内使相关性总分最大
+保证不超预算，也不需要"超长→截断→重试"的来回。
+
+用法:
+  python context_packer.py "multi-agent coordination" multiagent_papers --budget 1500
+"""
+
+import argparse
+import math
+import os
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+from baml_ext.chunking import estimate_tokens, split_text
+from baml_ext.packing import load_papers
+
+DEFAULT_BUDGET_TOKENS = 2000
+# 摘要超过这个长度就切成片段，片段可以单独入选
+SNIPPET_TOKENS = 200
+# 每个候选项的标题行和分隔符
+ITEM_OVERHEAD_TOKENS = 8
+# 动态规划的容量格数上限：预算更大时按比例放粗粒度
+MAX_DP_CELLS = 1024
+BM25_K1 = 1.5
+BM25_B = 0.75
+TITLE_WEIGHT = 2
+
+_WORD = re.compile(r"[a-z0-9]+(?:-[a-z0-9]+)*")
+_CJK_RUN = re.compile(r"[\u4e00-\u9fff]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the this to we with our via using".split()
+)
+
+
+@dataclass
+class Candidate:
+    """一个可入选的上下文片段"""
+    key: str
+    title: str
+    text: str
+    tokens: int = 0
+    score: float = 0.0
+
+    def __post_init__(self):
+        if not self.tokens:
+            self.tokens = estimate_tokens(self.title) + estimate_tokens(self.text) + ITEM_OVERHEAD_TOKENS
+
+
+@dataclass
+class PackResult:
+    selected: List[Candidate]
+    budget: int
+    used_tokens: int
+    considered: int
+    total_score: float
+    dropped: List[Candidate] = field(default_factory=list)
+
+
+def terms(text: str) -> List[str]:
+    """检索用的词项：英文小写单词（去停用词），中文二元组"""
+    lowered = text.lower()
+    words = [w for w in _WORD.findall(lowered) if w not in _STOPWORDS and len(w) > 1]
+    for run in _CJK_RUN.findall(text):
+        words.extend(run[i:i + 2] for i in range(max(1, len(run) - 1)))
+    return words
+
+
+def find_paper_entries(paths: Iterable[str]) -> List[str]:
+    """展开路径：目录下递归查找 paper_entries.json，文件原样返回"""
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                if "paper_entries.json" in files:
+                    found.append(os.path.join(root, "paper_entries.json"))
+        elif os.path.isfile(path):
+            found.append(path)
+    return sorted(found)
+
+
+def make_candidates(papers: Dict[str, Dict[str, str]], snippet_tokens: int = SNIPPET_TOKENS) -> List[Candidate]:
+    """每篇论文一个候选项；摘要过长时改为若干句子片段"""
+    candidates = []
+    for arxiv_id, paper in papers.items():
+        abstract = " ".join(paper["abstract"].split())
+        if estimate_tokens(abstract) <= snippet_tokens:
+            candidates.append(Candidate(arxiv_id, paper["title"], abstract))
+            continue
+        for i, snippet in enumerate(split_text(abstract, snippet_tokens), 1):
+            candidates.append(Candidate(f"{arxiv_id}#{i}", paper["title"], snippet.strip()))
+    return candidates
+
+
+def score_candidates(query: str, candidates: Sequence[Candidate]) -> None:
+    """BM25相关性打分，写入 candidate.score；标题词按 TITLE_WEIGHT 倍计"""
+    query_terms = set(terms(query))
+    docs = [Counter(terms(c.text)) + Counter({t: TITLE_WEIGHT * n for t, n in Counter(terms(c.title)).items()})
+            for c in candidates]
+    if not docs or not query_terms:
+        return
+    avg_len = sum(sum(d.values()) for d in docs) / len(docs) or 1.0
+    df = Counter(t for d in docs for t in query_terms if t in d)
+    for candidate, doc in zip(candidates, docs):
+        length = sum(doc.values())
+        score = 0.0
+        for t in query_terms:
+            tf = doc.get(t, 0)
+            if not tf:
+                continue
+            idf = math.log(1 + (len(docs) - df[t] + 0.5) / (df[t] + 0.5))
+            score += idf * tf * (BM25_K1 + 1) / (tf + BM25_K1 * (1 - BM25_B + BM25_B * length / avg_len))
+        candidate.score = score
+
+
+def knapsack(weights: Sequence[int], values: Sequence[float], capacity: int,
+             max_cells: int = MAX_DP_CELLS) -> List[int]:
+    """0/1背包：返回总重量不超过capacity、总价值最大的下标集合
+
+    容量超过max_cells时按粒度g向上取整重量（保守，不会超预算），复杂度 O(n × max_cells)。
+    """
+    if capacity <= 0:
+        return []
+    grain = max(1, math.ceil(capacity / max_cells))
+    cells = capacity // grain
+    scaled = [math.ceil(w / grain) for w in weights]
+    best = [0.0] * (cells + 1)
+    take = []
+    for w, v in zip(scaled, values):
+        row = bytearray(cells + 1)
+        if v > 0 and w <= cells:
+            for c in range(cells, w - 1, -1):
+                candidate = best[c - w] + v
+                if candidate > best[c]:
+                    best[c] = candidate
+                    row[c] = 1
+        take.append(row)
+    chosen, c = [], cells
+    for i in range(len(take) - 1, -1, -1):
+        if take[i][c]:
+            chosen.append(i)
+            c -= scaled[i]
+    return sorted(chosen)
+
+
+def pack_context(query: str, candidates: List[Candidate], budget_tokens: int = DEFAULT_BUDGET_TOKENS) -> PackResult:
+    """在 budget_tokens 内选出相关性总分最大的候选项，按相关性从高到低排列"""
+    score_candidates(query, candidates)
+    values = [c.score for c in candidates]
+    if candidates and not any(v > 0 for v in values):
+        # 没有任何词命中（例如中文主题、英文摘要）：退化为在预算内放尽量多的条目
+        print("⚠️ 主题与候选文献没有共同词项，按条目数填充预算")
+        values = [1.0] * len(candidates)
+    chosen = set(knapsack([c.tokens for c in candidates], values, budget_tokens))
+    selected = sorted((candidates[i] for i in chosen), key=lambda c: -c.score)
+    return PackResult(
+        selected=selected,
+        budget=budget_tokens,
+        used_tokens=sum(c.tokens for c in selected),
+        considered=len(candidates),
+        total_score=sum(c.score for c in selected),
+        dropped=[c for i, c in enumerate(candidates) if i not in chosen],
+    )
+
+
+_LATEX_SPECIALS = {
+    "\\": r"\textbackslash{}",
+    "{": r"\{",
+    "}": r"\}",
+    "$": r"\$",
+    "&": r"\&",
+    "%": r"\%",
+    "#": r"\#",
+    "_": r"\_",
+    "^": r"\textasciicircum{}",
+    "~": r"\textasciitilde{}",
+}
+_LATEX_SPECIAL_RE = re.compile("|".join(re.escape(c) for c in _LATEX_SPECIALS))
+
+
+def _latex_text(text: str) -> str:
+    """转义全部LaTeX特殊字符（\\ { } $ ^ ~ & % # _），摘要里的LaTeX命令和公式按原文字面输出，
+    一次替换完成，不会二次转义"""
+    return _LATEX_SPECIAL_RE.sub(lambda m: _LATEX_SPECIALS[m.group()], text)
+
+
+def render_context(result: PackResult, latex: bool = False) -> str:
+    """把入选的候选项渲染为提示词/正文片段"""
+    if latex:
+        items = [f"    \\item \\textbf{{{_latex_text(c.title)}}} ({_latex_text(c.key)}): {_latex_text(c.text)}"
+                 for c in result.selected]
+        return "\\begin{itemize}\n" + "\n".join(items) + "\n\\end{itemize}" if items else ""
+    return "\n\n".join(f"[{c.key}] {c.title}\n{c.text}" for c in result.selected)
+
+
+def build_literature_context(topic: str, paths: Iterable[str], budget_tokens: int = DEFAULT_BUDGET_TOKENS,
+                             latex: bool = False) -> Tuple[str, PackResult]:
+    """从 paper_entries.json 文件/目录构建主题相关的文献上下文"""
+    papers = load_papers(find_paper_entries(paths))
+    result = pack_context(topic, make_candidates(papers), budget_tokens)
+    return render_context(result, latex), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="按token预算为主题挑选文献上下文")
+    parser.add_argument("topic", help="研究主题")
+    parser.add_argument("paths", nargs="+", help="paper_entries.json 文件或包含它们的目录")
+    parser.add_argument("--budget", type=int, default=DEFAULT_BUDGET_TOKENS, help="token预算")
+    args = parser.parse_args()
+
+    text, result = build_literature_context(args.topic, args.paths, args.budget)
+    print(text)
+    print(f"\n📦 {len(result.selected)}/{result.considered} 个候选项入选，"
+          f"约 {result.used_tokens}/{result.budget} tokens，相关性总分 {result.total_score:.2f}")
+
+
+if __name__ == "__main__":
+    main()
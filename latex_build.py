@@ -0,0 +1,419 @@
+#!/usr/bin/env python3
+"""
+Compile a LaTeX project out of tree, in a RAM-backed scratch directory.
+
+The TeX engine runs with -output-directory pointing at a scratch directory
+(on /dev/shm when it exists), so main.aux, .bbl, .blg, .log, .out and .toc
+never touch the project folder. Only the final PDF and a gzip-compressed log
+are copied back.
+
+The engine defaults to "auto": projects containing CJK text or loading
+ctex/xeCJK are built with xelatex, everything else with pdflatex. Because the
+first xelatex/ctex run spends most of its time building font caches, workers
+call prewarm_caches() at start. Set LATEX_CACHE_DIR to keep the TeX and font
+caches on a persistent volume when workers run with a throwaway HOME.
+
+Usage:
+  python latex_build.py --project_dir "result/deep_learning_paper"
+  python latex_build.py --project_dir "result/deep_learning_paper" --build_mode in_tree
+  python latex_build.py --prewarm
+
+Set LATEX_SCRATCH_ROOT to override where scratch directories are created.
+"""
+
+import argparse
+import gzip
+import hashlib
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+BUILD_MODES = ("tmpfs", "in_tree")
+RAM_SCRATCH_ROOT = "/dev/shm"
+PASS_TIMEOUT = 300
+MAX_PASSES = 5
+# Files whose contents feed the next pass; a rebuild stops once they are stable.
+RERUN_EXTENSIONS = (".aux", ".toc", ".lof", ".lot", ".out")
+
+_WARNING_RE = re.compile(r"^(?:LaTeX|Package \S+|Class \S+) Warning", re.MULTILINE)
+_MAGIC_PROGRAM_RE = re.compile(r"^%\s*!\s*TeX\s+(?:TS-)?program\s*=\s*(\w+)", re.IGNORECASE | re.MULTILINE)
+_CJK_PACKAGE_RE = re.compile(
+    r"\\(?:usepackage|RequirePackage)(?:\[[^\]]*\])?\{[^}]*\b(?:ctex|xeCJK)\b"
+    r"|\\documentclass(?:\[[^\]]*\])?\{ctex"
+)
+_CJK_CHAR_RE = re.compile("[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff]")
+_COMMENT_RE = re.compile(r"(?<!\\)%.*$", re.MULTILINE)
+_CITATION_RE = re.compile(r"^\\(?:citation|bibdata|bibstyle)\{.*\}$", re.MULTILINE)
+
+
+@dataclass
+class BuildResult:
+    """Outcome of one project build."""
+    success: bool
+    project_dir: str
+    engine: str
+    build_mode: str
+    pdf_path: Optional[str] = None
+    log_path: Optional[str] = None
+    passes: int = 0
+    bibtex_run: bool = False
+    warnings: int = 0
+    elapsed: float = 0.0
+    error: str = ""
+
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "research-assistant", "texmf")
+_PREWARM_DOCUMENT = r"""\documentclass[UTF8]{ctexart}
+\begin{document}
+预热字体缓存 Font cache warm-up
+\end{document}
+"""
+
+
+def scratch_root() -> str:
+    """Directory under which per-build scratch directories are created."""
+    root = os.environ.get("LATEX_SCRATCH_ROOT")
+    if root:
+        return root
+    if os.path.isdir(RAM_SCRATCH_ROOT) and os.access(RAM_SCRATCH_ROOT, os.W_OK):
+        return RAM_SCRATCH_ROOT
+    return tempfile.gettempdir()
+
+
+def cache_dir() -> str:
+    """Directory holding prewarm stamps, and the TeX/font caches when LATEX_CACHE_DIR is set."""
+    return os.environ.get("LATEX_CACHE_DIR", DEFAULT_CACHE_DIR)
+
+
+def _cache_env(env: Dict[str, str]) -> Dict[str, str]:
+    # Only redirect caches when asked to: workers with an ephemeral HOME point
+    # LATEX_CACHE_DIR at a persistent volume, everyone else keeps TeX's defaults.
+    root = env.get("LATEX_CACHE_DIR")
+    if root:
+        os.makedirs(root, exist_ok=True)
+        # TEXMFVAR holds luaotfload/format caches (TeX Live); fontconfig follows XDG_CACHE_HOME.
+        env.setdefault("TEXMFVAR", os.path.join(root, "texmf-var"))
+        env.setdefault("XDG_CACHE_HOME", os.path.join(root, "xdg"))
+    return env
+
+
+def _project_sources(project_dir: str, main_tex: str) -> List[str]:
+    paths = [os.path.join(project_dir, main_tex)]
+    modules_dir = os.path.join(project_dir, "modules")
+    if os.path.isdir(modules_dir):
+        paths += [os.path.join(modules_dir, name) for name in sorted(os.listdir(modules_dir))
+                  if name.endswith(".tex")]
+    return paths
+
+
+def detect_engine(project_dir: str, main_tex: str = "main.tex") -> str:
+    """Pick xelatex for CJK projects and pdflatex otherwise.
+
+    A "% !TEX program = ..." magic comment in the main file wins.
+    """
+    sources = []
+    for path in _project_sources(project_dir, main_tex):
+        try:
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                sources.append(f.read())
+        except OSError:
+            continue
+    if sources:
+        magic = _MAGIC_PROGRAM_RE.search(sources[0])
+        if magic:
+            return magic.group(1).lower()
+    for text in sources:
+        text = _COMMENT_RE.sub("", text)
+        if _CJK_PACKAGE_RE.search(text) or _CJK_CHAR_RE.search(text):
+            return "xelatex"
+    return "pdflatex"
+
+
+def prewarm_caches(engines: Iterable[str] = ("xelatex",), force: bool = False) -> Dict[str, bool]:
+    """Build font and package caches once per cache directory.
+
+    Runs fc-cache and a throwaway ctex document per engine, then leaves a
+    stamp file so later worker starts return immediately. Returns
+    {engine: warmed}; engines that are not installed report False.
+    """
+    env = _cache_env(os.environ.copy())
+    root = cache_dir()
+    os.makedirs(root, exist_ok=True)
+    warmed = {}
+    for engine in engines:
+        stamp = os.path.join(root, f"prewarm-{engine}.stamp")
+        if os.path.exists(stamp) and not force:
+            warmed[engine] = True
+            continue
+        if shutil.which(engine) is None:
+            warmed[engine] = False
+            continue
+        if shutil.which("fc-cache"):
+            try:
+                _run(["fc-cache"], cwd=root, env=env)
+            except (OSError, subprocess.SubprocessError):
+                pass
+        work_dir = tempfile.mkdtemp(prefix="latex_prewarm_", dir=scratch_root())
+        try:
+            with open(os.path.join(work_dir, "prewarm.tex"), "w", encoding="utf-8") as f:
+                f.write(_PREWARM_DOCUMENT)
+            proc = _run([engine, "-interaction=nonstopmode", "prewarm.tex"], cwd=work_dir, env=env)
+            warmed[engine] = proc.returncode == 0
+        except (OSError, subprocess.SubprocessError):
+            warmed[engine] = False
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+        if warmed[engine]:
+            with open(stamp, "w", encoding="utf-8") as f:
+                f.write(time.strftime("%Y-%m-%d %H:%M:%S"))
+    return warmed
+
+
+def _mirror_subdirs(project_dir: str, out_dir: str) -> None:
+    # \include writes modules/<name>.aux next to the output, so the
+    # scratch directory needs the same subdirectory layout.
+    for root, dirs, _files in os.walk(project_dir):
+        dirs[:] = [d for d in dirs if not d.startswith(".")]
+        rel = os.path.relpath(root, project_dir)
+        if rel != ".":
+            os.makedirs(os.path.join(out_dir, rel), exist_ok=True)
+
+
+def _run(cmd: List[str], cwd: str, env: Dict[str, str]) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        cmd,
+        cwd=cwd,
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        encoding="utf-8",
+        errors="replace",
+        timeout=PASS_TIMEOUT,
+    )
+
+
+def _read_aux(aux_path: str) -> str:
+    try:
+        with open(aux_path, "r", encoding="utf-8", errors="replace") as f:
+            return f.read()
+    except OSError:
+        return ""
+
+
+def _needs_bibtex(aux: str) -> bool:
+    return "\\bibdata" in aux and "\\citation" in aux
+
+
+def _citation_keys(aux: str) -> List[str]:
+    return sorted(_CITATION_RE.findall(aux))
+
+
+def _rerun_digest(out_dir: str) -> str:
+    digest = hashlib.md5()
+    for root, _dirs, files in os.walk(out_dir):
+        for name in sorted(files):
+            if name.endswith(RERUN_EXTENSIONS):
+                with open(os.path.join(root, name), "rb") as f:
+                    digest.update(name.encode("utf-8"))
+                    digest.update(f.read())
+    return digest.hexdigest()
+
+
+def _count_warnings(log_path: str) -> int:
+    try:
+        with open(log_path, "r", encoding="utf-8", errors="replace") as f:
+            return len(_WARNING_RE.findall(f.read()))
+    except OSError:
+        return 0
+
+
+def _publish(src: str, dst: str) -> None:
+    # Copy next to the destination first so readers never see a partial PDF.
+    tmp = dst + ".tmp"
+    shutil.copyfile(src, tmp)
+    os.replace(tmp, dst)
+
+
+def _publish_log(src: str, dst: str) -> None:
+    tmp = dst + ".tmp"
+    with open(src, "rb") as f_in, gzip.open(tmp, "wb") as f_out:
+        shutil.copyfileobj(f_in, f_out)
+    os.replace(tmp, dst)
+
+
+def compile_project(
+    project_dir: str,
+    main_tex: str = "main.tex",
+    engine: str = "auto",
+    build_mode: str = "tmpfs",
+    scratch_dir: Optional[str] = None,
+    changed: Optional[Iterable[str]] = None,
+    on_event: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> BuildResult:
+    """Build project_dir and return a BuildResult.
+
+    In "tmpfs" mode every intermediate file lives in a scratch directory;
+    main.pdf and main.log.gz are copied back to project_dir. "in_tree" mode
+    reproduces the classic build in place. engine="auto" resolves through
+    detect_engine().
+
+    A full build runs the engine, bibtex when the aux file cites anything,
+    and further passes until the aux/toc files stop changing. Passing a
+    persistent `scratch_dir` together with the set of `changed` project
+    paths makes the build incremental: bibtex only reruns when
+    references.bib or the cited keys changed, and an edit that moves no
+    labels finishes after a single pass. A caller-owned scratch_dir is not
+    removed.
+
+    on_event, when given, receives progress dicts: "start", one "pass" per
+    engine run (with the running warning count), "bibtex" and "done".
+    """
+    if build_mode not in BUILD_MODES:
+        raise ValueError(f"Unknown build mode: {build_mode!r} (expected one of {BUILD_MODES})")
+
+    project_dir = os.path.abspath(project_dir)
+    if engine == "auto":
+        engine = detect_engine(project_dir, main_tex)
+    jobname = os.path.splitext(main_tex)[0]
+    result = BuildResult(success=False, project_dir=project_dir, engine=engine, build_mode=build_mode)
+    start = time.perf_counter()
+    emit = on_event or (lambda event: None)
+
+    owns_scratch = build_mode == "tmpfs" and scratch_dir is None
+    if build_mode == "tmpfs":
+        out_dir = scratch_dir or tempfile.mkdtemp(prefix="latex_", dir=scratch_root())
+        os.makedirs(out_dir, exist_ok=True)
+        _mirror_subdirs(project_dir, out_dir)
+    else:
+        out_dir = project_dir
+
+    aux_path = os.path.join(out_dir, jobname + ".aux")
+    changed_names = None if changed is None else {os.path.basename(c) for c in changed}
+    incremental = changed_names is not None and os.path.exists(aux_path)
+    cites_before = _citation_keys(_read_aux(aux_path)) if incremental else None
+
+    env = _cache_env(os.environ.copy())
+    # bibtex runs inside the scratch directory and must still find references.bib.
+    env["BIBINPUTS"] = project_dir + os.pathsep + env.get("BIBINPUTS", "")
+    env["BSTINPUTS"] = project_dir + os.pathsep + env.get("BSTINPUTS", "")
+    tex_cmd = [engine, "-interaction=nonstopmode", "-file-line-error", f"-output-directory={out_dir}", main_tex]
+
+    def run_tex() -> bool:
+        proc = _run(tex_cmd, cwd=project_dir, env=env)
+        result.passes += 1
+        if proc.returncode != 0:
+            result.error = f"[{engine}]\n{proc.stdout}"
+        if on_event:
+            emit({"event": "pass", "pass": result.passes, "returncode": proc.returncode,
+                  "warnings": _count_warnings(os.path.join(out_dir, jobname + ".log"))})
+        return proc.returncode == 0
+
+    def run_bibtex() -> bool:
+        proc = _run(["bibtex", jobname], cwd=out_dir, env=env)
+        result.bibtex_run = True
+        emit({"event": "bibtex", "returncode": proc.returncode})
+        # bibtex exits with 1 when it only printed warnings.
+        if proc.returncode > 1:
+            result.error = f"[bibtex]\n{proc.stdout}"
+        return proc.returncode <= 1
+
+    emit({"event": "start", "engine": engine, "build_mode": build_mode, "incremental": incremental})
+    try:
+        digest = _rerun_digest(out_dir) if incremental else None
+        ok = run_tex()
+        if ok:
+            aux = _read_aux(aux_path)
+            bbl_missing = not os.path.exists(os.path.join(out_dir, jobname + ".bbl"))
+            bib_stale = (not incremental or bbl_missing or "references.bib" in changed_names
+                         or _citation_keys(aux) != cites_before)
+            if _needs_bibtex(aux) and bib_stale:
+                ok = run_bibtex() and run_tex()
+        while ok and result.passes < MAX_PASSES:
+            previous, digest = digest, _rerun_digest(out_dir)
+            if digest == previous:
+                break
+            ok = run_tex()
+
+        pdf_out = os.path.join(out_dir, jobname + ".pdf")
+        log_out = os.path.join(out_dir, jobname + ".log")
+        result.warnings = _count_warnings(log_out)
+        result.success = not result.error and os.path.exists(pdf_out)
+
+        if build_mode == "tmpfs":
+            if os.path.exists(pdf_out):
+                result.pdf_path = os.path.join(project_dir, jobname + ".pdf")
+                _publish(pdf_out, result.pdf_path)
+            if os.path.exists(log_out):
+                result.log_path = os.path.join(project_dir, jobname + ".log.gz")
+                _publish_log(log_out, result.log_path)
+        else:
+            result.pdf_path = pdf_out if os.path.exists(pdf_out) else None
+            result.log_path = log_out if os.path.exists(log_out) else None
+    except (OSError, subprocess.SubprocessError) as e:
+        result.error = f"{type(e).__name__}: {e}"
+    finally:
+        if owns_scratch:
+            shutil.rmtree(out_dir, ignore_errors=True)
+
+    error_log = os.path.join(project_dir, "compile_error.log")
+    if result.success:
+        if os.path.exists(error_log):
+            os.remove(error_log)
+    elif result.error:
+        with open(error_log, "w", encoding="utf-8") as f:
+            f.write(result.error)
+
+    result.elapsed = time.perf_counter() - start
+    emit({"event": "done", "success": result.success, "passes": result.passes,
+          "warnings": result.warnings, "elapsed": result.elapsed})
+    return result
+
+
+def print_summary(result: BuildResult, tail_lines: int = 40) -> None:
+    """Print PDF size and the tail of the build log."""
+    status = "OK" if result.success else "FAILED"
+    print(f"[{status}] {result.project_dir} ({result.engine}, {result.build_mode}, "
+          f"{result.passes} passes, bibtex={'yes' if result.bibtex_run else 'no'}, {result.elapsed:.1f}s)")
+    if result.pdf_path and os.path.exists(result.pdf_path):
+        print(f"PDF: {result.pdf_path} ({os.path.getsize(result.pdf_path) / 1024:.1f} KB)")
+    if result.log_path and os.path.exists(result.log_path):
+        opener = gzip.open if result.log_path.endswith(".gz") else open
+        with opener(result.log_path, "rt", encoding="utf-8", errors="replace") as f:
+            lines = f.read().splitlines()
+        print(f"--- last {tail_lines} lines of {os.path.basename(result.log_path)} ---")
+        print("\n".join(lines[-tail_lines:]))
+    if result.error:
+        print(result.error)
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Compile a LaTeX project out of tree")
+    p.add_argument("--project_dir", help="Path to LaTeX project directory")
+    p.add_argument("--main_tex", default="main.tex", help="Main .tex file name (default: main.tex)")
+    p.add_argument("--engine", default="auto", help="TeX engine, or auto to detect CJK content (default: auto)")
+    p.add_argument("--build_mode", choices=BUILD_MODES, default="tmpfs",
+                   help="tmpfs: build in a RAM-backed scratch dir (default); in_tree: build in place")
+    p.add_argument("--prewarm", action="store_true", help="Build xelatex/ctex font caches before compiling")
+    args = p.parse_args()
+
+    if args.prewarm:
+        for engine, warmed in prewarm_caches(force=True).items():
+            print(f"prewarm {engine}: {'done' if warmed else 'skipped (engine missing or failed)'}")
+    if not args.project_dir:
+        if not args.prewarm:
+            p.error("--project_dir is required unless --prewarm is given")
+        return
+
+    result = compile_project(args.project_dir, args.main_tex, args.engine, args.build_mode)
+    print_summary(result)
+    raise SystemExit(0 if result.success else 1)
+
+
+if __name__ == "__main__":
+    main()
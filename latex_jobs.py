@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+"""
+LaTeX后台编译任务
+run_latex / create_and_compile_paper 的非阻塞版本：调用后立即返回任务ID，
+编译在后台线程池中进行，智能体可以继续写其他章节或论文；
+进度事件（第几遍编译、bibtex、警告数）可以用get_latex_job轮询，或用stream_job_events异步订阅。
+"""
+
+import asyncio
+import os
+import re
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+import latex_build
+import project_store
+
+DEFAULT_RESULT_DIR = "result"
+MAX_WORKERS = min(4, os.cpu_count() or 1)
+FINISHED_STATUSES = ("success", "failed", "error")
+# 已结束任务在任务表中保留的时间（秒）和条数上限，超出后从最早结束的开始清理
+FINISHED_JOB_TTL = 3600.0
+MAX_FINISHED_JOBS = 1000
+# 批量编译等待所有任务结束的默认超时（秒）
+BATCH_TIMEOUT = 600.0
+
+_PAPER_TEMPLATE = r"""\documentclass[12pt]{{article}}
+{cjk_support}\usepackage[utf8]{{inputenc}}
+
+% 常用包
+\usepackage{{amsmath,amsfonts,amssymb}}
+\usepackage{{graphicx,subfig,textcomp}}
+\usepackage{{hyperref,cite,multirow,geometry,setspace,abstract,titlesec}}
+
+% 页面
+\geometry{{margin=1in}}
+\setlength{{\parindent}}{{0pt}}
+\setlength{{\parskip}}{{6pt}}
+
+% 标题格式
+\titleformat{{\section}}{{\Large\bfseries}}{{\thesection}}{{1em}}{{}}
+\titleformat{{\subsection}}{{\large\bfseries}}{{\thesubsection}}{{1em}}{{}}
+
+% 超链接
+\hypersetup{{
+  colorlinks=true, linkcolor=blue, urlcolor=cyan, citecolor=blue,
+  pdftitle={{{title}}}, pdfauthor={{{author}}}
+}}
+
+\begin{{document}}
+\begin{{titlepage}}
+  \centering\vspace*{{2cm}}
+  {{\Huge\bfseries {title}\par}}\vspace{{1.5cm}}
+  {{\large {author}\par}}\vspace{{0.5cm}}{{\large \today\par}}\vfill
+  {{\large \textit{{Automatically generated research paper}}\par}}
+\end{{titlepage}}
+
+\tableofcontents\newpage
+
+{content}
+{bibliography}
+\end{{document}}
+"""
+_CJK_RE = re.compile("[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af]")
+
+
+def default_project_name(topic: str) -> str:
+    """CompilationAgent也使用的项目命名规则；路径分隔符换成下划线，去掉开头的点，保证是合法的项目ID"""
+    name = topic.lower().replace(" ", "_").replace("：", "").replace("-", "_")
+    name = re.sub(r"[/\\]", "_", name).lstrip(".")
+    return f"{name}_paper"
+
+
+def create_paper_project(topic: str, content: str, references: Optional[str] = None,
+                         author: str = "AI Research Team", project_name: Optional[str] = None,
+                         base_dir: str = DEFAULT_RESULT_DIR) -> str:
+    """在分片存储中创建项目，写出main.tex和references.bib，返回项目目录"""
+    project_dir = project_store.get_store(base_dir).create(project_name or default_project_name(topic))
+    needs_cjk = any(_CJK_RE.search(text or "") for text in (topic, content, author))
+    main_tex = _PAPER_TEMPLATE.format(
+        cjk_support="% 中文支持\n\\usepackage[UTF8]{ctex}\n" if needs_cjk else "",
+        title=topic,
+        author=author,
+        content=content.strip() + "\n",
+        bibliography="\\bibliographystyle{unsrt}\n\\bibliography{references}\n" if references else "",
+    )
+    with open(os.path.join(project_dir, "main.tex"), "w", encoding="utf-8") as f:
+        f.write(main_tex)
+    if references:
+        with open(os.path.join(project_dir, "references.bib"), "w", encoding="utf-8") as f:
+            f.write(references)
+    return project_dir
+
+
+def _compile_result(build: latex_build.BuildResult) -> Dict[str, Any]:
+    result = {
+        "status": "success" if build.success else "error",
+        "message": "LaTeX编译成功" if build.success else "LaTeX编译失败",
+        "project_path": build.project_dir,
+        "pdf_path": build.pdf_path,
+        "engine": build.engine,
+        "passes": build.passes,
+        "bibtex_run": build.bibtex_run,
+        "warnings": build.warnings,
+        "elapsed": round(build.elapsed, 3),
+    }
+    if not build.success:
+        result["error"] = build.error[-2000:]
+    return result
+
+
+@dataclass
+class LatexJob:
+    """一个后台编译任务"""
+    job_id: str
+    kind: str
+    project_dir: str
+    status: str = "queued"
+    events: List[Dict[str, Any]] = field(default_factory=list)
+    result: Optional[Dict[str, Any]] = None
+    created_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATUSES
+
+    def snapshot(self, since: int = 0) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "kind": self.kind,
+            "status": self.status,
+            "project_dir": self.project_dir,
+            "events": self.events[since:],
+            "next_event": len(self.events),
+            "result": self.result,
+        }
+
+
+def _prewarm_worker() -> None:
+    # 每个工作线程启动时预热一次xelatex字体缓存（有时间戳文件时立即返回）。
+    # 这是线程池的initializer，抛出异常会使整个线程池失效，所以失败只记录不抛出
+    try:
+        latex_build.prewarm_caches(("xelatex",))
+    except Exception as e:
+        print(f"⚠️ 预热xelatex缓存失败（不影响编译）: {e}")
+
+
+class LatexJobManager:
+    """后台编译线程池及任务表"""
+
+    def __init__(self, max_workers: int = MAX_WORKERS, finished_ttl: float = FINISHED_JOB_TTL,
+                 max_finished: int = MAX_FINISHED_JOBS):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="latex-job",
+                                            initializer=_prewarm_worker)
+        self._jobs: Dict[str, LatexJob] = {}
+        self._changed = threading.Condition()
+        self.finished_ttl = finished_ttl
+        self.max_finished = max_finished
+
+    def _evict(self) -> None:
+        """清理过期的已结束任务（调用方持有self._changed）"""
+        finished = sorted((job for job in self._jobs.values() if job.finished), key=lambda job: job.finished_at)
+        cutoff = time.time() - self.finished_ttl
+        excess = len(finished) - self.max_finished
+        for i, job in enumerate(finished):
+            if i < excess or job.finished_at < cutoff:
+                del self._jobs[job.job_id]
+
+    def _emit(self, job: LatexJob, event: Dict[str, Any]) -> None:
+        with self._changed:
+            job.events.append(dict(event, seq=len(job.events), time=time.time()))
+            self._changed.notify_all()
+
+    def submit(self, kind: str, project_dir: str, work: Callable[[LatexJob], Dict[str, Any]]) -> LatexJob:
+        """提交任务；work在工作线程中执行并返回结果字典"""
+        job = LatexJob(job_id=uuid.uuid4().hex[:12], kind=kind, project_dir=project_dir)
+        with self._changed:
+            self._evict()
+            self._jobs[job.job_id] = job
+
+        def run() -> None:
+            with self._changed:
+                job.status = "running"
+            try:
+                result = work(job)
+                status = "success" if result.get("status") == "success" else "failed"
+            except Exception as e:
+                result = {"status": "error", "message": f"编译过程中发生错误: {e}", "error_type": type(e).__name__}
+                status = "error"
+            with self._changed:
+                job.result = result
+                job.status = status
+                job.finished_at = time.time()
+                self._changed.notify_all()
+
+        self._executor.submit(run)
+        return job
+
+    def submit_compile(self, project_dir: str, main_tex_file: str = "main.tex") -> LatexJob:
+        def work(job: LatexJob) -> Dict[str, Any]:
+            build = latex_build.compile_project(project_dir, main_tex_file,
+                                                on_event=lambda event: self._emit(job, event))
+            return _compile_result(build)
+
+        return self.submit("run_latex", os.path.abspath(project_dir), work)
+
+    def submit_create_and_compile(self, topic: str, content: str, references: Optional[str] = None,
+                                  author: str = "AI Research Team", project_name: Optional[str] = None,
+                                  base_dir: str = DEFAULT_RESULT_DIR) -> LatexJob:
+        project_dir = project_store.get_store(base_dir).path_for(project_name or default_project_name(topic))
+
+        def work(job: LatexJob) -> Dict[str, Any]:
+            create_paper_project(topic, content, references, author, project_name, base_dir)
+            self._emit(job, {"event": "created", "project_dir": project_dir})
+            build = latex_build.compile_project(project_dir, on_event=lambda event: self._emit(job, event))
+            result = _compile_result(build)
+            result["project_name"] = os.path.basename(project_dir)
+            result["message"] = f"论文 '{topic}' 编译成功！" if build.success else f"论文 '{topic}' 编译失败"
+            return result
+
+        return self.submit("create_and_compile_paper", project_dir, work)
+
+    def get(self, job_id: str) -> Optional[LatexJob]:
+        return self._jobs.get(job_id)
+
+    def wait(self, job_id: str, since: int = 0, timeout: Optional[float] = None) -> Optional[LatexJob]:
+        """阻塞到任务有新事件或结束（或超时）"""
+        job = self._jobs.get(job_id)
+        if job is None:
+            return None
+        with self._changed:
+            self._changed.wait_for(lambda: len(job.events) > since or job.finished, timeout)
+        return job
+
+    def wait_finished(self, jobs: List[LatexJob], timeout: Optional[float] = None) -> List[LatexJob]:
+        """阻塞到所有任务结束（或超时）"""
+        with self._changed:
+            self._changed.wait_for(lambda: all(job.finished for job in jobs), timeout)
+        return jobs
+
+    async def stream_events(self, job_id: str) -> AsyncIterator[Dict[str, Any]]:
+        """异步逐条产出任务事件，任务结束后产出一条finished事件"""
+        since = 0
+        while True:
+            job = await asyncio.to_thread(self.wait, job_id, since, 1.0)
+            if job is None:
+                raise KeyError(f"未知任务: {job_id}")
+            for event in job.events[since:]:
+                yield event
+            since = len(job.events)
+            if job.finished and since == len(job.events):
+                yield {"event": "finished", "status": job.status, "result": job.result}
+                return
+
+
+_manager: Optional[LatexJobManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_job_manager() -> LatexJobManager:
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = LatexJobManager()
+        return _manager
+
+
+def stream_job_events(job_id: str) -> AsyncIterator[Dict[str, Any]]:
+    """订阅任务进度：async for event in stream_job_events(job_id)"""
+    return get_job_manager().stream_events(job_id)
+
+
+def run_latex_async(project_dir: str, main_tex_file: str = "main.tex") -> Dict[str, Any]:
+    """提交后台LaTeX编译，立即返回任务ID；project_dir也可以是分片存储中的项目ID"""
+    if not os.path.isdir(project_dir):
+        project_dir = project_store.get_store(DEFAULT_RESULT_DIR).resolve(project_dir) or project_dir
+    if not os.path.exists(os.path.join(project_dir, main_tex_file)):
+        return {"status": "error", "message": f"找不到主文件: {os.path.join(project_dir, main_tex_file)}"}
+    job = get_job_manager().submit_compile(project_dir, main_tex_file)
+    return {"status": "accepted", "job_id": job.job_id, "project_dir": job.project_dir,
+            "message": "编译任务已提交，用get_latex_job查询进度"}
+
+
+def create_and_compile_paper_async(topic: str, content: str, references: Optional[str] = None,
+                                   author: str = "AI Research Team",
+                                   project_name: Optional[str] = None) -> Dict[str, Any]:
+    """创建论文项目并在后台编译，立即返回任务ID"""
+    try:
+        job = get_job_manager().submit_create_and_compile(topic, content, references, author, project_name)
+    except ValueError as e:
+        return {"status": "error", "message": str(e)}
+    return {"status": "accepted", "job_id": job.job_id, "project_dir": job.project_dir,
+            "message": f"论文 '{topic}' 已提交后台编译，用get_latex_job查询进度"}
+
+
+def create_and_compile_papers(papers: List[Dict[str, Any]], timeout: float = BATCH_TIMEOUT) -> Dict[str, Any]:
+    """批量创建并并行编译多篇论文，一次调用返回每篇论文的结果（顺序与输入一致）
+
+    超过timeout秒仍未结束的论文返回其任务ID，之后可以用get_latex_job继续查询。
+    """
+    manager = get_job_manager()
+    store = project_store.get_store(DEFAULT_RESULT_DIR)
+    results: List[Optional[Dict[str, Any]]] = [None] * len(papers)
+    submitted: Dict[int, LatexJob] = {}
+    claimed: Dict[str, int] = {}
+    # 先校验所有项目ID再提交，避免中途出错时已提交的任务无人等待
+    valid: List[int] = []
+    for index, paper in enumerate(papers):
+        try:
+            project_dir = store.path_for(paper.get("project_name") or default_project_name(paper["topic"]))
+        except ValueError as e:
+            results[index] = {"status": "error", "message": str(e)}
+            continue
+        if project_dir in claimed:
+            # 两项写同一个目录会互相覆盖，只编译第一项
+            results[index] = {"status": "error", "project_path": project_dir,
+                              "message": f"项目目录与第{claimed[project_dir] + 1}篇论文重复: {project_dir}"}
+            continue
+        claimed[project_dir] = index
+        valid.append(index)
+
+    for index in valid:
+        paper = papers[index]
+        job = manager.submit_create_and_compile(
+            paper["topic"], paper["content"], paper.get("references"),
+            paper.get("author", "AI Research Team"), paper.get("project_name"))
+        submitted[index] = job
+
+    for index, job in zip(submitted, manager.wait_finished(list(submitted.values()), timeout)):
+        results[index] = job.result if job.finished else {
+            "status": "error", "job_id": job.job_id, "project_path": job.project_dir,
+            "message": f"编译在{timeout:g}秒内未完成，用get_latex_job查询进度"}
+
+    succeeded = sum(1 for result in results if result and result.get("status") == "success")
+    return {
+        "status": "success" if succeeded == len(papers) else "error",
+        "message": f"{succeeded}/{len(papers)} 篇论文编译成功",
+        "results": results,
+    }
+
+
+def get_latex_job(job_id: str, since: int = 0) -> Dict[str, Any]:
+    """查询后台编译任务的状态和第since条之后的进度事件"""
+    job = get_job_manager().get(job_id)
+    if job is None:
+        return {"status": "error", "message": f"未知任务: {job_id}"}
+    return job.snapshot(since)
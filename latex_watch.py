@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Watch a result/<project> directory and rebuild incrementally on change.
+
+Changes to main.tex, modules/*.tex and references.bib are picked up with
+inotify on Linux (mtime polling elsewhere). Bursts of writes are debounced
+into one rebuild. The watcher stays resident between rebuilds and keeps its
+scratch directory, so each rebuild starts from the previous aux/bbl/toc
+files and usually needs a single TeX pass. CJK projects are built with
+xelatex, and the font caches are prewarmed when the watcher starts.
+
+Usage:
+  python latex_watch.py --project_dir "result/deep_learning_paper"
+  python latex_watch.py --project_dir "result/deep_learning_paper" --debounce 0.5
+"""
+
+import argparse
+import ctypes
+import ctypes.util
+import fnmatch
+import os
+import select
+import shutil
+import struct
+import sys
+import tempfile
+import time
+from typing import Dict, Optional, Set, Tuple
+
+import latex_build
+
+WATCHED_PATTERNS = ("references.bib", os.path.join("modules", "*.tex"))
+
+_IN_MODIFY = 0x00000002
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_ISDIR = 0x40000000
+_IN_NONBLOCK = os.O_NONBLOCK
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+def _is_watched(rel_path: str, main_tex: str) -> bool:
+    rel_path = os.path.normpath(rel_path)
+    return rel_path == main_tex or any(fnmatch.fnmatch(rel_path, pattern) for pattern in WATCHED_PATTERNS)
+
+
+class _PollingWatcher:
+    """Portable fallback: compare mtimes of the watched files."""
+
+    def __init__(self, project_dir: str, main_tex: str, interval: float = 0.5):
+        self.project_dir = project_dir
+        self.main_tex = main_tex
+        self.interval = interval
+        self._snapshot = self._scan()
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        snapshot = {}
+        candidates = [self.main_tex, "references.bib"]
+        modules_dir = os.path.join(self.project_dir, "modules")
+        if os.path.isdir(modules_dir):
+            candidates += [os.path.join("modules", name) for name in os.listdir(modules_dir)]
+        for rel in candidates:
+            if not _is_watched(rel, self.main_tex):
+                continue
+            try:
+                st = os.stat(os.path.join(self.project_dir, rel))
+            except OSError:
+                continue
+            snapshot[rel] = (st.st_mtime_ns, st.st_size)
+        return snapshot
+
+    def wait(self, timeout: Optional[float]) -> Set[str]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            current = self._scan()
+            changed = {rel for rel in current.keys() | self._snapshot.keys()
+                       if current.get(rel) != self._snapshot.get(rel)}
+            self._snapshot = current
+            if changed:
+                return changed
+            if deadline is not None and time.monotonic() >= deadline:
+                return set()
+            remaining = self.interval if deadline is None else min(self.interval, deadline - time.monotonic())
+            time.sleep(max(remaining, 0.0))
+
+    def close(self) -> None:
+        pass
+
+
+class _InotifyWatcher:
+    """Linux inotify watcher on the project directory and modules/."""
+
+    MASK = _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE | _IN_MODIFY
+
+    def __init__(self, project_dir: str, main_tex: str):
+        self.project_dir = project_dir
+        self.main_tex = main_tex
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._fd = self._libc.inotify_init1(_IN_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._dirs: Dict[int, str] = {}
+        self._add_watch("")
+        if os.path.isdir(os.path.join(project_dir, "modules")):
+            self._add_watch("modules")
+
+    def _add_watch(self, rel_dir: str) -> None:
+        path = os.path.join(self.project_dir, rel_dir).encode(sys.getfilesystemencoding())
+        wd = self._libc.inotify_add_watch(self._fd, path, self.MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {path!r}")
+        self._dirs[wd] = rel_dir
+
+    def wait(self, timeout: Optional[float]) -> Set[str]:
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return set()
+        changed = set()
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return changed
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0").decode(sys.getfilesystemencoding(), "replace")
+            offset += length
+            rel_dir = self._dirs.get(wd, "")
+            if mask & _IN_ISDIR:
+                if mask & _IN_CREATE and rel_dir == "" and name == "modules":
+                    self._add_watch("modules")
+                continue
+            rel = os.path.join(rel_dir, name) if rel_dir else name
+            if _is_watched(rel, self.main_tex):
+                changed.add(rel)
+        return changed
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+def make_watcher(project_dir: str, main_tex: str, poll_interval: float = 0.5):
+    """inotify where available, mtime polling otherwise."""
+    if sys.platform.startswith("linux"):
+        try:
+            return _InotifyWatcher(project_dir, main_tex)
+        except (OSError, AttributeError):
+            pass
+    return _PollingWatcher(project_dir, main_tex, poll_interval)
+
+
+def _report(result: latex_build.BuildResult, changed: Optional[Set[str]]) -> None:
+    status = "OK" if result.success else "FAILED"
+    trigger = "initial build" if changed is None else ", ".join(sorted(changed))
+    print(f"[{time.strftime('%H:%M:%S')}] {status} in {result.elapsed:.2f}s "
+          f"({result.passes} passes, bibtex={'yes' if result.bibtex_run else 'no'}, "
+          f"{result.warnings} warnings) <- {trigger}", flush=True)
+    if not result.success and result.error:
+        print(result.error[-2000:], flush=True)
+
+
+def watch_project(
+    project_dir: str,
+    main_tex: str = "main.tex",
+    engine: str = "auto",
+    debounce: float = 0.3,
+    max_delay: float = 2.0,
+    poll_interval: float = 0.5,
+) -> None:
+    """Build once, then rebuild incrementally after each debounced burst of changes."""
+    project_dir = os.path.abspath(project_dir)
+    if engine == "auto":
+        engine = latex_build.detect_engine(project_dir, main_tex)
+    if engine == "xelatex":
+        latex_build.prewarm_caches((engine,))
+    watcher = make_watcher(project_dir, main_tex, poll_interval)
+    scratch = tempfile.mkdtemp(prefix="latex_watch_", dir=latex_build.scratch_root())
+    print(f"Watching {project_dir} with {engine} ({type(watcher).__name__.strip('_')}), Ctrl+C to stop",
+          flush=True)
+    try:
+        _report(latex_build.compile_project(project_dir, main_tex, engine, scratch_dir=scratch), None)
+        while True:
+            changed = watcher.wait(None)
+            if not changed:
+                continue
+            # Editors and generators write several files in a row; wait for quiet.
+            burst_end = time.monotonic() + max_delay
+            while time.monotonic() < burst_end:
+                more = watcher.wait(max(0.0, min(debounce, burst_end - time.monotonic())))
+                if not more:
+                    break
+                changed |= more
+            result = latex_build.compile_project(project_dir, main_tex, engine,
+                                                 scratch_dir=scratch, changed=changed)
+            _report(result, changed)
+    except KeyboardInterrupt:
+        print("\nWatch stopped", flush=True)
+    finally:
+        watcher.close()
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Watch a LaTeX project and rebuild incrementally")
+    p.add_argument("--project_dir", required=True, help="Path to LaTeX project directory")
+    p.add_argument("--main_tex", default="main.tex", help="Main .tex file name (default: main.tex)")
+    p.add_argument("--engine", default="auto", help="TeX engine, or auto to detect CJK content (default: auto)")
+    p.add_argument("--debounce", type=float, default=0.3, help="Quiet period before rebuilding, in seconds")
+    p.add_argument("--poll_interval", type=float, default=0.5, help="Polling interval when inotify is unavailable")
+    args = p.parse_args()
+
+    watch_project(args.project_dir, args.main_tex, args.engine, args.debounce, poll_interval=args.poll_interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,58 +4,104 @@ Compile LaTeX via MCP server-shell using Agno MCPTools.
 Usage:
   python mcp_compile.py --project_dir "D:\PJLAB\Agent\final_project\result\多智能体系统协作与协调_paper" --main_tex main.tex
   python mcp_compile.py --project_dir "D:\PJLAB\Agent\final_project\result\reinforcement_learning_paper" --main_tex main.tex
+  python mcp_compile.py --project_dir "result/deep_learning_paper" --build_mode tmpfs
+  python mcp_compile.py --project_dir "result/deep_learning_paper" --watch
 
-Requires:
+Requires (agent mode):
   - agno (pip install agno)
   - npx available (Node.js) to launch @modelcontextprotocol/server-shell
+
+--build_mode tmpfs skips the agent and compiles directly with latex_build,
+keeping intermediate files in a RAM-backed scratch directory. --watch keeps
+running and rebuilds incrementally whenever the sources change (latex_watch).
 """
 
 import argparse
 import asyncio
 from textwrap import dedent
 
-from agno.agent import Agent
-from agno.models.openai import OpenAIChat
-from agno.tools.mcp import MCPTools
-
+import latex_build
+import latex_watch
 
-async def run_mcp_compile(project_dir: str, main_tex: str) -> None:
-    mcp_tools = MCPTools(command="npx -y @modelcontextprotocol/server-shell")
-    await mcp_tools.connect()
 
-    instructions = dedent(f"""
+def build_instructions(project_dir: str, main_tex: str, engine: str = "pdflatex") -> str:
+    return dedent(f"""
         You are a LaTeX build assistant. Use the shell MCP to:
         - cd "{project_dir}"
-        - Run: pdflatex -interaction=nonstopmode {main_tex}
+        - Run: {engine} -interaction=nonstopmode {main_tex}
         - If .aux exists: bibtex {main_tex[:-4]}
-        - Run: pdflatex -interaction=nonstopmode {main_tex}
-        - Run: pdflatex -interaction=nonstopmode {main_tex}
+        - Run: {engine} -interaction=nonstopmode {main_tex}
+        - Run: {engine} -interaction=nonstopmode {main_tex}
         - Print a short summary with:
           * PDF size (if exists)
           * Last 40 lines of main.log (if exists)
         Notes:
-        - For Chinese text ensure ctex is loaded; if packages are missing, MiKTeX should auto-install or preinstall via mpm.
+        - Use {engine} exactly as written; it was chosen from the project's content (xelatex for Chinese/CJK papers).
+        - If packages are missing, MiKTeX should auto-install or preinstall via mpm.
     """)
 
-    agent = Agent(
-        model=OpenAIChat(id="gpt-4o"),
+
+def build_compile_agent(project_dir: str, main_tex: str, mcp_tools, model=None, engine=None):
+    """Build the compile agent; `model` defaults to gpt-4o; benchmarks pass a local stand-in.
+
+    `engine` is detected from the project when not given.
+    """
+    from agno.agent import Agent
+    from agno.models.openai import OpenAIChat
+
+    return Agent(
+        model=model or OpenAIChat(id="gpt-4o"),
         tools=[mcp_tools],
-        instructions=instructions,
+        instructions=build_instructions(project_dir, main_tex,
+                                        engine or latex_build.detect_engine(project_dir, main_tex)),
         show_tool_calls=True,
         markdown=True,
     )
 
-    await agent.aprint_response("Compile the LaTeX project now.", stream=True)
 
-    await mcp_tools.close()
+async def run_mcp_compile(project_dir: str, main_tex: str, mcp_tools=None, model=None) -> None:
+    """Run one agent-driven compile.
+
+    When `mcp_tools` is given the caller owns its connect/close lifecycle.
+    """
+    owns_tools = mcp_tools is None
+    # Engine detection reads the sources and prewarming runs the TeX tools: keep both off the event loop.
+    engine = await asyncio.to_thread(latex_build.detect_engine, project_dir, main_tex)
+    if owns_tools:
+        from agno.tools.mcp import MCPTools
+
+        if engine == "xelatex":
+            await asyncio.to_thread(latex_build.prewarm_caches, ("xelatex",))
+        mcp_tools = MCPTools(command="npx -y @modelcontextprotocol/server-shell")
+        await mcp_tools.connect()
+
+    try:
+        agent = build_compile_agent(project_dir, main_tex, mcp_tools, model, engine)
+        await agent.aprint_response("Compile the LaTeX project now.", stream=True)
+    finally:
+        if owns_tools:
+            await mcp_tools.close()
 
 
 def main() -> None:
     p = argparse.ArgumentParser(description="Compile LaTeX via MCP server-shell")
     p.add_argument("--project_dir", required=True, help="Absolute path to LaTeX project directory")
     p.add_argument("--main_tex", default="main.tex", help="Main .tex file name (default: main.tex)")
+    p.add_argument("--build_mode", choices=("agent", "tmpfs"), default="agent",
+                   help="agent: LLM drives the shell MCP (default); tmpfs: direct out-of-tree build")
+    p.add_argument("--watch", action="store_true",
+                   help="Stay running and rebuild incrementally on changes to main.tex, modules/*.tex, references.bib")
     args = p.parse_args()
 
+    if args.watch:
+        latex_watch.watch_project(args.project_dir, args.main_tex)
+        return
+
+    if args.build_mode == "tmpfs":
+        result = latex_build.compile_project(args.project_dir, args.main_tex, build_mode="tmpfs")
+        latex_build.print_summary(result)
+        return
+
     asyncio.run(run_mcp_compile(args.project_dir, args.main_tex))
 
 
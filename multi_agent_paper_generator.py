@@ -15,6 +15,11 @@ from pathlib import Path
 sys.path.append('AgentScholar-UI/agent_scholar/tools/compose_tools')
 from latex_compiler import LaTeXProjectCompiler
 
+import context_packer
+import latex_jobs
+import pipeline_trace
+import project_store
+
 @dataclass
 class PaperSection:
     """论文章节结构"""
@@ -36,11 +41,16 @@ class ResearchPaper:
 class ResearchAgent:
     """研究智能体 - 负责文献调研和内容分析"""
     
-    def __init__(self, name: str = "Research Agent"):
+    def __init__(self, name: str = "Research Agent", literature_paths: Optional[List[str]] = None,
+                 context_budget: int = context_packer.DEFAULT_BUDGET_TOKENS):
         self.name = name
         self.research_focus = []
         self.literature_summary = ""
+        # paper_entries.json 文件或目录；为空时沿用模板化的调研摘要
+        self.literature_paths = literature_paths or []
+        self.context_budget = context_budget
     
+    @pipeline_trace.traced("research", pipeline_trace.AGENT)
     def conduct_research(self, topic: str) -> Dict[str, Any]:
         """进行文献调研"""
         print(f"🔍 {self.name} 开始调研主题: {topic}")
@@ -64,6 +74,22 @@ class ResearchAgent:
             ]
         }
         
+        if self.literature_paths:
+            with pipeline_trace.span("context_pack", budget=self.context_budget):
+                summary, packed = context_packer.build_literature_context(
+                    topic, self.literature_paths, self.context_budget, latex=True)
+            if packed.selected:
+                research_result["literature_summary"] = (
+                    f"基于对{topic}相关文献的调研，以下{len(packed.selected)}条内容与主题最相关：\n{summary}")
+                research_result["context"] = {
+                    "selected": [c.key for c in packed.selected],
+                    "considered": packed.considered,
+                    "used_tokens": packed.used_tokens,
+                    "budget": packed.budget,
+                }
+                print(f"📚 {self.name} 从{packed.considered}个候选项中选取{len(packed.selected)}条文献上下文 "
+                      f"({packed.used_tokens}/{packed.budget} tokens)")
+
         self.literature_summary = research_result["literature_summary"]
         print(f"✅ {self.name} 完成调研")
         
@@ -82,12 +108,13 @@ class WritingAgent:
         print(f"✍️ {self.name} 开始写作章节: {section_title}")
         
         # 根据章节类型生成内容
-        if section_type == "introduction":
-            content = self._write_introduction(section_title, research_data)
-        elif section_type == "conclusion":
-            content = self._write_conclusion(section_title, research_data)
-        else:
-            content = self._write_general_section(section_title, research_data)
+        with pipeline_trace.span(f"write:{section_title}", pipeline_trace.AGENT, section_type=section_type):
+            if section_type == "introduction":
+                content = self._write_introduction(section_title, research_data)
+            elif section_type == "conclusion":
+                content = self._write_conclusion(section_title, research_data)
+            else:
+                content = self._write_general_section(section_title, research_data)
         
         print(f"✅ {self.name} 完成章节: {section_title}")
         return content
@@ -170,6 +197,7 @@ class CoordinationAgent:
         self.agents[agent_type] = agent
         print(f"📝 {self.name} 注册了 {agent_type}: {agent.name}")
     
+    @pipeline_trace.traced("coordinate")
     def coordinate_paper_generation(self, topic: str, author: str = "AI Research Team") -> ResearchPaper:
         """协调论文生成流程"""
         print(f"🎯 {self.name} 开始协调论文生成: {topic}")
@@ -247,13 +275,13 @@ class CompilationAgent:
     def __init__(self, name: str = "Compilation Agent"):
         self.name = name
     
+    @pipeline_trace.traced("compile", pipeline_trace.COMPILE)
     def compile_paper(self, paper: ResearchPaper, project_name: str = None) -> Dict[str, Any]:
         """编译论文为PDF"""
         print(f"🔨 {self.name} 开始编译论文: {paper.title}")
         
         if not project_name:
-            project_name = paper.title.lower().replace(" ", "_").replace("：", "").replace("-", "_")
-            project_name = f"{project_name}_paper"
+            project_name = latex_jobs.default_project_name(paper.title)
         
         # 组合LaTeX内容
         content = ""
@@ -263,12 +291,14 @@ class CompilationAgent:
         # 组合参考文献
         references = "\n".join(paper.references)
         
-        # 使用LaTeX编译器
+        # 使用LaTeX编译器（项目目录由分片存储分配）
         try:
+            project_dir = project_store.get_store().create(project_name)
             success, project_path, pdf_path = LaTeXProjectCompiler.auto_create_and_compile(
                 project_name=project_name,
                 content=content,
                 references=references,
+                base_dir=os.path.dirname(project_dir),
                 title=paper.title,
                 author=paper.author
             )
@@ -305,10 +335,16 @@ class CompilationAgent:
 class MultiAgentPaperSystem:
     """多智能体论文生成系统"""
     
-    def __init__(self):
-        """初始化多智能体系统"""
+    def __init__(self, literature_paths: Optional[List[str]] = None,
+                 context_budget: int = context_packer.DEFAULT_BUDGET_TOKENS,
+                 trace_dir: Optional[str] = None):
+        """初始化多智能体系统
+
+        trace_dir: 每次生成的trace（Chrome Trace格式）写入此目录；为空时只在结果中返回关键路径
+        """
+        self.trace_dir = trace_dir
         self.coordinator = CoordinationAgent()
-        self.research_agent = ResearchAgent()
+        self.research_agent = ResearchAgent(literature_paths=literature_paths, context_budget=context_budget)
         self.writing_agent = WritingAgent()
         self.compilation_agent = CompilationAgent()
         
@@ -320,7 +356,24 @@ class MultiAgentPaperSystem:
         print("🚀 多智能体论文生成系统初始化完成！")
     
     def generate_paper(self, topic: str, author: str = "AI Research Team") -> Dict[str, Any]:
-        """生成完整论文"""
+        """生成完整论文；研究、写作、编译及其中的每次BAML调用都记录在同一个trace里"""
+        with pipeline_trace.start_trace("generate_paper", topic=topic, author=author) as trace:
+            result = self._generate_paper(topic, author)
+        result["trace"] = self._trace_summary(trace)
+        return result
+
+    def _trace_summary(self, trace: pipeline_trace.Trace) -> Dict[str, Any]:
+        """关键路径摘要；配置了 trace_dir 时同时导出完整trace"""
+        path = pipeline_trace.critical_path(trace)
+        summary = {"trace_id": trace.trace_id, "spans": len(trace.spans), "critical_path": path}
+        print(f"🧭 关键路径 (trace {trace.trace_id}):\n{pipeline_trace.format_critical_path(path)}")
+        if self.trace_dir:
+            summary["trace_file"] = pipeline_trace.write_chrome_trace(
+                trace, os.path.join(self.trace_dir, f"{trace.trace_id}.json"))
+            print(f"📈 trace已导出: {summary['trace_file']}")
+        return summary
+
+    def _generate_paper(self, topic: str, author: str) -> Dict[str, Any]:
         print(f"🎯 开始生成论文: {topic}")
         print("=" * 60)
         
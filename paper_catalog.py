@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+论文项目索引
+用SQLite保存result/下所有论文项目的元数据（标题、作者、页数、PDF大小、编译状态、模块列表），
+按文件mtime增量刷新，为agno的list_papers / get_paper_info工具提供分页、过滤查询，
+不再每次调用都遍历和stat整个result/目录。
+
+用法:
+  python paper_catalog.py                       # 刷新并列出所有论文
+  python paper_catalog.py --status failed       # 只看编译失败的项目
+  python paper_catalog.py --query 强化学习 --page 2
+"""
+
+import argparse
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import project_store
+
+DEFAULT_RESULT_DIR = "result"
+CATALOG_FILENAME = ".paper_catalog.sqlite"
+# 两次自动刷新之间的最短间隔（秒）；间隔内的查询直接读索引
+REFRESH_INTERVAL = 2.0
+BUILD_STATUSES = ("success", "failed", "stale", "not_built")
+MAX_PAGE_SIZE = 200
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+    name TEXT PRIMARY KEY,
+    basename TEXT NOT NULL,
+    path TEXT NOT NULL,
+    title TEXT,
+    author TEXT,
+    page_count INTEGER,
+    pdf_size INTEGER,
+    pdf_mtime REAL,
+    build_status TEXT NOT NULL,
+    modules TEXT NOT NULL,
+    signature TEXT NOT NULL,
+    indexed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_projects_basename ON projects(basename);
+CREATE INDEX IF NOT EXISTS idx_projects_status ON projects(build_status);
+CREATE INDEX IF NOT EXISTS idx_projects_pdf_mtime ON projects(pdf_mtime);
+"""
+
+_TITLE_RES = (
+    re.compile(r"\\title\{([^{}]+)\}"),
+    re.compile(r"pdftitle=\{([^{}]+)\}"),
+    re.compile(r"\\Huge\\bfseries\s+([^\\{}]+?)\s*\\par"),
+)
+_AUTHOR_RES = (
+    re.compile(r"\\author\{([^{}]+)\}"),
+    re.compile(r"pdfauthor=\{([^{}]+)\}"),
+)
+_PDF_PAGE_RE = re.compile(rb"/Type\s*/Page(?![a-zA-Z])")
+_PDF_COUNT_RE = re.compile(rb"/Count\s+(\d+)")
+
+
+def _stat(path: str) -> Optional[os.stat_result]:
+    try:
+        return os.stat(path)
+    except OSError:
+        return None
+
+
+def _signature(project_path: str) -> str:
+    """项目的mtime指纹：目录、main.tex、main.pdf、compile_error.log、modules/"""
+    parts = []
+    for name in ("", "main.tex", "main.pdf", "compile_error.log", "modules"):
+        st = _stat(os.path.join(project_path, name))
+        parts.append(f"{st.st_mtime_ns}:{st.st_size}" if st else "-")
+    return "|".join(parts)
+
+
+def _first_match(patterns, text: str) -> Optional[str]:
+    for pattern in patterns:
+        match = pattern.search(text)
+        if match:
+            return match.group(1).strip()
+    return None
+
+
+def _pdf_page_count(pdf_path: str) -> Optional[int]:
+    try:
+        with open(pdf_path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    pages = len(_PDF_PAGE_RE.findall(data))
+    if pages:
+        return pages
+    # 对象流压缩的PDF里看不到/Type /Page，退回到页树根节点的/Count
+    counts = [int(c) for c in _PDF_COUNT_RE.findall(data)]
+    return max(counts) if counts else None
+
+
+def _build_status(tex_st, pdf_st, error_st) -> str:
+    if pdf_st is None:
+        return "failed" if error_st else "not_built"
+    if error_st and error_st.st_mtime >= pdf_st.st_mtime:
+        return "failed"
+    if tex_st and tex_st.st_mtime > pdf_st.st_mtime:
+        return "stale"
+    return "success"
+
+
+def _index_project(name: str, project_path: str, signature: str) -> Tuple:
+    """读取单个项目的元数据，返回projects表的一行"""
+    tex_path = os.path.join(project_path, "main.tex")
+    pdf_path = os.path.join(project_path, "main.pdf")
+    try:
+        with open(tex_path, "r", encoding="utf-8", errors="replace") as f:
+            tex = f.read()
+    except OSError:
+        tex = ""
+    tex_st = _stat(tex_path)
+    pdf_st = _stat(pdf_path)
+    error_st = _stat(os.path.join(project_path, "compile_error.log"))
+
+    modules_dir = os.path.join(project_path, "modules")
+    modules = sorted(os.path.splitext(n)[0] for n in os.listdir(modules_dir) if n.endswith(".tex")) \
+        if os.path.isdir(modules_dir) else []
+
+    return (
+        name,
+        name.rsplit("/", 1)[-1],
+        project_path,
+        _first_match(_TITLE_RES, tex) or os.path.basename(project_path),
+        _first_match(_AUTHOR_RES, tex),
+        _pdf_page_count(pdf_path) if pdf_st else None,
+        pdf_st.st_size if pdf_st else None,
+        pdf_st.st_mtime if pdf_st else None,
+        _build_status(tex_st, pdf_st, error_st),
+        json.dumps(modules, ensure_ascii=False),
+        signature,
+        time.time(),
+    )
+
+
+def discover_projects(result_dir: str) -> Dict[str, str]:
+    """result_dir下所有论文项目，返回 {名称: 绝对路径}
+
+    分片布局的项目直接来自project_store的索引，名称就是项目ID；
+    尚未迁移的平铺/嵌套项目按相对路径命名。
+    """
+    found = dict(project_store.get_store(result_dir).items())
+    for name, path in project_store.legacy_projects(result_dir).items():
+        found.setdefault(name, path)
+    return found
+
+
+def clamp_page(page: int, page_size: int) -> Tuple[int, int]:
+    """页码至少为1，每页数量限制在1..MAX_PAGE_SIZE"""
+    return max(page, 1), min(max(page_size, 1), MAX_PAGE_SIZE)
+
+
+def _like_pattern(text: str) -> str:
+    """LIKE子串匹配模式，用户输入中的 \\ % _ 按字面匹配（配合 ESCAPE '\\'）"""
+    escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def _row_to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+    paper = dict(row)
+    paper["modules"] = json.loads(paper["modules"])
+    paper["pdf_size_kb"] = round(paper["pdf_size"] / 1024, 1) if paper["pdf_size"] is not None else None
+    del paper["signature"], paper["basename"]
+    return paper
+
+
+class PaperCatalog:
+    """result/目录的SQLite索引，按mtime增量刷新"""
+
+    def __init__(self, result_dir: str = DEFAULT_RESULT_DIR, db_path: Optional[str] = None,
+                 refresh_interval: float = REFRESH_INTERVAL):
+        self.result_dir = os.path.abspath(result_dir)
+        os.makedirs(self.result_dir, exist_ok=True)
+        self.db_path = db_path or os.path.join(self.result_dir, CATALOG_FILENAME)
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        self._last_refresh = 0.0
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(projects)")]
+        if columns and "basename" not in columns:
+            # 旧版本的索引没有basename列；索引可以随时从磁盘重建，直接丢弃
+            self._conn.execute("DROP TABLE projects")
+        self._conn.executescript(_SCHEMA)
+
+    def refresh(self, force: bool = False) -> int:
+        """增量刷新索引，返回新增、更新和删除的项目数"""
+        now = time.monotonic()
+        if not force and now - self._last_refresh < self.refresh_interval:
+            return 0
+        with self._lock:
+            known = {name: (path, signature) for name, path, signature in
+                     self._conn.execute("SELECT name, path, signature FROM projects").fetchall()}
+            projects = discover_projects(self.result_dir)
+            rows = []
+            for name, path in projects.items():
+                signature = _signature(path)
+                # migrate用os.rename搬动项目，mtime和大小不变，所以路径也要比较
+                if known.get(name) != (path, signature):
+                    rows.append(_index_project(name, path, signature))
+            removed = [(name,) for name in known.keys() - projects.keys()]
+            with self._conn:
+                self._conn.executemany("INSERT OR REPLACE INTO projects VALUES (?,?,?,?,?,?,?,?,?,?,?,?)", rows)
+                self._conn.executemany("DELETE FROM projects WHERE name = ?", removed)
+            self._last_refresh = time.monotonic()
+        return len(rows) + len(removed)
+
+    def query(self, page: int = 1, page_size: int = 20, status: Optional[str] = None,
+              search: Optional[str] = None) -> Tuple[List[Dict[str, Any]], int]:
+        """分页查询，返回(本页论文, 总数)；按PDF生成时间倒序"""
+        self.refresh()
+        clauses, params = [], []
+        if status:
+            clauses.append("build_status = ?")
+            params.append(status)
+        if search:
+            clauses.append("(name LIKE ? ESCAPE '\\' OR title LIKE ? ESCAPE '\\' OR author LIKE ? ESCAPE '\\')")
+            params += [_like_pattern(search)] * 3
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        page, page_size = clamp_page(page, page_size)
+        with self._lock:
+            total = self._conn.execute(f"SELECT COUNT(*) FROM projects {where}", params).fetchone()[0]
+            rows = self._conn.execute(
+                f"SELECT * FROM projects {where} ORDER BY pdf_mtime IS NULL, pdf_mtime DESC, name "
+                f"LIMIT ? OFFSET ?", params + [page_size, (page - 1) * page_size]
+            ).fetchall()
+        return [_row_to_dict(row) for row in rows], total
+
+    def get(self, project_name: str) -> Optional[Dict[str, Any]]:
+        """按项目名称查找；嵌套项目也可以只给最后一级目录名"""
+        self.refresh()
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM projects WHERE name = ?", (project_name,)).fetchone()
+            if row is None:
+                matches = self._conn.execute(
+                    "SELECT * FROM projects WHERE basename = ? LIMIT 2", (project_name,)
+                ).fetchall()
+                row = matches[0] if len(matches) == 1 else None
+        return _row_to_dict(row) if row else None
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+_catalogs: Dict[str, PaperCatalog] = {}
+_catalogs_lock = threading.Lock()
+
+
+def get_catalog(result_dir: str = DEFAULT_RESULT_DIR) -> PaperCatalog:
+    """每个result目录共用一个索引实例"""
+    key = os.path.abspath(result_dir)
+    with _catalogs_lock:
+        if key not in _catalogs:
+            _catalogs[key] = PaperCatalog(key)
+        return _catalogs[key]
+
+
+def list_papers(page: int = 1, page_size: int = 20, status: Optional[str] = None,
+                query: Optional[str] = None) -> Dict[str, Any]:
+    """列出已生成的论文项目（分页、可按编译状态和关键词过滤）"""
+    page, page_size = clamp_page(page, page_size)
+    papers, total = get_catalog().query(page, page_size, status, query)
+    return {
+        "status": "success",
+        "total": total,
+        "page": page,
+        "page_size": page_size,
+        "papers": papers,
+    }
+
+
+def get_paper_info(project_name: str) -> Dict[str, Any]:
+    """获取特定论文项目的详细信息"""
+    paper = get_catalog().get(project_name)
+    if paper is None:
+        return {"status": "error", "message": f"未找到论文项目: {project_name}"}
+    return {"status": "success", "paper": paper}
+
+
+def main():
+    p = argparse.ArgumentParser(description="论文项目索引")
+    p.add_argument("--result_dir", default=DEFAULT_RESULT_DIR, help="论文项目根目录（默认：result）")
+    p.add_argument("--status", choices=BUILD_STATUSES, help="按编译状态过滤")
+    p.add_argument("--query", help="按名称/标题/作者模糊搜索")
+    p.add_argument("--page", type=int, default=1)
+    p.add_argument("--page_size", type=int, default=20)
+    args = p.parse_args()
+
+    catalog = PaperCatalog(args.result_dir)
+    start = time.perf_counter()
+    changed = catalog.refresh(force=True)
+    print(f"🔄 索引刷新完成：{changed} 个项目有变化（{(time.perf_counter() - start) * 1000:.1f} ms）")
+
+    start = time.perf_counter()
+    papers, total = catalog.query(args.page, args.page_size, args.status, args.query)
+    print(f"📚 共 {total} 个论文项目（查询 {(time.perf_counter() - start) * 1000:.2f} ms）")
+    for paper in papers:
+        pages = paper["page_count"] if paper["page_count"] is not None else "-"
+        size = f"{paper['pdf_size_kb']} KB" if paper["pdf_size_kb"] is not None else "-"
+        print(f"  [{paper['build_status']:<9}] {paper['name']}  《{paper['title']}》 "
+              f"{paper['author'] or ''}  {pages}页  {size}  模块: {', '.join(paper['modules']) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
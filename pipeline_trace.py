@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+论文生成流水线的端到端追踪
+一篇论文从研究、写作到编译的每个阶段都是一个span，span通过contextvars沿调用链传递：
+  MultiAgentPaperSystem.generate_paper      → 根span，生成 trace_id
+    ResearchAgent.conduct_research          → 子span
+      BAML函数调用（baml_ext.trace_link）     → 孙span，附带BAML日志ID、客户端和token数
+    WritingAgent.write_section × N
+    CompilationAgent.compile_paper
+BAML一侧通过 baml_client.tracing.set_tags 打上 pipeline_trace_id / pipeline_span_id，
+两边的记录可以互相对上。
+
+导出：
+  to_chrome_trace / write_chrome_trace   Chrome Trace Event格式，chrome://tracing 或 Perfetto 打开
+  critical_path                          决定总耗时的那条span链，并发的兄弟span只保留最晚结束的一条
+
+没有活动trace时 span() 几乎没有开销，可以放心留在代码里。
+
+用法:
+  python pipeline_trace.py trace.json      # 打印已导出trace的关键路径
+"""
+
+import contextvars
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+STAGE = "stage"
+AGENT = "agent"
+LLM = "llm"
+COMPILE = "compile"
+
+
+@dataclass
+class Span:
+    """一个计时区间；时间是相对trace开始的秒数"""
+    span_id: str
+    parent_id: Optional[str]
+    name: str
+    category: str
+    start: float
+    end: Optional[float] = None
+    thread_id: int = 0
+    attrs: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+    trace: Optional["Trace"] = field(default=None, repr=False, compare=False)
+
+    @property
+    def duration(self) -> float:
+        return (self.end if self.end is not None else self.start) - self.start
+
+
+class Trace:
+    """一次流水线运行的全部span（线程安全）"""
+
+    def __init__(self, name: str, **attrs: Any):
+        self.trace_id = uuid.uuid4().hex[:16]
+        self.name = name
+        self.attrs = attrs
+        self.started_at = time.time()
+        self._t0 = time.perf_counter()
+        self._lock = threading.Lock()
+        self.spans: List[Span] = []
+
+    def now(self) -> float:
+        return time.perf_counter() - self._t0
+
+    def open_span(self, name: str, category: str, parent: Optional[Span], attrs: Dict[str, Any]) -> Span:
+        span = Span(uuid.uuid4().hex[:16], parent.span_id if parent else None, name, category,
+                    self.now(), thread_id=threading.get_ident(), attrs=dict(attrs), trace=self)
+        with self._lock:
+            self.spans.append(span)
+        return span
+
+    @property
+    def root(self) -> Optional[Span]:
+        return next((s for s in self.spans if s.parent_id is None), None)
+
+    def children(self, span: Span) -> List[Span]:
+        return [s for s in self.spans if s.parent_id == span.span_id]
+
+
+_current_trace: contextvars.ContextVar[Optional[Trace]] = contextvars.ContextVar("pipeline_trace", default=None)
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("pipeline_span", default=None)
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+@contextmanager
+def start_trace(name: str, **attrs: Any) -> Iterator[Trace]:
+    """开始一次新的trace，并打开它的根span"""
+    trace = Trace(name, **attrs)
+    token = _current_trace.set(trace)
+    try:
+        with span(name, STAGE, **attrs):
+            yield trace
+    finally:
+        _current_trace.reset(token)
+
+
+def begin(name: str, category: str = STAGE, **attrs: Any) -> Optional[Span]:
+    """打开一个不设为当前span的子span，由 finish() 结束；用于跨越多次调用的区间（例如流式输出）"""
+    trace = _current_trace.get()
+    if trace is None:
+        return None
+    return trace.open_span(name, category, _current_span.get(), attrs)
+
+
+def finish(span: Optional[Span], error: Optional[BaseException] = None) -> None:
+    """结束 begin() 打开的span；重复调用只记第一次"""
+    if span is None or span.end is not None:
+        return
+    if error is not None:
+        span.error = f"{type(error).__name__}: {error}"
+    span.end = span.trace.now()
+
+
+@contextmanager
+def span(name: str, category: str = STAGE, **attrs: Any) -> Iterator[Optional[Span]]:
+    """在当前trace中打开子span并设为当前span；没有活动trace时什么都不做"""
+    current = begin(name, category, **attrs)
+    if current is None:
+        yield None
+        return
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        finish(current, e)
+        raise
+    finally:
+        finish(current)
+        _current_span.reset(token)
+
+
+def traced(name: Optional[str] = None, category: str = STAGE) -> Callable[[Callable], Callable]:
+    """装饰器：函数的每次调用都是一个span"""
+    def decorator(func: Callable) -> Callable:
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name, category):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def to_chrome_trace(trace: Trace) -> Dict[str, Any]:
+    """Chrome Trace Event格式（完整事件"X"，时间单位微秒）"""
+    pid = os.getpid()
+    events = []
+    for s in trace.spans:
+        args = {"span_id": s.span_id, "parent_id": s.parent_id, **s.attrs}
+        if s.error:
+            args["error"] = s.error
+        events.append({"name": s.name, "cat": s.category, "ph": "X", "pid": pid, "tid": s.thread_id,
+                       "ts": round(s.start * 1e6, 1), "dur": round(s.duration * 1e6, 1), "args": args})
+    return {
+        "traceEvents": events,
+        "displayTimeUnit": "ms",
+        "otherData": {"trace_id": trace.trace_id, "name": trace.name, "started_at": trace.started_at,
+                      **{k: str(v) for k, v in trace.attrs.items()}},
+    }
+
+
+def write_chrome_trace(trace: Trace, path: str) -> str:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(to_chrome_trace(trace), f, ensure_ascii=False)
+    return path
+
+
+def _critical_children(trace: Trace, node: Span) -> List[Span]:
+    """从node结束时刻往回走：取最晚结束的子span，再取在它开始之前结束的最晚子span，依此类推"""
+    children = [c for c in trace.children(node) if c.end is not None]
+    chain: List[Span] = []
+    t = node.end if node.end is not None else float("inf")
+    while True:
+        # 1µs容差：从导出文件读回时时间被四舍五入到0.1µs
+        before = [c for c in children if c.end <= t + 1e-6 and c not in chain]
+        if not before:
+            break
+        nxt = max(before, key=lambda c: c.end)
+        chain.append(nxt)
+        t = nxt.start
+    return chain[::-1]
+
+
+def critical_path(trace: Trace) -> List[Dict[str, Any]]:
+    """关键路径：决定总耗时的那条span链（深度优先，按时间顺序）
+
+    并发的兄弟span中只保留最晚结束的那条；self_time 是该span扣掉关键路径上子span之后剩下的时间，
+    即"这一层自己花掉的时间"，在其中优化才会缩短总耗时。
+    """
+    path: List[Dict[str, Any]] = []
+
+    def visit(node: Span, depth: int) -> None:
+        chain = _critical_children(trace, node)
+        path.append({
+            "name": node.name,
+            "category": node.category,
+            "depth": depth,
+            "duration_ms": node.duration * 1000,
+            "self_time_ms": (node.duration - sum(c.duration for c in chain)) * 1000,
+            "attrs": node.attrs,
+        })
+        for child in chain:
+            visit(child, depth + 1)
+
+    if trace.root is not None:
+        visit(trace.root, 0)
+    return path
+
+
+def format_critical_path(path: List[Dict[str, Any]]) -> str:
+    lines = []
+    for step in path:
+        lines.append(f"{'  ' * step['depth']}{step['name']} [{step['category']}] "
+                     f"{step['duration_ms']:.1f} ms (自身 {step['self_time_ms']:.1f} ms)")
+    return "\n".join(lines)
+
+
+def _load_chrome_trace(path: str) -> Trace:
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    other = data.get("otherData", {})
+    trace = Trace(other.get("name", "trace"))
+    trace.trace_id = other.get("trace_id", trace.trace_id)
+    for event in data.get("traceEvents", []):
+        args = dict(event.get("args", {}))
+        start = event["ts"] / 1e6
+        trace.spans.append(Span(args.pop("span_id"), args.pop("parent_id", None), event["name"],
+                                event.get("cat", STAGE), start, start + event.get("dur", 0) / 1e6,
+                                event.get("tid", 0), args, args.pop("error", None)))
+    return trace
+
+
+def main():
+    if len(sys.argv) != 2:
+        print("用法: python pipeline_trace.py trace.json")
+        sys.exit(1)
+    trace = _load_chrome_trace(sys.argv[1])
+    print(f"🧭 trace {trace.trace_id}: {len(trace.spans)} 个span")
+    print(format_critical_path(critical_path(trace)))
+
+
+if __name__ == "__main__":
+    main()
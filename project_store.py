@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+论文项目存储布局
+新项目不再平铺在result/下，而是按项目ID的sha1前缀分片存放：
+  result/projects/3f/a2/多智能体系统协作与协调_paper/
+每个分片目录里只有少量条目，项目数到几万时创建和查找仍然是O(1)；
+项目ID → 路径的映射保存在 result/.project_index.sqlite 中，路径以result目录为基准，整个目录可以整体搬走。
+旧的平铺项目（以及 result/multiagent_project/result/测试论文_paper 这类嵌套遗留）仍然可以读取，
+用 migrate 子命令迁移到分片布局。
+
+用法:
+  python project_store.py migrate --dry_run     # 只打印迁移计划
+  python project_store.py migrate               # 迁移所有旧项目
+  python project_store.py resolve 测试论文_paper  # 查找项目路径
+"""
+
+import argparse
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+DEFAULT_RESULT_DIR = "result"
+INDEX_FILENAME = ".project_index.sqlite"
+SHARD_DIR = "projects"
+# 两级、每级两个十六进制字符：256 × 256 个分片目录
+SHARD_LEVELS = 2
+SHARD_WIDTH = 2
+MAX_DISCOVERY_DEPTH = 4
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+    project_id TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+"""
+
+
+def validate_project_id(project_id: str) -> str:
+    """项目ID就是目录名，不能包含路径分隔符"""
+    if not project_id or project_id in (".", "..") or "/" in project_id or os.sep in project_id \
+            or project_id.startswith("."):
+        raise ValueError(f"无效的项目ID: {project_id!r}")
+    return project_id
+
+
+def shard_of(project_id: str) -> str:
+    """项目ID对应的分片相对路径，例如 '3f/a2'"""
+    digest = hashlib.sha1(project_id.encode("utf-8")).hexdigest()
+    return "/".join(digest[i * SHARD_WIDTH:(i + 1) * SHARD_WIDTH] for i in range(SHARD_LEVELS))
+
+
+def legacy_projects(result_dir: str) -> Dict[str, str]:
+    """找到平铺布局下所有含main.tex的项目目录（跳过分片目录），返回 {相对名称: 绝对路径}
+
+    项目目录本身不再向下展开，只有嵌套的result/子目录（历史遗留）会继续查找。
+    """
+    found: Dict[str, str] = {}
+    result_dir = os.path.abspath(result_dir)
+
+    def walk(path: str, depth: int) -> None:
+        try:
+            entries = [e for e in os.scandir(path) if e.is_dir() and not e.name.startswith(".")]
+        except OSError:
+            return
+        for entry in entries:
+            if os.path.exists(os.path.join(entry.path, "main.tex")):
+                found[os.path.relpath(entry.path, result_dir).replace(os.sep, "/")] = entry.path
+                nested = os.path.join(entry.path, "result")
+                if depth < MAX_DISCOVERY_DEPTH and os.path.isdir(nested):
+                    walk(nested, depth + 1)
+            elif depth == 1 and entry.name == SHARD_DIR:
+                continue
+            elif depth < MAX_DISCOVERY_DEPTH and entry.name != "modules":
+                walk(entry.path, depth + 1)
+
+    walk(result_dir, 1)
+    return found
+
+
+class ProjectStore:
+    """分片项目目录及其 项目ID → 路径 索引"""
+
+    def __init__(self, result_dir: str = DEFAULT_RESULT_DIR, db_path: Optional[str] = None):
+        self.result_dir = os.path.abspath(result_dir)
+        os.makedirs(self.result_dir, exist_ok=True)
+        self.db_path = db_path or os.path.join(self.result_dir, INDEX_FILENAME)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def shard_path(self, project_id: str) -> str:
+        """项目在分片布局下的绝对路径（不检查是否存在）"""
+        validate_project_id(project_id)
+        return os.path.join(self.result_dir, SHARD_DIR, *shard_of(project_id).split("/"), project_id)
+
+    def _indexed(self, project_id: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT path FROM projects WHERE project_id = ?", (project_id,)).fetchone()
+        return os.path.join(self.result_dir, row[0]) if row else None
+
+    def resolve(self, project_id: str) -> Optional[str]:
+        """查找已存在的项目：索引 → 分片路径 → 旧的平铺路径；都不存在时返回None"""
+        try:
+            validate_project_id(project_id)
+        except ValueError:
+            return None
+        path = self._indexed(project_id)
+        if path and os.path.isdir(path):
+            return path
+        for candidate in (self.shard_path(project_id), os.path.join(self.result_dir, project_id)):
+            if os.path.isdir(candidate):
+                return candidate
+        return None
+
+    def path_for(self, project_id: str) -> str:
+        """已存在项目的路径，否则是新项目将要使用的分片路径"""
+        return self.resolve(project_id) or self.shard_path(project_id)
+
+    def register(self, project_id: str, path: str) -> None:
+        rel = os.path.relpath(os.path.abspath(path), self.result_dir).replace(os.sep, "/")
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO projects VALUES (?, ?, ?)", (project_id, rel, time.time()))
+
+    def create(self, project_id: str) -> str:
+        """创建（或复用）项目目录并登记到索引，返回绝对路径"""
+        path = self.path_for(project_id)
+        os.makedirs(path, exist_ok=True)
+        self.register(project_id, path)
+        return path
+
+    def remove(self, project_id: str) -> None:
+        """只删除索引项，不删除文件"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM projects WHERE project_id = ?", (project_id,))
+
+    def items(self) -> Iterator[Tuple[str, str]]:
+        """已登记且目录仍存在的项目 (项目ID, 绝对路径)"""
+        with self._lock:
+            rows = self._conn.execute("SELECT project_id, path FROM projects").fetchall()
+        for project_id, rel in rows:
+            path = os.path.join(self.result_dir, rel)
+            if os.path.isdir(path):
+                yield project_id, path
+
+    def plan_migration(self) -> List[Tuple[str, str, str]]:
+        """旧项目的迁移计划 [(原路径, 项目ID, 新路径)]；嵌套项目排在外层项目之前
+
+        外层（平铺）项目先分配ID并保留原目录名，重名的嵌套项目用完整相对路径区分，仍冲突时再加数字后缀。
+        """
+        legacy = legacy_projects(self.result_dir)
+        taken = {project_id for project_id, _ in self.items()}
+
+        def free(project_id: str) -> bool:
+            return project_id not in taken and not os.path.exists(self.shard_path(project_id))
+
+        ids: Dict[str, str] = {}
+        for rel in sorted(legacy, key=lambda r: (r.count("/"), r)):
+            project_id = os.path.basename(legacy[rel])
+            if not free(project_id):
+                project_id = rel.replace("/", "__")
+                base, n = project_id, 2
+                while not free(project_id):
+                    project_id = f"{base}_{n}"
+                    n += 1
+            taken.add(project_id)
+            ids[rel] = project_id
+        # 嵌套项目先移动，否则会随外层项目目录一起被移走
+        return [(legacy[rel], ids[rel], self.shard_path(ids[rel]))
+                for rel in sorted(legacy, key=lambda r: (-r.count("/"), r))]
+
+    def migrate(self, dry_run: bool = False) -> List[Tuple[str, str, str]]:
+        """把旧的平铺/嵌套项目移动到分片布局，返回执行（或计划）的迁移"""
+        plan = self.plan_migration()
+        for src, project_id, dest in plan:
+            if dry_run:
+                continue
+            os.makedirs(os.path.dirname(dest), exist_ok=True)
+            os.rename(src, dest)
+            self.register(project_id, dest)
+            # 嵌套项目移走后，外层的空result/目录一并删除
+            parent = os.path.dirname(src)
+            if os.path.basename(parent) == "result" and parent != self.result_dir:
+                try:
+                    os.rmdir(parent)
+                except OSError:
+                    pass
+        return plan
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+_stores: Dict[str, ProjectStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(result_dir: str = DEFAULT_RESULT_DIR) -> ProjectStore:
+    """每个result目录共用一个存储实例"""
+    key = os.path.abspath(result_dir)
+    with _stores_lock:
+        if key not in _stores:
+            _stores[key] = ProjectStore(key)
+        return _stores[key]
+
+
+def main():
+    p = argparse.ArgumentParser(description="论文项目分片存储")
+    p.add_argument("--result_dir", default=DEFAULT_RESULT_DIR, help="论文项目根目录（默认：result）")
+    sub = p.add_subparsers(dest="command", required=True)
+    migrate = sub.add_parser("migrate", help="把旧的平铺项目迁移到分片布局")
+    migrate.add_argument("--dry_run", action="store_true", help="只打印迁移计划，不移动文件")
+    resolve = sub.add_parser("resolve", help="查找项目路径")
+    resolve.add_argument("project_id")
+    args = p.parse_args()
+
+    store = ProjectStore(args.result_dir)
+    if args.command == "resolve":
+        path = store.resolve(args.project_id)
+        print(path if path else f"❌ 未找到项目: {args.project_id}")
+        return
+
+    plan = store.migrate(dry_run=args.dry_run)
+    if not plan:
+        print("✅ 没有需要迁移的旧项目")
+        return
+    for src, project_id, dest in plan:
+        print(f"  {os.path.relpath(src, store.result_dir)} -> {os.path.relpath(dest, store.result_dir)}"
+              f"  [{project_id}]")
+    action = "计划迁移" if args.dry_run else "已迁移"
+    print(f"{'📋' if args.dry_run else '✅'} {action} {len(plan)} 个项目")
+
+
+if __name__ == "__main__":
+    main()
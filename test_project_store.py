@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+项目存储布局的迁移测试
+"""
+
+import os
+
+from project_store import ProjectStore
+
+
+def _project(path):
+    os.makedirs(path)
+    with open(os.path.join(path, "main.tex"), "w", encoding="utf-8") as f:
+        f.write("\\documentclass{article}\n")
+
+
+def test_migrate_nested_project_with_same_name(tmp_path):
+    """result/foo_paper 与 result/outer/result/foo_paper 重名：外层保留原名，嵌套项目使用路径限定的ID"""
+    result_dir = tmp_path / "result"
+    flat = result_dir / "foo_paper"
+    nested = result_dir / "outer" / "result" / "foo_paper"
+    _project(str(flat))
+    _project(str(nested))
+
+    store = ProjectStore(str(result_dir))
+    plan = store.plan_migration()
+    ids = {src: project_id for src, project_id, _ in plan}
+    assert ids[str(flat)] == "foo_paper"
+    assert ids[str(nested)] == "outer__result__foo_paper"
+    assert len({dest for _, _, dest in plan}) == len(plan)
+
+    store.migrate()
+    assert store.resolve("foo_paper") == store.shard_path("foo_paper")
+    assert store.resolve("outer__result__foo_paper") == store.shard_path("outer__result__foo_paper")
+    assert not flat.exists() and not nested.exists()
+    store.close()
+
+
+def test_path_qualified_id_taken(tmp_path):
+    """路径限定的ID也被占用时加数字后缀"""
+    result_dir = tmp_path / "result"
+    _project(str(result_dir / "foo_paper"))
+    _project(str(result_dir / "outer" / "result" / "foo_paper"))
+    store = ProjectStore(str(result_dir))
+    store.create("outer__result__foo_paper")
+
+    ids = sorted(project_id for _, project_id, _ in store.plan_migration())
+    assert ids == ["foo_paper", "outer__result__foo_paper_2"]
+    store.close()
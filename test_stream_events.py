@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+baml_ext.stream_events 字段完成事件的测试
+"""
+
+from baml_ext.stream_events import FIELD, FINAL, ITEM, FieldTracker
+
+
+class Resume:
+    model_fields = {"name": None, "email": None, "skills": None}
+
+    def __init__(self, name=None, email=None, skills=None):
+        self.name = name
+        self.email = email
+        self.skills = skills if skills is not None else []
+
+
+def _events(partials, final):
+    tracker = FieldTracker()
+    events = []
+    for partial in partials:
+        events += tracker.feed(partial)
+    return events + tracker.finish(final)
+
+
+def test_in_order_fields():
+    events = _events([Resume("Jane"), Resume("Jane Doe", "jane@"), Resume("Jane Doe", "jane@x.org", ["Rust"]),
+                      Resume("Jane Doe", "jane@x.org", ["Rust", "Go"])],
+                     Resume("Jane Doe", "jane@x.org", ["Rust", "Go"]))
+    fields = [(e.field, e.value) for e in events if e.kind == FIELD]
+    assert fields == [("name", "Jane Doe"), ("email", "jane@x.org"), ("skills", ["Rust", "Go"])]
+    assert [(e.index, e.value) for e in events if e.kind == ITEM] == [(0, "Rust"), (1, "Go")]
+    assert events[-1].kind == FINAL
+
+
+def test_out_of_order_fields():
+    """模型先写skills再写name/email：空字段不能提前结束，提前结束后又变化的字段在最后用最终值再发一次"""
+    events = _events([Resume(skills=["Rust"]), Resume("Ja", skills=["Rust"]), Resume("Jane Doe", skills=["Rust"]),
+                      Resume("Jane Doe", "jane@x.org", ["Rust"])],
+                     Resume("Jane Doe", "jane@x.org", ["Rust"]))
+    assert [(e.kind, e.field, e.value) for e in events[:-1]] == [
+        (FIELD, "name", "Ja"),            # skills已经开始，name一出现就提前结束
+        (FIELD, "email", "jane@x.org"),
+        (FIELD, "name", "Jane Doe"),      # 最终值不同，用最终值更正
+        (ITEM, "skills", "Rust"),
+        (FIELD, "skills", ["Rust"]),
+    ]
+    assert events[-1].kind == FINAL